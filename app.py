@@ -3,20 +3,43 @@ Smart Career Advisor - Flask Backend
 Handles user authentication, profile management, resume analysis, and career prediction
 """
 
-from flask import Flask, render_template, request, jsonify, session, redirect, url_for
+from flask import (Flask, Request, Response, g, render_template, request, jsonify, session, redirect,
+                   stream_with_context, url_for)
 from werkzeug.security import generate_password_hash, check_password_hash
 from werkzeug.utils import secure_filename
 import sqlite3
 import json
+import atexit
+import base64
+import io
 import os
-from datetime import datetime
-import joblib
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
 import re
 from functools import wraps
 import nltk
 from nltk.tokenize import word_tokenize
 from nltk.corpus import stopwords
 import numpy as np
+import click
+from model_registry import registry
+from calibration import softmax
+from inference import EnsembleScorer, ModelInconsistencyError, MicroBatcher
+from result_cache import result_cache
+from skill_matcher import SkillMatcher, SKILLS_FILE
+from pdf_extract import extract_pdf_text, ExtractionResult, STATUS_OK, STATUS_ERROR, STATUS_TIMEOUT, STATUS_BUSY
+from upload_store import UploadStore, hash_stream
+from job_queue import job_queue
+from migrations import migrate, query_plan_problems
+from notification_sink import NotificationSink
+from notification_hub import NotificationHub
+from resume_index import ResumeIndex, encode_vector, vector_row
+from queries import (NOTIFICATIONS_QUERY, NOTIFICATIONS_PAGE_QUERY, UNREAD_COUNT_QUERY, NOTIFICATIONS_SINCE_QUERY,
+                     NOTIFICATIONS_LAST_ID_QUERY, LATEST_RESUME_QUERY, PROFILE_QUERY, LOGIN_QUERY,
+                     RESUME_CONTENT_QUERY, RESUME_LAST_UPLOAD_BY_HASH_QUERY, RESUME_VECTOR_QUERY,
+                     INSERT_RESUME_VECTOR, HOT_QUERIES)
 
 # Download NLTK data
 try:
@@ -55,84 +78,159 @@ def not_found(error):
 def method_not_allowed(error):
     return jsonify({'error': 'Method not allowed. Use POST for this endpoint.'}), 405
 
+@app.errorhandler(413)
+def file_too_large(error):
+    return jsonify({'error': 'File too large. Maximum size is 5MB.'}), 413
+
 @app.errorhandler(500)
 def internal_error(error):
     return jsonify({'error': 'Internal server error.'}), 500
 
 # Configuration
-DATABASE = 'sca.db'
+DATABASE = os.environ.get('SCA_DATABASE', 'sca.db')
+
+# SQLite tuning: wait for a competing writer instead of failing with
+# "database is locked", fsync only at WAL checkpoints (durable against app
+# crashes; a power loss may drop the last transactions), and keep more
+# prepared statements per connection than the default 128.
+SQLITE_BUSY_TIMEOUT_MS = int(os.environ.get('SCA_SQLITE_BUSY_TIMEOUT_MS', 5000))
+SQLITE_SYNCHRONOUS = os.environ.get('SCA_SQLITE_SYNCHRONOUS', 'NORMAL').upper()
+SQLITE_CACHED_STATEMENTS = 256
+
+# Notifications per page (default / maximum) and ids per mark-read call
+NOTIFICATIONS_PAGE_SIZE = 20
+NOTIFICATIONS_MAX_PAGE_SIZE = 100
+MARK_READ_MAX_IDS = 500
+
+# Server-Sent Events: comment line sent (and other workers' rows polled) this often,
+# streams are closed after SSE_MAX_STREAM_SECONDS and the browser reconnects with Last-Event-ID
+SSE_HEARTBEAT_SECONDS = float(os.environ.get('SCA_SSE_HEARTBEAT_SECONDS', 15))
+SSE_MAX_STREAM_SECONDS = float(os.environ.get('SCA_SSE_MAX_STREAM_SECONDS', 300))
+SSE_RETRY_MS = 3000
+SSE_REPLAY_LIMIT = 100   # rows per catch-up read
+
+# Emails (comma-separated) of the users allowed to read the diagnostics endpoints
+# (cache, model, job, batching and stream counters); empty keeps them closed
+DIAGNOSTICS_USERS = {email.strip().lower() for email in os.environ.get('SCA_DIAGNOSTICS_USERS', '').split(',')
+                     if email.strip()}
+
 UPLOAD_FOLDER = 'static/uploads'
 MAX_FILE_SIZE = 5 * 1024 * 1024  # 5MB
 ALLOWED_EXTENSIONS = {'txt', 'pdf'}
+MAX_BATCH_SIZE = 5000  # texts per /api/predict-roles/batch call
+MAX_SIMILAR_JOBS = 50  # k per /api/job-postings/similar call
+MAX_SIMILAR_RESUMES = 50  # k per /api/resumes/<id>/similar call
+
+# Micro-batching for /api/predict-role: requests arriving within the window
+# (up to the max batch size) share one vectorizer/model pass. 0 disables it.
+PREDICT_BATCH_WINDOW_MS = float(os.environ.get('SCA_PREDICT_BATCH_WINDOW_MS', 0))
+PREDICT_MAX_BATCH_SIZE = int(os.environ.get('SCA_PREDICT_MAX_BATCH_SIZE', 32))
+
+# Upload retention: files whose newest resumes row is older than this are
+# removed by `flask gc-uploads` (0 keeps them forever). Files no row refers
+# to are removed once older than the grace period (their upload may still be running).
+UPLOAD_RETENTION_DAYS = float(os.environ.get('SCA_UPLOAD_RETENTION_DAYS', 365))
+UPLOAD_GC_GRACE_SECONDS = 3600
+UPLOAD_GC_BATCH_SIZE = int(os.environ.get('SCA_UPLOAD_GC_BATCH_SIZE', 500))
 
 app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
+app.config['MAX_CONTENT_LENGTH'] = MAX_FILE_SIZE + 64 * 1024  # file plus multipart overhead
 os.makedirs(os.path.join(UPLOAD_FOLDER, 'avatars'), exist_ok=True)
 os.makedirs(os.path.join(UPLOAD_FOLDER, 'resumes'), exist_ok=True)
 
-# Tech skills list for extraction
-TECH_SKILLS = [
-    'Python', 'Java', 'C++', 'C#', 'JavaScript', 'TypeScript', 'Go', 'Rust', 'Ruby', 'PHP',
-    'SQL', 'MongoDB', 'PostgreSQL', 'MySQL', 'Redis', 'Elasticsearch', 'Cassandra',
-    'React', 'Vue', 'Angular', 'Node.js', 'Express', 'Django', 'Flask', 'Spring Boot',
-    'Docker', 'Kubernetes', 'AWS', 'Azure', 'GCP', 'Terraform', 'Ansible', 'Jenkins',
-    'Git', 'REST API', 'GraphQL', 'Machine Learning', 'TensorFlow', 'PyTorch',
-    'Pandas', 'NumPy', 'Scikit-learn', 'Keras', 'OpenCV', 'NLP', 'Spark', 'Hadoop',
-    'HTML', 'CSS', 'SASS', 'Bootstrap', 'Microservices', 'System Design', 'Agile'
-]
+# Resumes are stored once per unique content, keyed by SHA-256
+upload_store = UploadStore(os.path.join(UPLOAD_FOLDER, 'resumes'))
 
-def init_db():
-    """Initialize SQLite database"""
-    conn = sqlite3.connect(DATABASE)
-    c = conn.cursor()
+# Extraction outcomes worth retrying on the next upload of the same file
+TRANSIENT_EXTRACTION_STATUSES = {STATUS_TIMEOUT, STATUS_BUSY}
 
-    c.execute('''CREATE TABLE IF NOT EXISTS users (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        username TEXT UNIQUE NOT NULL,
-        email TEXT UNIQUE NOT NULL,
-        password_hash TEXT NOT NULL,
-        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-    )''')
-
-    c.execute('''CREATE TABLE IF NOT EXISTS profiles (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        user_id INTEGER UNIQUE NOT NULL,
-        full_name TEXT,
-        initials TEXT,
-        phone TEXT,
-        dob TEXT,
-        skills_json TEXT,
-        avatar_filename TEXT,
-        FOREIGN KEY (user_id) REFERENCES users(id)
-    )''')
-
-    c.execute('''CREATE TABLE IF NOT EXISTS resumes (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        user_id INTEGER NOT NULL,
-        file_name TEXT NOT NULL,
-        uploaded_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-        extracted_skills_json TEXT,
-        prediction TEXT,
-        FOREIGN KEY (user_id) REFERENCES users(id)
-    )''')
-
-    c.execute('''CREATE TABLE IF NOT EXISTS notifications (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        user_id INTEGER NOT NULL,
-        message TEXT NOT NULL,
-        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-        is_read BOOLEAN DEFAULT 0,
-        FOREIGN KEY (user_id) REFERENCES users(id)
-    )''')
+class UploadRequest(Request):
+    """Keep uploaded files in memory instead of spilling them to a temp file.
 
-    conn.commit()
-    conn.close()
+    Werkzeug spools uploads over 500 KB to disk; MAX_CONTENT_LENGTH already
+    bounds the size, so the whole file can stay in the spooled buffer.
+    """
 
-def get_db():
-    """Get database connection"""
-    conn = sqlite3.connect(DATABASE)
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        return tempfile.SpooledTemporaryFile(max_size=MAX_FILE_SIZE + 1, mode='rb+')
+
+app.request_class = UploadRequest
+
+# Tech skills vocabulary (names + aliases) for extraction, built once at startup
+skill_matcher = SkillMatcher.from_file(SKILLS_FILE)
+TECH_SKILLS = skill_matcher.skills
+
+# Cache key component for extracted skills; changes whenever the vocabulary does
+SKILLS_VERSION = skill_matcher.version
+
+# The 8 normalized roles the models are allowed to predict
+REQUIRED_ROLES = {
+    'Full Stack Developer',
+    'DevOps Engineer',
+    'Data Scientist',
+    'Cloud Engineer',
+    'AI/ML Engineer',
+    'Network Engineer',
+    'RF Engineer',
+    'Field Engineer'
+}
+
+# Load model artifacts once per worker instead of on every request,
+# and pick up newly trained versions without a restart
+registry.preload()
+registry.start_watcher()
+
+def init_db():
+    """Create the SQLite database or upgrade it to the latest schema version"""
+    migrate(DATABASE)
+
+# Create or upgrade the schema before the first request (safe to run in every worker)
+init_db()
+
+_db_local = threading.local()
+
+def connect_db():
+    """Open a tuned connection to the application database"""
+    if SQLITE_SYNCHRONOUS not in ('OFF', 'NORMAL', 'FULL', 'EXTRA'):
+        raise ValueError(f'Invalid SCA_SQLITE_SYNCHRONOUS: {SQLITE_SYNCHRONOUS}')
+    conn = sqlite3.connect(
+        DATABASE,
+        timeout=SQLITE_BUSY_TIMEOUT_MS / 1000.0,
+        cached_statements=SQLITE_CACHED_STATEMENTS
+    )
     conn.row_factory = sqlite3.Row
+    conn.execute('PRAGMA journal_mode=WAL')
+    conn.execute(f'PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}')
+    conn.execute(f'PRAGMA synchronous={SQLITE_SYNCHRONOUS}')
     return conn
 
+def get_db():
+    """Get the database connection of the current request.
+
+    Every helper called during one request shares one connection. The
+    connection itself stays open per thread across requests, so pragmas are
+    applied once and its prepared-statement cache keeps paying off.
+    """
+    if 'db' not in g:
+        conn = getattr(_db_local, 'conn', None)
+        if conn is None:
+            conn = _db_local.conn = connect_db()
+        g.db = conn
+    return g.db
+
+@app.teardown_appcontext
+def release_db(error):
+    """End the request's transaction if a handler left one open"""
+    conn = g.pop('db', None)
+    if conn is not None and conn.in_transaction:
+        conn.rollback()
+
+# Notifications are written behind the request in batched transactions;
+# each committed batch wakes the SSE streams of its users
+notification_hub = NotificationHub()
+notification_sink = NotificationSink(connect_db, listeners=[notification_hub.publish])
+atexit.register(notification_sink.close)
+
 def login_required(f):
     """Decorator to check if user is logged in"""
     @wraps(f)
@@ -145,42 +243,189 @@ def login_required(f):
         return f(*args, **kwargs)
     return decorated_function
 
+def diagnostics_required(f):
+    """Decorator for endpoints exposing internal counters, paths and versions.
+    Only logged-in users listed in SCA_DIAGNOSTICS_USERS may read them."""
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        if 'user_id' not in session:
+            return jsonify({'success': False, 'error': 'Not authenticated. Please login.'}), 401
+        user = get_db().execute('SELECT email FROM users WHERE id = ?', (session['user_id'],)).fetchone()
+        if user is None or user['email'].lower() not in DIAGNOSTICS_USERS:
+            return jsonify({'success': False, 'error': 'Diagnostics are not enabled for this account'}), 403
+        return f(*args, **kwargs)
+    return decorated_function
+
 def extract_text_from_file(file_path):
-    """Extract text from uploaded file"""
+    """Extract text from uploaded file.
+    PDFs are parsed in a sandboxed child process with time/page/memory limits.
+    Returns an ExtractionResult (text, status, pages_read, page_count, error).
+    """
+    if file_path.endswith('.pdf'):
+        return extract_pdf_text(file_path)
+
     try:
-        if file_path.endswith('.txt'):
-            with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                return f.read()
-        elif file_path.endswith('.pdf'):
-            try:
-                import PyPDF2
-                with open(file_path, 'rb') as f:
-                    reader = PyPDF2.PdfReader(f)
-                    text = ''
-                    for page in reader.pages:
-                        text += page.extract_text()
-                    return text
-            except:
-                return ''
-    except:
-        return ''
+        with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
+            return ExtractionResult(f.read(), STATUS_OK, None, None, None)
+    except OSError as e:
+        return ExtractionResult('', STATUS_ERROR, None, None, str(e))
+
+def extract_text_from_bytes(data, file_extension):
+    """Extract text from an upload held in memory, without touching the disk"""
+    if file_extension == '.pdf':
+        return extract_pdf_text(data)
+    return ExtractionResult(data.decode('utf-8', errors='ignore'), STATUS_OK, None, None, None)
 
 def extract_skills(text):
-    """Extract tech skills from text using simple matching"""
-    text_lower = text.lower()
-    found_skills = []
+    """Extract tech skills (including aliases like "k8s") from text in one pass"""
+    return skill_matcher.extract(text)
+
+def extract_skills_cached(text):
+    """extract_skills() through the shared result cache"""
+    skills = result_cache.get('skills', text, SKILLS_VERSION)
+    if skills is None:
+        skills = extract_skills(text)
+        result_cache.set('skills', text, SKILLS_VERSION, skills)
+    return skills
 
-    for skill in TECH_SKILLS:
-        if skill.lower() in text_lower:
-            found_skills.append(skill)
+def get_resume_content(content_hash, stream, file_extension, size_bytes, persist=True):
+    """Return the stored file and extraction result for an upload's content.
 
-    # Remove duplicates and return
-    return list(set(found_skills))
+    A file seen before is neither written nor parsed again; only its skills
+    are re-extracted (from the stored text) if the skill vocabulary changed.
+    New content is written to the upload store and parsed once. With
+    persist=False (anonymous uploads) new content is parsed straight from
+    memory and nothing is stored.
+    """
+    conn = get_db()
+    c = conn.cursor()
+    c.execute(RESUME_CONTENT_QUERY, (content_hash,))
+    row = c.fetchone()
+
+    if row and row['extraction_status'] not in TRANSIENT_EXTRACTION_STATUSES \
+            and upload_store.exists(content_hash, row['file_type']):
+        text = row['extracted_text'] or ''
+        if row['skills_version'] == SKILLS_VERSION:
+            skills = json.loads(row['extracted_skills_json'] or '[]')
+        else:
+            skills = extract_skills(text)
+            c.execute(
+                'UPDATE resume_contents SET extracted_skills_json = ?, skills_version = ? WHERE content_hash = ?',
+                (json.dumps(skills), SKILLS_VERSION, content_hash)
+            )
+            conn.commit()
+        return {
+            'text': text,
+            'skills': skills,
+            'file_path': row['file_path'],
+            'file_type': row['file_type'],
+            'extraction_status': row['extraction_status'],
+            'extraction_error': row['extraction_error'],
+            'pages_read': row['pages_read'],
+            'page_count': row['page_count'],
+            'deduplicated': True,
+        }
+
+    if not persist:
+        extraction = extract_text_from_bytes(stream.read(), file_extension)
+        return {
+            'text': extraction.text,
+            'skills': extract_skills_cached(extraction.text),
+            'file_path': None,
+            'file_type': file_extension,
+            'extraction_status': extraction.status,
+            'extraction_error': extraction.error,
+            'pages_read': extraction.pages_read,
+            'page_count': extraction.page_count,
+            'deduplicated': False,
+        }
+
+    # Keep the extension of the first upload so the stored object stays addressable
+    if row:
+        file_extension = row['file_type']
+    upload_store.save(stream, content_hash, file_extension)
+    extraction = extract_text_from_file(upload_store.path(content_hash, file_extension))
+    skills = extract_skills_cached(extraction.text)
+    file_path = upload_store.relative_path(content_hash, file_extension).replace(os.sep, '/')
+
+    c.execute(
+        'INSERT OR REPLACE INTO resume_contents '
+        '(content_hash, file_path, file_type, size_bytes, extracted_text, extracted_skills_json, '
+        'skills_version, extraction_status, extraction_error, pages_read, page_count) '
+        'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+        (content_hash, file_path, file_extension, size_bytes, extraction.text, json.dumps(skills),
+         SKILLS_VERSION, extraction.status, extraction.error, extraction.pages_read, extraction.page_count)
+    )
+    conn.commit()
+    return {
+        'text': extraction.text,
+        'skills': skills,
+        'file_path': file_path,
+        'file_type': file_extension,
+        'extraction_status': extraction.status,
+        'extraction_error': extraction.error,
+        'pages_read': extraction.pages_read,
+        'page_count': extraction.page_count,
+        'deduplicated': False,
+    }
 
 def allowed_file(filename):
     """Check if file extension is allowed"""
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
+def save_prediction(user_id, final_role, resume_id=None):
+    """Store a predicted role on a resume (default: the user's most recent) and notify them"""
+    if not user_id:
+        return
+
+    conn = get_db()
+    c = conn.cursor()
+    try:
+        if resume_id is None:
+            c.execute(LATEST_RESUME_QUERY, (user_id,))
+            resume = c.fetchone()
+            resume_id = resume['id'] if resume else None
+
+        if resume_id is not None:
+            c.execute(
+                'UPDATE resumes SET prediction = ? WHERE id = ? AND user_id = ?',
+                (final_role, resume_id, user_id)
+            )
+            conn.commit()
+    except Exception as db_error:
+        print(f"Database error saving prediction: {db_error}")
+        conn.rollback()
+
+    # Add notification
+    add_notification(user_id, f'Career role predicted: {final_role}')
+
+def score_texts(texts):
+    """Score texts with the ensemble of the current model version.
+    Used by single, micro-batched and batch predict-role requests alike.
+    """
+    models = registry.current()
+    results = EnsembleScorer.for_models(models, REQUIRED_ROLES).score(texts)
+    for result in results:
+        result['model_version'] = models.version
+    return results
+
+# Optional micro-batching of concurrent /api/predict-role calls (disabled when window is 0)
+predict_batcher = None
+if PREDICT_BATCH_WINDOW_MS > 0:
+    predict_batcher = MicroBatcher(score_texts, PREDICT_BATCH_WINDOW_MS, PREDICT_MAX_BATCH_SIZE)
+
+def predict_text(text):
+    """Predict the role for one text; repeat texts are served from the result cache"""
+    result = result_cache.get('predict_role', text, registry.current().version)
+    if result is None:
+        if predict_batcher is not None:
+            # Share one vectorizer/model pass with concurrent requests
+            result = predict_batcher.submit(text)
+        else:
+            result = score_texts([text])[0]
+        result_cache.set('predict_role', text, result['model_version'], result)
+    return result
+
 # ==================== ROUTES ====================
 
 @app.route('/')
@@ -226,9 +471,8 @@ def login():
 
         conn = get_db()
         c = conn.cursor()
-        c.execute('SELECT id, password_hash FROM users WHERE email = ?', (email,))
+        c.execute(LOGIN_QUERY, (email,))
         user = c.fetchone()
-        conn.close()
 
         if user and check_password_hash(user['password_hash'], password):
             session['user_id'] = user['id']
@@ -295,14 +539,12 @@ def signup():
         session['user_id'] = user['id']
         session.permanent = True
 
-        conn.close()
 
         if request.is_json:
             return jsonify({'success': True, 'message': 'Account created successfully', 'redirect': '/dashboard.html'}), 201
         return redirect(url_for('dashboard'))
 
     except sqlite3.IntegrityError:
-        conn.close()
         if request.is_json:
             return jsonify({'success': False, 'error': 'Email or username already exists'}), 409
         return render_template('home.html', error='Email or username already exists')
@@ -321,7 +563,6 @@ def check_session():
         c = conn.cursor()
         c.execute('SELECT username FROM users WHERE id = ?', (session['user_id'],))
         user = c.fetchone()
-        conn.close()
         return jsonify({'authenticated': True, 'username': user['username'] if user else ''}), 200
     return jsonify({'authenticated': False}), 200
 
@@ -341,51 +582,131 @@ def upload_resume():
     if not allowed_file(file.filename):
         return jsonify({'error': 'Only TXT and PDF files allowed'}), 400
 
+    # Get user_id if logged in, otherwise None for anonymous users
+    user_id = session.get('user_id')
+
     try:
-        # Get user_id if logged in, otherwise None for anonymous users
-        user_id = session.get('user_id')
+        # Only logged-in uploads are queued: the job stores the file in jobs.db, and
+        # anonymous uploads are never written to disk, so they are analyzed right away
+        if user_id and request.values.get('async', '').lower() in ('1', 'true', 'yes'):
+            # Queue the analysis and return at once; poll /api/jobs/<id> for the result
+            job_id = job_queue.enqueue(
+                'resume_analysis',
+                {'user_id': user_id, 'file_name': file.filename},
+                data=file.stream.read(),
+                user_id=user_id
+            )
+            return jsonify({
+                'success': True,
+                'job_id': job_id,
+                'status': 'queued',
+                'status_url': url_for('job_status', job_id=job_id)
+            }), 202
 
-        # Create filename - use 'anonymous' for non-logged-in users
-        user_prefix = user_id if user_id else 'anonymous'
-        filename = secure_filename(f"{user_prefix}_{datetime.now().timestamp()}_{file.filename}")
-        filepath = os.path.join(app.config['UPLOAD_FOLDER'], 'resumes', filename)
-        file.save(filepath)
+        response, _, _ = analyze_upload(user_id, file.stream, file.filename)
+        return jsonify(response)
 
-        # Extract text and skills
-        text = extract_text_from_file(filepath)
-        skills = extract_skills(text)
-        preview = text[:500] if text else "Could not extract text"
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
 
-        # Determine file type and prepare preview data
-        file_extension = os.path.splitext(file.filename)[1].lower()
-        resume_url = f'/static/uploads/resumes/{filename}'  # URL to access the file
+def analyze_upload(user_id, stream, filename):
+    """Store (logged-in users only) and analyze an uploaded resume.
+    Returns (upload response body, new resumes row id or None, extracted text).
+    """
+    file_extension = os.path.splitext(filename)[1].lower()
+
+    # Identical files share one stored object and one extraction result;
+    # anonymous uploads are analyzed in memory and never written to disk
+    content_hash, size_bytes = hash_stream(stream)
+    content = get_resume_content(content_hash, stream, file_extension, size_bytes,
+                                 persist=bool(user_id))
+    text = content['text']
+    skills = content['skills']
+    preview = text[:500] if text else "Could not extract text"
+    resume_url = None
+    resume_id = None
+
+    # Save to database only if user is logged in
+    if user_id:
+        resume_url = f"/static/uploads/resumes/{content['file_path']}"  # URL to access the file
+        conn = get_db()
+        c = conn.cursor()
+        c.execute(
+            'INSERT INTO resumes (user_id, file_name, content_hash, extracted_skills_json) VALUES (?, ?, ?, ?)',
+            (user_id, secure_filename(filename), content_hash, json.dumps(skills))
+        )
+        resume_id = c.lastrowid
+        if text.strip():
+            store_resume_vector(conn, resume_id, user_id, text)
+        conn.commit()
 
-        # Save to database only if user is logged in
-        if user_id:
-            conn = get_db()
-            c = conn.cursor()
-            c.execute(
-                'INSERT INTO resumes (user_id, file_name, extracted_skills_json) VALUES (?, ?, ?)',
-                (user_id, filename, json.dumps(skills))
-            )
-            conn.commit()
-            conn.close()
+        # Add notification
+        add_notification(user_id, 'Resume uploaded')
+
+    response = {
+        'success': True,
+        'skills': skills,
+        'preview_text': preview,
+        'file_type': content['file_type'],
+        'file_name': filename,
+        'file_url': resume_url,
+        'content_hash': content_hash,
+        'deduplicated': content['deduplicated'],
+        'extraction_status': content['extraction_status'],
+        'extraction_error': content['extraction_error'],
+        'pages_read': content['pages_read'],
+        'page_count': content['page_count'],
+        'message': f'Extracted {len(skills)} skills from resume'
+    }
+    return response, resume_id, text
+
+def store_resume_vector(conn, resume_id, user_id, text, models=None):
+    """Persist a resume's TF-IDF vector for the similarity index (caller commits).
+    Returns the vector as a 1 x n_features sparse row.
+    """
+    models = models or registry.current()
+    vector = models.get('vectorizer').transform([text])
+    conn.execute(INSERT_RESUME_VECTOR, (resume_id, user_id, models.version, encode_vector(vector)))
+    return vector
+
+def feature_count(vectorizer):
+    """Width of the vectorizer's output (TF-IDF vocabulary, or hashed features of streamed models)"""
+    return getattr(vectorizer, 'n_features', None) or len(vectorizer.vocabulary_)
+
+def resume_index_for(models):
+    """The similarity index over stored resume vectors of a model version, synced on use"""
+    index = models.derive(
+        'resume_index', lambda m: ResumeIndex(m.version, feature_count(m.get('vectorizer')))
+    )
+    index.sync(get_db())
+    return index
+
+def run_resume_analysis_job(job, progress):
+    """Job handler: extract text and skills from a queued upload, then predict its role"""
+    payload, state = job['payload'], job['state']
+    user_id = payload['user_id']
+
+    # Worker threads have no request; the app context gives them get_db()
+    with app.app_context():
+        # A retry reuses the upload step's outcome so the resume is not recorded twice
+        if 'response' in state:
+            response, resume_id, text = state['response'], state['resume_id'], state['text']
+        else:
+            progress(0.1, 'extracting')
+            response, resume_id, text = analyze_upload(user_id, io.BytesIO(job['data']), payload['file_name'])
+            progress(0.7, 'predicting', {'response': response, 'resume_id': resume_id, 'text': text})
 
-            # Add notification
-            add_notification(user_id, 'Resume uploaded')
+        response['prediction'] = None
+        if text.strip():
+            prediction = predict_text(text)
+            save_prediction(user_id, prediction['predicted_role'], resume_id=resume_id)
+            response['prediction'] = prediction
+    return response
 
-        return jsonify({
-            'success': True,
-            'skills': skills,
-            'preview_text': preview,
-            'file_type': file_extension,
-            'file_name': file.filename,
-            'file_url': resume_url,
-            'message': f'Extracted {len(skills)} skills from resume'
-        })
+job_queue.register('resume_analysis', run_resume_analysis_job)
 
-    except Exception as e:
-        return jsonify({'error': str(e)}), 500
+# Worker threads for queued resume analyses (SCA_JOB_WORKERS=0 disables them)
+job_queue.start()
 
 @app.route('/api/predict-role', methods=['POST'])
 def predict_role():
@@ -407,208 +728,88 @@ def predict_role():
         return jsonify({'error': 'No text provided'}), 400
 
     try:
-        # Load models and vectorizer (both SVM and RF for ensemble prediction)
-        vectorizer = joblib.load('models/vectorizer.joblib')
-        label_encoder = joblib.load('models/label_encoder.joblib')
-
-        # VALIDATION: Ensure label_encoder only has the 8 required roles
-        REQUIRED_ROLES = {
-            'Full Stack Developer',
-            'DevOps Engineer',
-            'Data Scientist',
-            'Cloud Engineer',
-            'AI/ML Engineer',
-            'Network Engineer',
-            'RF Engineer',
-            'Field Engineer'
-        }
-
-        encoded_roles = set(label_encoder.classes_)
-        if encoded_roles != REQUIRED_ROLES:
-            print(f"ERROR: Encoded roles {encoded_roles} do not match required roles {REQUIRED_ROLES}")
-            return jsonify({'error': 'Model inconsistency - roles mismatch'}), 500
-
-        # Load both SVM and RandomForest models
-        try:
-            svm_model = joblib.load('models/svm_model.joblib')
-            has_svm = True
-        except:
-            has_svm = False
-            print("Warning: SVM model not found, using RF only")
-
-        try:
-            rf_model = joblib.load('models/rf_model.joblib')
-            has_rf = True
-        except:
-            has_rf = False
-            print("Warning: RF model not found, using SVM only")
-
-        # Fallback to best_model if both specific models don't exist
-        if not has_svm and not has_rf:
-            rf_model = joblib.load('models/best_model.joblib')
-            has_rf = True
-
-        # Vectorize text using the SAME vectorizer used in training
-        X = vectorizer.transform([text])
-
-        # Initialize predictions and confidences
-        svm_role = None
-        svm_confidence = 0.0
-        rf_role = None
-        rf_confidence = 0.0
-
-        # SVM prediction (if model available)
-        if has_svm:
-            svm_prediction_idx = svm_model.predict(X)[0]
-            svm_role = label_encoder.inverse_transform([svm_prediction_idx])[0]
-            # Validate SVM role is in required set
-            if svm_role not in REQUIRED_ROLES:
-                print(f"ERROR: SVM returned invalid role: {svm_role}")
-                svm_role = None
-            # LinearSVC doesn't have predict_proba, use decision_function instead
-            try:
-                decision_scores = svm_model.decision_function(X)[0]
-                # Normalize decision scores to confidence-like metric (0-1 range)
-                svm_confidence = float(1.0 / (1.0 + np.exp(-decision_scores[svm_prediction_idx])))
-                svm_confidence = max(0.5, min(1.0, svm_confidence))  # Clamp to 0.5-1.0
-            except:
-                svm_confidence = 0.75  # Default confidence for SVM
-
-        # RandomForest prediction (if model available)
-        if has_rf:
-            rf_prediction_idx = rf_model.predict(X)[0]
-            rf_role = label_encoder.inverse_transform([rf_prediction_idx])[0]
-            # Validate RF role is in required set
-            if rf_role not in REQUIRED_ROLES:
-                print(f"ERROR: RF returned invalid role: {rf_role}")
-                rf_role = None
-            # RF has predict_proba
-            try:
-                rf_proba = rf_model.predict_proba(X)[0]
-                rf_confidence = float(max(rf_proba))
-            except:
-                rf_confidence = 0.75  # Default confidence for RF
-
-        # Ensemble prediction: intelligent role selection
-        # Use weighted voting with confidence scores
-        if has_svm and has_rf and svm_role and rf_role:
-            # Both models available: use weighted ensemble
-            if svm_role == rf_role:
-                # Agreement between models - highest confidence
-                final_role = svm_role
-                final_confidence = (svm_confidence + rf_confidence) / 2.0
-                ensemble_method = "both_agree"
-            else:
-                # Disagreement: choose the one with higher confidence
-                if svm_confidence >= rf_confidence:
-                    final_role = svm_role
-                    final_confidence = svm_confidence
-                    ensemble_method = "svm_higher_confidence"
-                else:
-                    final_role = rf_role
-                    final_confidence = rf_confidence
-                    ensemble_method = "rf_higher_confidence"
-        elif has_rf and rf_role:
-            final_role = rf_role
-            final_confidence = rf_confidence
-            ensemble_method = "rf_only"
-        elif has_svm and svm_role:
-            final_role = svm_role
-            final_confidence = svm_confidence
-            ensemble_method = "svm_only"
-        else:
-            # Fallback: shouldn't happen, but use first required role as default
-            final_role = 'Full Stack Developer'
-            final_confidence = 0.5
-            ensemble_method = "fallback_error"
-            print(f"WARNING: Fallback prediction used")
-
-        # Final validation: ENSURE final_role is in REQUIRED_ROLES
-        if final_role not in REQUIRED_ROLES:
-            print(f"CRITICAL ERROR: Final role {final_role} is not in required roles set!")
-            final_role = 'Full Stack Developer'  # Force to safe default
-            final_confidence = 0.5
-
-        # Get top 3 predictions from best-performing model for variety
-        top_roles = []
-        try:
-            if has_rf and hasattr(rf_model, 'predict_proba'):
-                probabilities = rf_model.predict_proba(X)[0]
-                top_indices = sorted(range(len(probabilities)), key=lambda i: probabilities[i], reverse=True)[:3]
-                top_roles = [
-                    {
-                        'role': label_encoder.inverse_transform([idx])[0],
-                        'confidence': float(probabilities[idx])
-                    }
-                    for idx in top_indices
-                    # Only include roles from REQUIRED_ROLES
-                    if label_encoder.inverse_transform([idx])[0] in REQUIRED_ROLES
-                ]
-        except Exception as e:
-            print(f"Error getting top roles: {e}")
-            pass
-
-        # Fallback if top_roles is empty
-        if not top_roles and final_role:
-            top_roles = [{'role': final_role, 'confidence': final_confidence}]
-
-        # Determine if prediction is uncertain
-        uncertainty_threshold = 0.65
-        is_uncertain = final_confidence < uncertainty_threshold
-        uncertainty_message = ""
-        if is_uncertain:
-            uncertainty_message = "Prediction is uncertain. Please improve your resume with more specific skills and achievements."
+        result = predict_text(text)
 
         # Save prediction to most recent resume (only if user is logged in)
-        user_id = session.get('user_id')
-        if user_id:
-            conn = get_db()
-            c = conn.cursor()
-            try:
-                c.execute(
-                    'SELECT id FROM resumes WHERE user_id = ? ORDER BY uploaded_at DESC LIMIT 1',
-                    (user_id,)
-                )
-                resume = c.fetchone()
-
-                if resume:
-                    c.execute(
-                        'UPDATE resumes SET prediction = ? WHERE id = ?',
-                        (final_role, resume['id'])
-                    )
-                    conn.commit()
-            except Exception as db_error:
-                print(f"Database error saving prediction: {db_error}")
-                conn.rollback()
-            finally:
-                conn.close()
-
-            # Add notification
-            add_notification(user_id, f'Career role predicted: {final_role}')
+        save_prediction(session.get('user_id'), result['predicted_role'])
 
-        return jsonify({
+        result.update({
             'success': True,
-            'predicted_role': final_role,
-            'confidence': float(final_confidence),
-            'svm_role': svm_role,
-            'svm_confidence': float(svm_confidence) if (has_svm and svm_role) else None,
-            'rf_role': rf_role,
-            'rf_confidence': float(rf_confidence) if (has_rf and rf_role) else None,
-            'top_roles': top_roles,
-            'ensemble_method': ensemble_method,
-            'is_uncertain': is_uncertain,
-            'uncertainty_message': uncertainty_message,
-            'message': f'Predicted role: {final_role}' + (f' ({uncertainty_message})' if is_uncertain else ''),
             'required_roles_count': len(REQUIRED_ROLES),
-            'validation_passed': final_role in REQUIRED_ROLES
+            'validation_passed': result['predicted_role'] in REQUIRED_ROLES
         })
+        return jsonify(result)
 
+    except ModelInconsistencyError as e:
+        print(f"ERROR: Encoded roles do not match required roles {REQUIRED_ROLES}")
+        return jsonify({'error': str(e)}), 500
     except Exception as e:
         print(f"Prediction error: {str(e)}")
         import traceback
         traceback.print_exc()
         return jsonify({'error': f'Prediction failed: {str(e)}'}), 500
 
+@app.route('/api/predict-roles/batch', methods=['POST'])
+def predict_roles_batch():
+    """Predict career roles for many resume texts in one request.
+    Vectorizes all texts into one sparse matrix and runs each model once over it.
+    Results are returned in input order with the same fields as /api/predict-role.
+    """
+    data = request.get_json(silent=True) or {}
+    texts = data.get('texts')
+
+    if not isinstance(texts, list) or not texts:
+        return jsonify({'error': 'texts must be a non-empty list'}), 400
+
+    if len(texts) > MAX_BATCH_SIZE:
+        return jsonify({'error': f'At most {MAX_BATCH_SIZE} texts per batch'}), 400
+
+    try:
+        results = [{'success': False, 'error': 'No text provided'} for _ in texts]
+        version = registry.current().version
+
+        # Serve cached texts directly; score the rest in one pass, keeping input positions
+        misses = []
+        for i, text in enumerate(texts):
+            if not isinstance(text, str) or not text:
+                continue
+            cached = result_cache.get('predict_role', text, version)
+            if cached is not None:
+                results[i] = cached
+            else:
+                misses.append(i)
+
+        scored = score_texts([texts[i] for i in misses]) if misses else []
+        for i, result in zip(misses, scored):
+            result_cache.set('predict_role', texts[i], result['model_version'], result)
+            results[i] = result
+
+        for result in results:
+            if 'error' not in result:
+                result['success'] = True
+
+        return jsonify({
+            'success': True,
+            'count': len(results),
+            'results': results
+        })
+
+    except ModelInconsistencyError as e:
+        return jsonify({'error': str(e)}), 500
+    except Exception as e:
+        print(f"Batch prediction error: {str(e)}")
+        return jsonify({'error': f'Batch prediction failed: {str(e)}'}), 500
+
+@app.route('/api/predict-role/batching', methods=['GET'])
+@diagnostics_required
+def predict_batching_stats():
+    """Report micro-batching settings plus batch-size and queue-wait histograms"""
+    if predict_batcher is None:
+        return jsonify({'enabled': False})
+    stats = predict_batcher.stats()
+    stats['enabled'] = True
+    return jsonify(stats)
+
 @app.route('/api/profile', methods=['GET', 'POST'])
 @login_required
 def profile():
@@ -622,9 +823,8 @@ def profile():
         user = c.fetchone()
 
         # Get profile
-        c.execute('SELECT * FROM profiles WHERE user_id = ?', (session['user_id'],))
+        c.execute(PROFILE_QUERY, (session['user_id'],))
         profile = c.fetchone()
-        conn.close()
 
         if not profile:
             return jsonify({'error': 'Profile not found'}), 404
@@ -655,7 +855,6 @@ def profile():
              data.get('dob'), json.dumps(skills), session['user_id'])
         )
         conn.commit()
-        conn.close()
 
         # Add notification
         add_notification(session['user_id'], 'Profile updated')
@@ -693,7 +892,6 @@ def upload_avatar():
         c.execute('UPDATE profiles SET avatar_filename = ? WHERE user_id = ?',
                   (filename, session['user_id']))
         conn.commit()
-        conn.close()
 
         url = f'/static/uploads/avatars/{filename}'
         return jsonify({'success': True, 'url': url, 'filename': filename})
@@ -704,62 +902,344 @@ def upload_avatar():
 @app.route('/api/notifications', methods=['GET'])
 @login_required
 def notifications():
-    """Get user notifications"""
+    """Get user notifications, newest first.
+    Paginated by keyset: pass the returned next_cursor as ?cursor= for the next page.
+    """
+    user_id = session['user_id']
+    try:
+        limit = min(max(int(request.args.get('limit', NOTIFICATIONS_PAGE_SIZE)), 1), NOTIFICATIONS_MAX_PAGE_SIZE)
+    except ValueError:
+        return jsonify({'error': 'limit must be an integer'}), 400
+
+    flush_pending_notifications(user_id)
+
     conn = get_db()
     c = conn.cursor()
-    c.execute(
-        'SELECT id, message, created_at, is_read FROM notifications WHERE user_id = ? ORDER BY created_at DESC LIMIT 20',
-        (session['user_id'],)
-    )
+    cursor = request.args.get('cursor')
+    if cursor:
+        try:
+            created_at, last_id = decode_notification_cursor(cursor)
+        except ValueError:
+            return jsonify({'error': 'Invalid cursor'}), 400
+        c.execute(NOTIFICATIONS_PAGE_QUERY, (user_id, created_at, last_id, limit + 1))
+    else:
+        c.execute(NOTIFICATIONS_QUERY, (user_id, limit + 1))
     notifs = c.fetchall()
-    conn.close()
+
+    # One extra row tells whether another page exists
+    next_cursor = None
+    if len(notifs) > limit:
+        notifs = notifs[:limit]
+        next_cursor = encode_notification_cursor(notifs[-1]['created_at'], notifs[-1]['id'])
 
     return jsonify({
         'notifications': [
             {'id': n['id'], 'message': n['message'], 'created_at': n['created_at'], 'is_read': n['is_read']}
             for n in notifs
-        ]
+        ],
+        'next_cursor': next_cursor,
+        'unread_count': unread_count(user_id)
+    })
+
+@app.route('/api/notifications/unread-count', methods=['GET'])
+@login_required
+def notifications_unread_count():
+    """Unread badge count, read from the trigger-maintained counter (no COUNT scan)"""
+    flush_pending_notifications(session['user_id'])
+    return jsonify({'unread_count': unread_count(session['user_id'])})
+
+@app.route('/api/notifications/mark-read', methods=['POST'])
+@login_required
+def mark_notifications_read():
+    """Mark notifications read: {"ids": [1, 2, ...]} or {"all": true}"""
+    user_id = session['user_id']
+    data = request.get_json(silent=True) or {}
+    ids = data.get('ids')
+    mark_all = data.get('all') is True
+
+    if not mark_all:
+        if not isinstance(ids, list) or not ids or not all(isinstance(i, int) for i in ids):
+            return jsonify({'error': 'Provide "ids" (a list of notification ids) or "all": true'}), 400
+        if len(ids) > MARK_READ_MAX_IDS:
+            return jsonify({'error': f'At most {MARK_READ_MAX_IDS} ids per call'}), 400
+
+    flush_pending_notifications(user_id)
+
+    conn = get_db()
+    c = conn.cursor()
+    if mark_all:
+        c.execute('UPDATE notifications SET is_read = 1 WHERE user_id = ? AND NOT is_read', (user_id,))
+    else:
+        placeholders = ','.join('?' * len(ids))
+        c.execute(
+            f'UPDATE notifications SET is_read = 1 WHERE user_id = ? AND NOT is_read AND id IN ({placeholders})',
+            (user_id, *ids)
+        )
+    updated = c.rowcount
+    conn.commit()
+
+    return jsonify({'success': True, 'updated': updated, 'unread_count': unread_count(user_id)})
+
+@app.route('/api/notifications/stream', methods=['GET'])
+@login_required
+def notifications_stream():
+    """Push new notifications as Server-Sent Events.
+
+    Each event's id is the notification id; a reconnecting browser sends the
+    last one as Last-Event-ID and gets everything after it replayed first.
+    A new stream without one starts after the newest existing notification.
+    """
+    user_id = session['user_id']
+    last_event_id = request.headers.get('Last-Event-ID') or request.args.get('last_event_id')
+    if last_event_id is not None:
+        try:
+            last_id = int(last_event_id)
+        except ValueError:
+            return jsonify({'error': 'Last-Event-ID must be a notification id'}), 400
+    else:
+        flush_pending_notifications(user_id)
+        last_id = get_db().execute(NOTIFICATIONS_LAST_ID_QUERY, (user_id,)).fetchone()[0] or 0
+
+    subscription = notification_hub.subscribe(user_id)
+    if subscription is None:
+        response = jsonify({'error': 'Too many notification streams; poll /api/notifications instead'})
+        response.headers['Retry-After'] = str(int(SSE_HEARTBEAT_SECONDS))
+        return response, 503
+
+    def events():
+        nonlocal last_id
+        deadline = time.monotonic() + SSE_MAX_STREAM_SECONDS
+        try:
+            yield f'retry: {SSE_RETRY_MS}\n\n'
+            woken = True   # replay anything after Last-Event-ID straight away
+            while True:
+                # Woken by this worker's sink, or a heartbeat: either way read what is new.
+                # The heartbeat read also picks up rows other workers wrote.
+                rows = get_db().execute(NOTIFICATIONS_SINCE_QUERY, (user_id, last_id, SSE_REPLAY_LIMIT)).fetchall()
+                if rows:
+                    last_id = rows[-1]['id']
+                    yield ''.join(format_notification_event(row) for row in rows)
+                    if len(rows) == SSE_REPLAY_LIMIT:
+                        continue
+                elif not woken:
+                    yield ': heartbeat\n\n'
+
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                woken = subscription.wait(min(SSE_HEARTBEAT_SECONDS, remaining))
+        finally:
+            subscription.close()
+
+    return Response(stream_with_context(events()), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no',   # keep nginx from buffering the stream
     })
 
+@app.route('/api/notifications/stream/stats', methods=['GET'])
+@diagnostics_required
+def notifications_stream_stats():
+    """Open SSE streams in this worker and hub counters"""
+    return jsonify(notification_hub.stats())
+
+def format_notification_event(row):
+    data = json.dumps({'id': row['id'], 'message': row['message'], 'created_at': row['created_at'],
+                       'is_read': row['is_read']})
+    return f"id: {row['id']}\nevent: notification\ndata: {data}\n\n"
+
+def flush_pending_notifications(user_id):
+    """Read your own writes: flush this worker's queued notifications for the user first"""
+    if notification_sink.has_pending(user_id):
+        try:
+            notification_sink.flush()
+        except sqlite3.Error:
+            pass  # still queued; the flusher retries
+
+def unread_count(user_id):
+    row = get_db().execute(UNREAD_COUNT_QUERY, (user_id,)).fetchone()
+    return row['unread'] if row else 0
+
+def encode_notification_cursor(created_at, notification_id):
+    raw = json.dumps([created_at, notification_id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+def decode_notification_cursor(cursor):
+    """Return (created_at, id) from a cursor; ValueError if it is malformed"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        created_at, notification_id = json.loads(raw)
+    except (TypeError, ValueError, UnicodeDecodeError) as e:
+        raise ValueError('Invalid cursor') from e
+    if not isinstance(created_at, str) or not isinstance(notification_id, int):
+        raise ValueError('Invalid cursor')
+    return created_at, notification_id
+
+@app.route('/api/job-postings/similar', methods=['POST'])
+def similar_job_postings():
+    """Return the k job postings most similar to a resume text (TF-IDF cosine).
+    Searches the memory-mapped job_index of the current model version.
+    """
+    data = request.get_json(silent=True) or {}
+    text = data.get('text', '')
+    if not isinstance(text, str) or not text.strip():
+        return jsonify({'error': 'No text provided'}), 400
+    try:
+        k = min(max(int(data.get('k', 10)), 1), MAX_SIMILAR_JOBS)
+    except (TypeError, ValueError):
+        return jsonify({'error': 'k must be an integer'}), 400
+
+    models = registry.current()
+    if not models.has('job_index'):
+        return jsonify({'error': 'No job posting index for this model version; '
+                                 'build it with python job_index.py <model dir> data/jobs_dataset.csv'}), 503
+
+    start = time.perf_counter()
+    index = models.get('job_index')
+    matches = index.search(models.get('vectorizer').transform([text]), k)
+    postings = index.postings([number for number, _ in matches])
+
+    return jsonify({
+        'success': True,
+        'postings': [
+            dict(posting, posting_id=number, score=round(score, 4))
+            for (number, score), posting in zip(matches, postings)
+        ],
+        'searched': index.n_postings,
+        'took_ms': round((time.perf_counter() - start) * 1000.0, 2),
+        'model_version': models.version
+    })
+
+@app.route('/api/resumes/<int:resume_id>/similar', methods=['GET'])
+@login_required
+def similar_resumes(resume_id):
+    """Return the predicted roles and skills of other users' resumes most similar to one of yours
+    (TF-IDF cosine), without anything identifying those users.
+    Uses the stored vectors; only a resume without one for this model version is vectorized.
+    """
+    user_id = session['user_id']
+    try:
+        k = min(max(int(request.args.get('k', 10)), 1), MAX_SIMILAR_RESUMES)
+    except ValueError:
+        return jsonify({'error': 'k must be an integer'}), 400
+
+    conn = get_db()
+    resume = conn.execute(
+        'SELECT r.id, c.extracted_text FROM resumes r '
+        'LEFT JOIN resume_contents c ON c.content_hash = r.content_hash '
+        'WHERE r.id = ? AND r.user_id = ?', (resume_id, user_id)
+    ).fetchone()
+    if resume is None:
+        return jsonify({'error': 'Resume not found'}), 404
+
+    models = registry.current()
+    row = conn.execute(RESUME_VECTOR_QUERY, (resume_id, models.version)).fetchone()
+    if row is not None:
+        query = vector_row(row['vector'], feature_count(models.get('vectorizer')))
+    elif resume['extracted_text'] and resume['extracted_text'].strip():
+        # Stored before vectors were kept, or under an older model version
+        query = store_resume_vector(conn, resume_id, user_id, resume['extracted_text'], models)
+        conn.commit()
+    else:
+        return jsonify({'error': 'No text was extracted from this resume'}), 422
+
+    start = time.perf_counter()
+    index = resume_index_for(models)
+    matches = index.search(query, k, exclude_user=user_id)
+
+    details = {}
+    if matches:
+        placeholders = ','.join('?' * len(matches))
+        for r in conn.execute(
+            f'SELECT id, prediction, extracted_skills_json FROM resumes WHERE id IN ({placeholders})',
+            [match[0] for match in matches]
+        ):
+            details[r['id']] = r
+
+    # Anonymized: no resume id, user or profile data of the other users
+    similar = []
+    for match_id, _, score in matches:
+        r = details.get(match_id)
+        if r is None:
+            continue
+        similar.append({
+            'prediction': r['prediction'],
+            'skills': json.loads(r['extracted_skills_json']) if r['extracted_skills_json'] else [],
+            'score': round(score, 4)
+        })
+
+    return jsonify({
+        'success': True,
+        'resume_id': resume_id,
+        'similar': similar,
+        'indexed_resumes': len(index),
+        'took_ms': round((time.perf_counter() - start) * 1000.0, 2),
+        'model_version': models.version
+    })
+
+def role_probabilities(models, X):
+    """Per-role probabilities of one feature row as (roles, probabilities, calibrated).
+
+    Versions trained with svm_calibration.npz use the calibrated SVM softmax.
+    Older ones use the best model's own predict_proba or, for a LinearSVC,
+    an uncalibrated softmax of its decision values (temperature 1): the
+    ranking is the SVM's, the probabilities are not fitted to accuracy.
+    A model with neither gives (None, None, False).
+    """
+    label_encoder = models.get('label_encoder')
+    if models.has('svm_calibration'):
+        svm_proba = models.get('svm_calibration')
+        return label_encoder.classes_[svm_proba.classes_], svm_proba.predict_proba(X)[0], True
+    model = models.get('best_model')
+    roles = label_encoder.classes_[model.classes_]
+    if hasattr(model, 'predict_proba'):
+        return roles, model.predict_proba(X)[0], False
+    if hasattr(model, 'decision_function'):
+        return roles, softmax(model.decision_function(X))[0], False
+    return None, None, False
+
 @app.route('/api/job-fit-analysis', methods=['POST'])
 def job_fit_analysis():
-    """Analyze fit for a specific job role"""
+    """Analyze fit for a specific job role, or for every role with {"all_roles": true}"""
     data = request.get_json()
     job_role = data.get('job_role', '').lower().strip()
     skills = data.get('skills', '')
     resume_text = data.get('resume_text', '')
+    rank_all = bool(data.get('all_roles'))
 
-    if not job_role or not skills:
+    if not skills or not (job_role or rank_all):
         return jsonify({'error': 'Job role and skills required'}), 400
 
     try:
-        # Load models
-        vectorizer = joblib.load('models/vectorizer.joblib')
-        model = joblib.load('models/best_model.joblib')
-        label_encoder = joblib.load('models/label_encoder.joblib')
+        # Pin the model version for the whole request
+        models = registry.current()
+        vectorizer = models.get('vectorizer')
+        label_encoder = models.get('label_encoder')
 
         # Vectorize the skills text
         X = vectorizer.transform([skills])
 
-        # Get prediction probabilities
-        try:
-            probabilities = model.predict_proba(X)[0]
+        # Per-role probabilities: one sparse dot product with the SVM weights plus a softmax
+        all_roles, probabilities, calibrated = role_probabilities(models, X)
+        if probabilities is None:
             all_roles = label_encoder.classes_
-
-            # Find the target job role in available roles
-            fit_score = 0.0
-            target_idx = None
-            for idx, role in enumerate(all_roles):
-                if job_role.lower() in role.lower() or role.lower() in job_role.lower():
+            role_probs = None
+            fit_score = 0.70  # No probability model in this version
+        else:
+            role_probs = {role: round(float(p), 4) for role, p in zip(all_roles, probabilities)}
+            fit_score = 0.65  # Default for roles not in training data
+
+        # Find the target job role in available roles
+        matched_role = None
+        for idx, role in enumerate(all_roles):
+            if job_role.lower() in role.lower() or role.lower() in job_role.lower():
+                if probabilities is not None:
                     fit_score = float(probabilities[idx])
-                    target_idx = idx
-                    break
+                matched_role = role
+                break
 
-            # If exact match not found, use closest match or default
-            if target_idx is None:
-                fit_score = 0.65  # Default for roles not in training data
-        except:
-            fit_score = 0.70
+        # Coverage and missing skills for every role from the training-time role x skill matrix
+        user_skills = [skill_matcher.canonical(skill) or skill for skill in skills.split(',') if skill.strip()]
+        skill_gaps = models.get('role_skills').analyze(user_skills) if models.has('role_skills') else {}
 
         # Determine skills match quality
         user_skills_set = set(skill.lower().strip() for skill in skills.split(','))
@@ -783,25 +1263,225 @@ def job_fit_analysis():
         else:
             experience_level = 'Junior'
 
-        return jsonify({
+        if rank_all:
+            if role_probs is None and not skill_gaps:
+                return jsonify({'error': 'This model version has neither role probabilities nor role_skills.npz '
+                                         'to rank roles by; retrain with python train_model.py'}), 503
+            # Without probabilities, roles are ranked by skill coverage alone (fit_score is null)
+            ranked_by = 'fit_score' if role_probs is not None else 'skill_coverage'
+            roles = sorted((
+                dict({'role': role, 'fit_score': role_probs[role] if role_probs is not None else None},
+                     **skill_gaps.get(role, {}))
+                for role in all_roles
+            ), key=lambda r: r.get(ranked_by) or 0.0, reverse=True)
+            return jsonify({
+                'success': True,
+                'roles': roles,
+                'best_role': roles[0]['role'],
+                'ranked_by': ranked_by,
+                'calibrated': calibrated,
+                'skills_match': skills_match,
+                'experience_level': experience_level,
+                'message': f'Analysis complete for {len(roles)} roles',
+                'model_version': models.version
+            })
+
+        return jsonify(dict({
             'success': True,
             'job_role': job_role.title(),
             'fit_score': fit_score,
+            'matched_role': matched_role,
+            'role_probabilities': role_probs,
+            'calibrated': calibrated,
             'skills_match': skills_match,
             'experience_level': experience_level,
-            'message': f'Analysis complete for {job_role.title()}'
-        })
+            'message': f'Analysis complete for {job_role.title()}',
+            'model_version': models.version
+        }, **skill_gaps.get(matched_role, {})))
 
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/cache/stats', methods=['GET'])
+@diagnostics_required
+def cache_stats():
+    """Report result cache size and shared hit/miss counters"""
+    return jsonify(result_cache.stats())
+
+@app.route('/api/models/status', methods=['GET'])
+@diagnostics_required
+def models_status():
+    """Report load time and memory footprint of the loaded model artifacts"""
+    return jsonify(registry.stats())
+
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+def job_status(job_id):
+    """Progress and result of a queued resume analysis"""
+    job = job_queue.get(job_id)
+    # Jobs of logged-in users are only visible to their owner
+    if job is None or (job['user_id'] and job['user_id'] != session.get('user_id')):
+        return jsonify({'error': 'Job not found'}), 404
+
+    return jsonify({
+        'success': True,
+        'job_id': job['id'],
+        'status': job['status'],
+        'stage': job['stage'],
+        'progress': job['progress'],
+        'attempts': job['attempts'],
+        'max_attempts': job['max_attempts'],
+        'result': job['result'],
+        'error': job['error'],
+        'created_at': job['created_at'],
+        'updated_at': job['updated_at']
+    })
+
+@app.route('/api/jobs/stats', methods=['GET'])
+@diagnostics_required
+def job_stats():
+    """Job counts per status and worker settings"""
+    return jsonify(job_queue.stats())
+
 def add_notification(user_id, message):
-    """Add notification for user"""
+    """Queue a notification for user; it is inserted with the next batched flush"""
+    notification_sink.add(user_id, message)
+
+@app.cli.command('migrate-uploads')
+def migrate_uploads():
+    """Move legacy timestamped resume files into the content-addressed store"""
+    resumes_dir = os.path.join(app.config['UPLOAD_FOLDER'], 'resumes')
     conn = get_db()
     c = conn.cursor()
-    c.execute('INSERT INTO notifications (user_id, message) VALUES (?, ?)', (user_id, message))
-    conn.commit()
-    conn.close()
+    moved = duplicates = 0
+    for name in sorted(os.listdir(resumes_dir)):
+        file_path = os.path.join(resumes_dir, name)
+        if not os.path.isfile(file_path) or not allowed_file(name):
+            continue
+        content_hash, _, was_moved = upload_store.import_file(file_path)
+        c.execute('UPDATE resumes SET content_hash = ? WHERE file_name = ?', (content_hash, name))
+        conn.commit()
+        moved += was_moved
+        duplicates += not was_moved
+    print(f"[+] Moved {moved} files into the upload store, removed {duplicates} duplicates")
+
+@app.cli.command('gc-uploads')
+@click.option('--max-age-days', type=float, default=UPLOAD_RETENTION_DAYS, show_default=True,
+              help='Remove files whose newest resume is older than this (0 keeps them).')
+@click.option('--batch-size', type=int, default=UPLOAD_GC_BATCH_SIZE, show_default=True,
+              help='Files checked per database round trip and commit.')
+@click.option('--max-batches', type=int, default=0, help='Stop after this many batches (0 = no limit).')
+@click.option('--dry-run', is_flag=True, help='Only report what would be removed.')
+def gc_uploads(max_age_days, batch_size, max_batches, dry_run):
+    """Remove resume files that no resume refers to or that are past retention"""
+    now = time.time()
+    cutoff = None
+    if max_age_days > 0:
+        # resumes.uploaded_at is CURRENT_TIMESTAMP, i.e. UTC 'YYYY-MM-DD HH:MM:SS'
+        cutoff = (datetime.utcnow() - timedelta(days=max_age_days)).strftime('%Y-%m-%d %H:%M:%S')
+
+    conn = get_db()
+    c = conn.cursor()
+    checked = removed = freed = batches = 0
+    for batch in upload_store.iter_files(batch_size):
+        by_hash = {entry.content_hash: entry for entry in batch if entry.content_hash}
+        by_name = {entry.name: entry for entry in batch if not entry.content_hash}
+
+        # Newest upload referencing each file, one query per key type
+        newest = {}
+        if by_hash:
+            placeholders = ','.join('?' * len(by_hash))
+            c.execute(RESUME_LAST_UPLOAD_BY_HASH_QUERY.format(placeholders=placeholders), list(by_hash))
+            newest.update(c.fetchall())
+        if by_name:
+            # Legacy files only; no index needed for a one-off cleanup
+            placeholders = ','.join('?' * len(by_name))
+            c.execute(
+                f'SELECT file_name, MAX(uploaded_at) FROM resumes '
+                f'WHERE file_name IN ({placeholders}) GROUP BY file_name',
+                list(by_name)
+            )
+            newest.update(c.fetchall())
+
+        doomed = []
+        for entry in batch:
+            last_upload = newest.get(entry.content_hash or entry.name)
+            if last_upload is None:
+                expired = now - entry.mtime > UPLOAD_GC_GRACE_SECONDS
+            else:
+                expired = cutoff is not None and last_upload < cutoff
+            if expired:
+                doomed.append(entry)
+
+        if not dry_run:
+            for entry in doomed:
+                upload_store.remove(entry.path)
+            c.executemany(
+                'DELETE FROM resume_contents WHERE content_hash = ?',
+                [(entry.content_hash,) for entry in doomed if entry.content_hash]
+            )
+            conn.commit()
+
+        checked += len(batch)
+        removed += len(doomed)
+        freed += sum(entry.size for entry in doomed)
+        batches += 1
+        if max_batches and batches >= max_batches:
+            break
+
+    action = 'would remove' if dry_run else 'removed'
+    print(f"[+] Checked {checked} files, {action} {removed} ({freed / 1024:.1f} KB)")
+
+@app.cli.command('vectorize-resumes')
+@click.option('--batch-size', default=500, show_default=True, help='Resumes vectorized per transaction')
+def vectorize_resumes(batch_size):
+    """Store TF-IDF vectors for resumes that have none for the current model version.
+    Run after upgrading, and after a new model version is trained.
+    """
+    models = registry.current()
+    vectorizer = models.get('vectorizer')
+    conn = get_db()
+    last_id, stored = 0, 0
+    while True:
+        rows = conn.execute(
+            'SELECT r.id, r.user_id, c.extracted_text FROM resumes r '
+            'JOIN resume_contents c ON c.content_hash = r.content_hash '
+            'WHERE r.id > ? AND NOT EXISTS (SELECT 1 FROM resume_vectors v '
+            'WHERE v.resume_id = r.id AND v.model_version = ?) ORDER BY r.id LIMIT ?',
+            (last_id, models.version, batch_size)
+        ).fetchall()
+        if not rows:
+            break
+        last_id = rows[-1]['id']
+        rows = [r for r in rows if r['extracted_text'] and r['extracted_text'].strip()]
+        if rows:
+            # One vectorizer pass per batch
+            matrix = vectorizer.transform([r['extracted_text'] for r in rows])
+            conn.executemany(INSERT_RESUME_VECTOR, [
+                (r['id'], r['user_id'], models.version, encode_vector(matrix[i]))
+                for i, r in enumerate(rows)
+            ])
+            conn.commit()
+            stored += len(rows)
+    print(f"[+] Stored {stored} resume vectors for model version {models.version}")
+
+@app.cli.command('check-query-plans')
+def check_query_plans():
+    """Fail if a hot query would scan a whole table or sort in a temp B-tree.
+    Runs EXPLAIN QUERY PLAN against a freshly migrated scratch database.
+    """
+    with tempfile.TemporaryDirectory() as scratch:
+        path = os.path.join(scratch, 'plans.db')
+        migrate(path)
+        conn = sqlite3.connect(path)
+        failures = 0
+        for name, (sql, params) in HOT_QUERIES.items():
+            problems = query_plan_problems(conn, sql, params)
+            failures += bool(problems)
+            print(f"[{'FAIL' if problems else 'ok'}] {name}" + ''.join(f'\n       {p}' for p in problems))
+        conn.close()
+    if failures:
+        raise SystemExit(1)
+    print(f"[+] All {len(HOT_QUERIES)} hot queries use an index")
 
 # Error handlers
 @app.errorhandler(404)
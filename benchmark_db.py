@@ -0,0 +1,151 @@
+"""
+Smart Career Advisor - Database Benchmark
+Measures requests/sec of DB-bound endpoints under concurrent gunicorn workers
+
+Starts `gunicorn app:app` on a scratch copy of sca.db, signs up a benchmark
+user, then hammers each endpoint from many client threads for a fixed time
+and prints throughput and latency percentiles.
+
+Usage:
+    python benchmark_db.py [--workers 4] [--concurrency 16] [--duration 10]
+"""
+
+import argparse
+import http.client
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import uuid
+
+ENDPOINTS = [
+    ('GET', '/api/profile', None),
+    ('GET', '/api/notifications', None),
+    ('POST', '/api/profile', {'full_name': 'Bench User', 'initials': 'BU', 'skills': ['Python', 'SQL']}),
+]
+
+
+def request(port, method, path, body=None, cookie=None):
+    conn = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+    headers = {'Content-Type': 'application/json'}
+    if cookie:
+        headers['Cookie'] = cookie
+    conn.request(method, path, body=json.dumps(body) if body is not None else None, headers=headers)
+    response = conn.getresponse()
+    payload = response.read()
+    cookies = response.headers.get_all('Set-Cookie') or []
+    conn.close()
+    return response.status, payload, cookies
+
+
+def wait_until_ready(port, timeout=120):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            if request(port, 'GET', '/api/session')[0] == 200:
+                return
+        except OSError:
+            pass
+        time.sleep(0.5)
+    raise RuntimeError('gunicorn did not start in time')
+
+
+def sign_up(port):
+    """Create a benchmark user and return its session cookie"""
+    name = f'bench_{uuid.uuid4().hex[:8]}'
+    status, payload, cookies = request(port, 'POST', '/signup', {
+        'username': name, 'email': f'{name}@example.com',
+        'password': 'benchmark', 'confirm_password': 'benchmark'
+    })
+    session_cookie = next((c.split(';', 1)[0] for c in cookies if c.startswith('session=')), None)
+    if status not in (200, 201) or not session_cookie:
+        raise RuntimeError(f'Signup failed ({status}): {payload[:200]!r}')
+    return session_cookie
+
+
+def run_endpoint(port, cookie, method, path, body, concurrency, duration):
+    """Issue requests from `concurrency` threads for `duration` seconds"""
+    latencies = []
+    errors = [0]
+    lock = threading.Lock()
+    stop_at = time.perf_counter() + duration
+
+    def client():
+        local, failed = [], 0
+        while time.perf_counter() < stop_at:
+            start = time.perf_counter()
+            try:
+                status = request(port, method, path, body, cookie)[0]
+            except OSError:
+                status = None
+            if status == 200:
+                local.append(time.perf_counter() - start)
+            else:
+                failed += 1
+        with lock:
+            latencies.extend(local)
+            errors[0] += failed
+
+    threads = [threading.Thread(target=client) for _ in range(concurrency)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    pick = lambda q: latencies[min(len(latencies) - 1, int(q * len(latencies)))] * 1000 if latencies else 0.0
+    return {
+        'requests': len(latencies),
+        'errors': errors[0],
+        'rps': len(latencies) / elapsed,
+        'p50_ms': pick(0.50),
+        'p95_ms': pick(0.95),
+        'p99_ms': pick(0.99),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[1])
+    parser.add_argument('--workers', type=int, default=4, help='gunicorn worker processes')
+    parser.add_argument('--concurrency', type=int, default=16, help='client threads')
+    parser.add_argument('--duration', type=float, default=10, help='seconds per endpoint')
+    parser.add_argument('--port', type=int, default=5055)
+    parser.add_argument('--database', default='sca.db', help='database to copy for the run')
+    args = parser.parse_args()
+
+    scratch = tempfile.mkdtemp(prefix='sca-bench-')
+    database = os.path.join(scratch, 'sca.db')
+    shutil.copy(args.database, database)
+
+    env = dict(os.environ, SCA_DATABASE=database, SCA_MODEL_RELOAD_INTERVAL='0', SCA_JOB_WORKERS='0',
+               SCA_CACHE_DATABASE=os.path.join(scratch, 'cache.db'),
+               SCA_JOB_DATABASE=os.path.join(scratch, 'jobs.db'))
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', '-w', str(args.workers), '-b', f'127.0.0.1:{args.port}',
+         '--log-level', 'warning', 'app:app'],
+        env=env, stdout=subprocess.DEVNULL
+    )
+    try:
+        wait_until_ready(args.port)
+        cookie = sign_up(args.port)
+
+        print(f"[*] gunicorn -w {args.workers}, {args.concurrency} client threads, {args.duration:g}s per endpoint")
+        print(f"{'endpoint':<24}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'errors':>8}")
+        for method, path, body in ENDPOINTS:
+            result = run_endpoint(args.port, cookie, method, path, body, args.concurrency, args.duration)
+            print(f"{method + ' ' + path:<24}{result['rps']:>10.1f}{result['p50_ms']:>10.1f}"
+                  f"{result['p95_ms']:>10.1f}{result['p99_ms']:>10.1f}{result['errors']:>8}")
+    finally:
+        server.terminate()
+        server.wait()
+        shutil.rmtree(scratch, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
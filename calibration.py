@@ -0,0 +1,124 @@
+"""
+Smart Career Advisor - SVM Probability Calibration
+Temperature-scaled softmax over the LinearSVC decision function
+
+LinearSVC has no predict_proba. train_model.py fits one temperature T on
+decision values of training rows held out from the model that produced
+them (minimizing log loss), reports log loss and ECE on the test split, and
+saves T together with the SVM's weights as svm_calibration.npz. Per-role
+probabilities are then
+
+    softmax((X @ coef.T + intercept) / T)
+
+one sparse-times-dense product and a softmax, far cheaper than walking the
+forest. A single temperature rescales all scores alike, so the predicted
+role (the argmax) is exactly the SVM's.
+"""
+
+import sys
+
+import numpy as np
+from scipy.optimize import minimize_scalar
+
+# Search range of log(T) while fitting
+LOG_TEMPERATURE_BOUNDS = (-5.0, 5.0)
+# Bins of the expected calibration error reported after fitting
+ECE_BINS = 10
+
+
+def softmax(scores, temperature=1.0):
+    """Row-wise softmax of scores / temperature"""
+    z = np.asarray(scores, dtype=np.float64) / temperature
+    z -= z.max(axis=1, keepdims=True)
+    np.exp(z, out=z)
+    z /= z.sum(axis=1, keepdims=True)
+    return z
+
+
+def log_loss(proba, y):
+    return float(-np.mean(np.log(np.clip(proba[np.arange(len(y)), y], 1e-12, 1.0))))
+
+
+def expected_calibration_error(proba, y, bins=ECE_BINS):
+    """Gap between confidence and accuracy, averaged over confidence bins"""
+    confidence = proba.max(axis=1)
+    correct = proba.argmax(axis=1) == y
+    edges = np.linspace(0.0, 1.0, bins + 1)
+    which = np.clip(np.digitize(confidence, edges[1:-1]), 0, bins - 1)
+    counts = np.bincount(which, minlength=bins)
+    gaps = np.abs(np.bincount(which, weights=confidence, minlength=bins)
+                  - np.bincount(which, weights=correct, minlength=bins))
+    return float(gaps.sum() / max(counts.sum(), 1))
+
+
+def fit_temperature(decision, y):
+    """Return the temperature T minimizing the log loss of softmax(decision / T).
+
+    y holds class indices aligned with the decision columns.
+    """
+    result = minimize_scalar(
+        lambda log_t: log_loss(softmax(decision, np.exp(log_t)), y),
+        bounds=LOG_TEMPERATURE_BOUNDS, method='bounded'
+    )
+    return float(np.exp(result.x))
+
+
+def calibration_metrics(decision, y, temperature):
+    """Log loss and ECE of softmax(decision) before and after dividing by temperature"""
+    raw, calibrated = softmax(decision), softmax(decision, temperature)
+    return {
+        'temperature': temperature,
+        'log_loss_uncalibrated': log_loss(raw, y),
+        'log_loss': log_loss(calibrated, y),
+        'ece_uncalibrated': expected_calibration_error(raw, y),
+        'ece': expected_calibration_error(calibrated, y),
+    }
+
+
+def export_svm_calibration(svm_model, temperature, path):
+    """Write the SVM weights and fitted temperature to an .npz file"""
+    np.savez(
+        path,
+        coef=np.asarray(svm_model.coef_, dtype=np.float32),
+        intercept=np.asarray(svm_model.intercept_, dtype=np.float32),
+        classes=np.asarray(svm_model.classes_),
+        temperature=np.float64(temperature),
+    )
+
+
+class CalibratedSVM:
+    """Per-role probabilities of a LinearSVC from one matrix product and a softmax"""
+
+    def __init__(self, coef, intercept, classes, temperature):
+        self.coef_t = np.ascontiguousarray(np.asarray(coef, dtype=np.float32).T)
+        self.intercept = np.asarray(intercept, dtype=np.float32)
+        self.classes_ = np.asarray(classes)
+        self.temperature = float(temperature)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            return cls(data['coef'], data['intercept'], data['classes'], data['temperature'])
+
+    @property
+    def nbytes(self):
+        return self.coef_t.nbytes + self.intercept.nbytes
+
+    def decision_function(self, X):
+        return np.asarray(X @ self.coef_t) + self.intercept
+
+    def predict_proba(self, X):
+        return softmax(self.decision_function(X), self.temperature)
+
+    def predict(self, X):
+        return self.classes_[np.argmax(self.decision_function(X), axis=1)]
+
+
+if __name__ == '__main__':
+    # Usage: python calibration.py models/svm_model.joblib models/svm_calibration.npz [temperature]
+    # Exports an existing SVM with a given temperature (default 1.0, i.e. uncalibrated).
+    import joblib
+
+    source, target = sys.argv[1:3]
+    export_svm_calibration(joblib.load(source), float(sys.argv[3]) if len(sys.argv) > 3 else 1.0, target)
+    print(f"[+] Saved: {target}")
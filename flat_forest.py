@@ -0,0 +1,140 @@
+"""
+Smart Career Advisor - Flattened Random Forest
+Array-backed inference for the RandomForestClassifier trained by train_model.py
+
+All trees are concatenated into contiguous NumPy arrays (feature, threshold,
+left/right child, leaf probabilities) and evaluated together: every
+(row, tree) pair advances one level per step, so a batch of rows walks all
+100 trees in at most max_depth vectorized steps.
+"""
+
+import sys
+
+import numpy as np
+
+# Rows densified per step; bounds the temporary dense block to ~5 MB at 5000 features
+CHUNK_ROWS = 256
+
+
+def flatten_forest(rf_model):
+    """Concatenate the trees of a fitted RandomForestClassifier into flat arrays"""
+    features, thresholds, lefts, rights, values, roots = [], [], [], [], [], []
+    depth = 0
+    offset = 0
+    for estimator in rf_model.estimators_:
+        tree = estimator.tree_
+        n = tree.node_count
+        is_leaf = tree.children_left < 0
+        node_ids = np.arange(n)
+
+        # Leaves point at themselves so extra steps are no-ops
+        lefts.append(np.where(is_leaf, node_ids, tree.children_left) + offset)
+        rights.append(np.where(is_leaf, node_ids, tree.children_right) + offset)
+        features.append(np.where(is_leaf, 0, tree.feature))
+        thresholds.append(np.where(is_leaf, np.inf, tree.threshold))
+
+        # Per-leaf class probabilities, as DecisionTreeClassifier.predict_proba computes them
+        value = tree.value[:, 0, :].astype(np.float64)
+        totals = value.sum(axis=1, keepdims=True)
+        totals[totals == 0.0] = 1.0
+        values.append(value / totals)
+
+        roots.append(offset)
+        depth = max(depth, tree.max_depth)
+        offset += n
+
+    return {
+        'feature': np.concatenate(features).astype(np.int32),
+        'threshold': np.concatenate(thresholds).astype(np.float64),
+        'left': np.concatenate(lefts).astype(np.int32),
+        'right': np.concatenate(rights).astype(np.int32),
+        'value': np.concatenate(values),
+        'roots': np.asarray(roots, dtype=np.int32),
+        'classes': np.asarray(rf_model.classes_),
+        'max_depth': np.int32(depth),
+        'n_features': np.int32(rf_model.n_features_in_),
+    }
+
+
+def export_flat_forest(rf_model, path):
+    """Write the flattened forest to an .npz file"""
+    np.savez(path, **flatten_forest(rf_model))
+
+
+class FlatForest:
+    """Drop-in replacement for RandomForestClassifier.predict / predict_proba"""
+
+    def __init__(self, arrays):
+        self.feature = arrays['feature']
+        self.threshold = arrays['threshold']
+        self.left = arrays['left']
+        self.right = arrays['right']
+        self.value = arrays['value']
+        self.roots = arrays['roots']
+        self.classes_ = arrays['classes']
+        self.max_depth = int(arrays['max_depth'])
+        self.n_features_in_ = int(arrays['n_features'])
+        self.is_leaf = self.left == np.arange(len(self.left))
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            return cls({key: data[key] for key in data.files})
+
+    @property
+    def nbytes(self):
+        return sum(a.nbytes for a in (self.feature, self.threshold, self.left,
+                                      self.right, self.value, self.roots))
+
+    def _walk(self, block):
+        """Leaf index reached by every row of a block in every tree, shape (rows, trees)"""
+        # Densify into one flat float32 array indexed by row * n_features + feature;
+        # trees compare float32 feature values, exactly like sklearn's tree code
+        n_rows, n_features = block.shape
+        if hasattr(block, 'tocsr'):
+            block = block.tocsr()
+            flat = np.zeros(n_rows * n_features, dtype=np.float32)
+            nnz_rows = np.repeat(np.arange(n_rows, dtype=np.int64), np.diff(block.indptr))
+            flat[nnz_rows * n_features + block.indices] = block.data
+        else:
+            flat = np.asarray(block, dtype=np.float32).ravel()
+        row_offset = (np.arange(n_rows, dtype=np.int64) * n_features)[:, None]
+        node = np.broadcast_to(self.roots, (n_rows, len(self.roots))).ravel().copy()
+        base = np.broadcast_to(row_offset, (n_rows, len(self.roots))).ravel()
+
+        # Only (row, tree) pairs still at an internal node advance each step
+        active = np.arange(node.size)
+        for _ in range(self.max_depth):
+            current = node.take(active)
+            go_left = flat.take(base.take(active) + self.feature.take(current)) <= self.threshold.take(current)
+            current = np.where(go_left, self.left.take(current), self.right.take(current))
+            node[active] = current
+            active = active[~self.is_leaf.take(current)]
+            if not active.size:
+                break
+        return node.reshape(n_rows, len(self.roots))
+
+    def apply(self, X):
+        """Return the leaf index reached in every tree, shape (n_rows, n_trees)"""
+        return np.vstack([self._walk(X[start:start + CHUNK_ROWS])
+                          for start in range(0, X.shape[0], CHUNK_ROWS)])
+
+    def predict_proba(self, X):
+        """Average the leaf class probabilities of all trees"""
+        proba = np.empty((X.shape[0], len(self.classes_)))
+        for start in range(0, X.shape[0], CHUNK_ROWS):
+            leaves = self._walk(X[start:start + CHUNK_ROWS])
+            proba[start:start + len(leaves)] = self.value[leaves].mean(axis=1)
+        return proba
+
+    def predict(self, X):
+        return self.classes_[np.argmax(self.predict_proba(X), axis=1)]
+
+
+if __name__ == '__main__':
+    # Usage: python flat_forest.py models/rf_model.joblib models/rf_flat.npz
+    import joblib
+
+    source, target = sys.argv[1:3]
+    export_flat_forest(joblib.load(source), target)
+    print(f"[+] Saved: {target}")
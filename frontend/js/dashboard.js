@@ -1,5 +1,5 @@
 // Smart Career Advisor - Dashboard JavaScript
-// Handles profile management, avatar upload, and resume handling on the dashboard
+// Handles profile management, avatar upload, resume handling and notifications on the dashboard
 const API_BASE = 'https://sca-backend-n7ic.onrender.com';
 
 document.addEventListener('DOMContentLoaded', () => {
@@ -25,6 +25,7 @@ async function checkDashboardAuth() {
         setupAvatarUpload();
         setupResumeUpload();
         setupEditProfileModal();
+        setupNotifications();
     } catch (err) {
         console.error('Auth check failed:', err);
         // On error, redirect to home to be safe
@@ -267,6 +268,7 @@ function setupResumeUpload() {
                 if (data.success) {
                     displayResumePreview(data);
                     showSuccessPopup(data.message || 'Resume uploaded successfully');
+                    if (!notificationsPushed()) loadNotifications();   // otherwise it is pushed
 
                     // Reset input
                     resumeInput.value = '';
@@ -389,6 +391,66 @@ function setupEditProfileModal() {
     });
 }
 
+// ===== NOTIFICATIONS =====
+// The list is loaded once, then new notifications are pushed over Server-Sent Events.
+// The browser reconnects on its own and replays what it missed via Last-Event-ID.
+let notificationStream = null;
+
+function setupNotifications() {
+    loadNotifications();
+    if (!window.EventSource) return;
+
+    notificationStream = new EventSource(`${API_BASE}/api/notifications/stream`, { withCredentials: true });
+    notificationStream.addEventListener('notification', event => {
+        const list = document.getElementById('notifList');
+        if (!list) return;
+        list.querySelector('.empty-msg')?.remove();
+        list.prepend(createNotificationItem(JSON.parse(event.data)));
+
+        const badge = document.getElementById('notifBadge');
+        badge.textContent = badge.style.display === 'none' ? 1 : Number(badge.textContent) + 1;
+        badge.style.display = 'block';
+    });
+}
+
+// False when the stream was refused (e.g. 503 at the per-worker stream cap) and the list must be polled
+function notificationsPushed() {
+    return notificationStream !== null && notificationStream.readyState !== EventSource.CLOSED;
+}
+
+function loadNotifications() {
+    fetch(`${API_BASE}/api/notifications`, {
+        credentials: 'include'
+    })
+        .then(r => r.json())
+        .then(data => {
+            const list = document.getElementById('notifList');
+            const badge = document.getElementById('notifBadge');
+            if (!list || !data.notifications) return;
+
+            list.innerHTML = '';
+            if (data.notifications.length === 0) {
+                list.innerHTML = '<p class="empty-msg">No notifications yet</p>';
+            } else {
+                data.notifications.forEach(n => list.appendChild(createNotificationItem(n)));
+            }
+            badge.textContent = data.unread_count;
+            badge.style.display = data.unread_count > 0 ? 'block' : 'none';
+        })
+        .catch(err => console.error('Notifications load error:', err));
+}
+
+function createNotificationItem(notification) {
+    const item = document.createElement('div');
+    item.className = 'notif-item';
+    const message = document.createElement('p');
+    message.textContent = notification.message;
+    const date = document.createElement('small');
+    date.textContent = new Date(notification.created_at).toLocaleDateString();
+    item.append(message, date);
+    return item;
+}
+
 // Helper function to create avatar placeholder (from main.js)
 function createAvatarPlaceholder(container, username) {
     if (!container) return;
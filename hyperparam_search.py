@@ -0,0 +1,143 @@
+"""
+Smart Career Advisor - Hyperparameter Search
+Successive halving over model and vectorizer settings, on all cores
+
+Every candidate (an estimator, a named feature set and its parameters)
+starts on a small random subset of the training rows. After each rung only
+the best 1/SCA_SEARCH_ETA of the candidates survive, and the next rung gives
+them SCA_SEARCH_ETA times more rows, until the last rung fits on all of them.
+Most of the budget thus goes to the few settings still in the running.
+
+Candidates are scored on a validation split carved out of the training
+rows, never on the test split that train_model reports. Ties in accuracy go
+to the faster model to train, then to the faster one to serve. Each rung
+runs in a process pool; the feature matrices are sent to every worker once,
+when it starts.
+
+Every fit is recorded for the leaderboard: accuracy, train time, and
+inference latency per row in a batch and for a single row. Forests are timed
+in the flattened form the app serves them in.
+"""
+
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.svm import LinearSVC
+
+from flat_forest import FlatForest, flatten_forest
+
+ETA = int(os.environ.get('SCA_SEARCH_ETA', 3))
+SEARCH_WORKERS = int(os.environ.get('SCA_SEARCH_WORKERS', os.cpu_count() or 1))
+# Fewest training rows a candidate is fitted on
+MIN_ROWS = 500
+# Single-row predictions timed per candidate
+LATENCY_ROWS = 20
+
+ESTIMATORS = {
+    'svm': LinearSVC,
+    'rf': RandomForestClassifier,
+}
+
+# Feature sets of this process: name -> (X_fit, y_fit, X_val, y_val), the row order
+# and the fixed parameters of every estimator
+_data = {}
+
+
+def _init_worker(data):
+    global _data
+    _data = data
+
+
+def serving_model(kind, model):
+    """The object the app predicts with for a fitted estimator"""
+    return FlatForest(flatten_forest(model)) if kind == 'rf' else model
+
+
+def evaluate(kind, feature_set, params, rows):
+    """Fit one candidate on the first `rows` shuffled training rows and score it"""
+    X_fit, y_fit, X_val, y_val = _data['sets'][feature_set]
+    subset = _data['order'][:rows]
+
+    model = ESTIMATORS[kind](**dict(_data['base_params'].get(kind, {}), **params))
+    start = time.perf_counter()
+    model.fit(X_fit[subset], y_fit[subset])
+    train_time = time.perf_counter() - start
+
+    served = serving_model(kind, model)
+    start = time.perf_counter()
+    accuracy = float(np.mean(served.predict(X_val) == y_val))
+    batch_time = time.perf_counter() - start
+    single = []
+    for i in range(min(LATENCY_ROWS, X_val.shape[0])):
+        start = time.perf_counter()
+        served.predict(X_val[i])
+        single.append(time.perf_counter() - start)
+
+    return {
+        'model': kind,
+        'features': feature_set,
+        'params': params,
+        'rows': int(rows),
+        'accuracy': round(accuracy, 6),
+        'train_time_s': round(train_time, 4),
+        'latency_ms_per_row': round(batch_time * 1000.0 / X_val.shape[0], 6),
+        'latency_ms_single': round(float(np.median(single)) * 1000.0, 4),
+    }
+
+
+def rank(results):
+    return sorted(results, key=lambda r: (-r['accuracy'], r['train_time_s'], r['latency_ms_single']))
+
+
+def successive_halving(candidates, sets, base_params=None, eta=ETA, workers=SEARCH_WORKERS, min_rows=MIN_ROWS,
+                       seed=42):
+    """Return (best result, every result) for candidates [(kind, feature set name, params)].
+
+    sets maps feature set names to (X_fit, y_fit, X_val, y_val); all of them
+    must hold the same training rows, in the same order. base_params holds
+    the fixed parameters per kind that every candidate's params are added to.
+    Raises ValueError if there are no candidates.
+    """
+    if not candidates:
+        raise ValueError('successive_halving needs at least one candidate')
+    n_rows = next(iter(sets.values()))[0].shape[0]
+    data = {'sets': sets, 'order': np.random.RandomState(seed).permutation(n_rows),
+            'base_params': base_params or {}}
+    # Halvings until one candidate is left (integer powers; math.log rounds)
+    rungs = 0
+    while eta ** rungs < len(candidates):
+        rungs += 1
+
+    pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(data,)) \
+        if workers > 1 else None
+    if pool is None:
+        _init_worker(data)
+    leaderboard = []
+    try:
+        for rung in range(rungs + 1):
+            rows = min(n_rows, max(min_rows, n_rows // eta ** (rungs - rung)))
+            jobs = [(kind, feature_set, params, rows) for kind, feature_set, params in candidates]
+            start = time.perf_counter()
+            if pool is None:
+                results = [evaluate(*job) for job in jobs]
+            else:
+                results = list(pool.map(evaluate, *zip(*jobs)))
+            for result in results:
+                result['rung'] = rung
+            leaderboard.extend(results)
+
+            ranked = rank(results)
+            print(f"[Search] Rung {rung + 1}/{rungs + 1}: {len(jobs)} candidates on {rows} rows "
+                  f"in {time.perf_counter() - start:.1f} s, best {ranked[0]['accuracy']:.4f} "
+                  f"({ranked[0]['features']}, {ranked[0]['params']})")
+            keep = max(1, math.ceil(len(ranked) / eta))
+            candidates = [(r['model'], r['features'], r['params']) for r in ranked[:keep]]
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    return ranked[0], leaderboard
@@ -0,0 +1,302 @@
+"""
+Smart Career Advisor - Ensemble Inference
+Scores resume texts with one vectorizer pass and one call per model, for
+single requests, batch requests and micro-batched concurrent requests alike
+"""
+
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+import numpy as np
+
+# Thresholds and defaults of the /api/predict-role ensemble
+UNCERTAINTY_THRESHOLD = 0.65
+UNCERTAINTY_MESSAGE = "Prediction is uncertain. Please improve your resume with more specific skills and achievements."
+FALLBACK_ROLE = 'Full Stack Developer'
+DEFAULT_CONFIDENCE = 0.75  # used when a model cannot produce scores
+TOP_K = 3
+
+
+class ModelInconsistencyError(ValueError):
+    """The label encoder does not contain exactly the required roles"""
+
+
+class EnsembleScorer:
+    """SVM + Random Forest ensemble over one ModelSet.
+
+    Each model scores the input matrix exactly once (decision_function for
+    the SVM, predict_proba for the forest); predictions, confidences, top-k
+    and the agreement/confidence voting are all derived from those arrays
+    with NumPy operations over the whole batch. Labels come from a
+    precomputed array instead of label_encoder.inverse_transform calls.
+    """
+
+    def __init__(self, models, required_roles):
+        self.version = models.version
+        self.vectorizer = models.get('vectorizer')
+        self.labels = np.asarray(models.get('label_encoder').classes_, dtype=object)
+        self.roles_valid = set(self.labels) == set(required_roles)
+        self.label_allowed = np.array([label in required_roles for label in self.labels])
+
+        self.svm_model = models.get('svm_model') if models.has('svm_model') else None
+        if self.svm_model is None:
+            print("Warning: SVM model not found, using RF only")
+        # Prefer the flattened array forest (same probabilities, faster to load and run)
+        if models.has('rf_flat'):
+            self.rf_model = models.get('rf_flat')
+        elif models.has('rf_model'):
+            self.rf_model = models.get('rf_model')
+        else:
+            self.rf_model = None
+        if self.rf_model is None:
+            print("Warning: RF model not found, using SVM only")
+
+        # Fallback to best_model if both specific models don't exist
+        if self.svm_model is None and self.rf_model is None:
+            self.rf_model = models.get('best_model')
+
+    @classmethod
+    def for_models(cls, models, required_roles):
+        """Return the scorer cached on a ModelSet, building it on first use"""
+        return models.derive('ensemble_scorer', lambda m: cls(m, required_roles))
+
+    def score(self, texts):
+        """Vectorize texts once and return one prediction dict per text"""
+        if not self.roles_valid:
+            raise ModelInconsistencyError('Model inconsistency - roles mismatch')
+        return self.to_results(self.score_matrix(self.vectorizer.transform(texts)))
+
+    def score_matrix(self, X):
+        """Score a feature matrix; returns a dict of per-row arrays"""
+        n = X.shape[0]
+        rows = np.arange(n)
+
+        # SVM: one decision_function call; the predicted class is its argmax
+        has_svm = self.svm_model is not None
+        if has_svm and hasattr(self.svm_model, 'decision_function'):
+            decision = self.svm_model.decision_function(X)
+            svm_idx = self.svm_model.classes_[np.argmax(decision, axis=1)]
+            svm_conf = np.clip(1.0 / (1.0 + np.exp(-decision[rows, svm_idx])), 0.5, 1.0)
+        elif has_svm:
+            svm_idx = self.svm_model.predict(X)
+            svm_conf = np.full(n, DEFAULT_CONFIDENCE)
+        else:
+            svm_idx = np.zeros(n, dtype=int)
+            svm_conf = np.zeros(n)
+
+        # RF: one predict_proba call serves the prediction, confidence and top-k
+        has_rf = self.rf_model is not None
+        rf_proba = None
+        if has_rf and hasattr(self.rf_model, 'predict_proba'):
+            rf_proba = self.rf_model.predict_proba(X)
+            best = np.argmax(rf_proba, axis=1)
+            rf_idx = self.rf_model.classes_[best]
+            rf_conf = rf_proba[rows, best]
+        elif has_rf:
+            rf_idx = self.rf_model.predict(X)
+            rf_conf = np.full(n, DEFAULT_CONFIDENCE)
+        else:
+            rf_idx = np.zeros(n, dtype=int)
+            rf_conf = np.zeros(n)
+
+        svm_ok = has_svm & self.label_allowed[svm_idx]
+        rf_ok = has_rf & self.label_allowed[rf_idx]
+        svm_conf = np.where(svm_ok, svm_conf, 0.0)
+        rf_conf = np.where(rf_ok, rf_conf, 0.0)
+
+        # Voting: agreement averages, disagreement takes the more confident model
+        both = svm_ok & rf_ok
+        agree = both & (svm_idx == rf_idx)
+        svm_wins = both & ~agree & (svm_conf >= rf_conf)
+        rf_wins = both & ~agree & ~svm_wins
+        rf_only = ~both & rf_ok
+        svm_only = ~both & ~rf_ok & svm_ok
+        conditions = [agree, svm_wins, rf_wins, rf_only, svm_only]
+
+        final_idx = np.select(conditions, [svm_idx, svm_idx, rf_idx, rf_idx, svm_idx], default=-1)
+        final_conf = np.select(
+            conditions,
+            [(svm_conf + rf_conf) / 2.0, svm_conf, rf_conf, rf_conf, svm_conf],
+            default=0.5
+        )
+        method = np.select(
+            conditions,
+            ['both_agree', 'svm_higher_confidence', 'rf_higher_confidence', 'rf_only', 'svm_only'],
+            default='fallback_error'
+        )
+
+        return {
+            'svm_idx': svm_idx, 'svm_ok': svm_ok, 'svm_conf': svm_conf,
+            'rf_idx': rf_idx, 'rf_ok': rf_ok, 'rf_conf': rf_conf,
+            'final_idx': final_idx, 'final_conf': final_conf, 'method': method,
+            'rf_proba': rf_proba,
+            'top_idx': self.top_k(rf_proba) if rf_proba is not None else None,
+        }
+
+    @staticmethod
+    def top_k(proba, k=TOP_K):
+        """Indices of the k highest probabilities per row, highest first.
+
+        Ties are ordered by label index (as a stable descending sort would);
+        rows whose k-th value is tied with an unselected column are re-ranked
+        with a full stable sort so the selection matches exactly.
+        """
+        k = min(k, proba.shape[1])
+        if k == proba.shape[1]:
+            return np.argsort(-proba, axis=1, kind='stable')
+
+        part = np.argpartition(-proba, k - 1, axis=1)[:, :k]
+        values = np.take_along_axis(proba, part, axis=1)
+        order = np.lexsort((part, -values), axis=1)
+        top = np.take_along_axis(part, order, axis=1)
+
+        kth = np.take_along_axis(proba, top[:, -1:], axis=1)
+        ambiguous = (proba == kth).sum(axis=1) > (np.take_along_axis(proba, top, axis=1) == kth).sum(axis=1)
+        if ambiguous.any():
+            top[ambiguous] = np.argsort(-proba[ambiguous], axis=1, kind='stable')[:, :k]
+        return top
+
+    def to_results(self, scores):
+        """Turn score arrays into the /api/predict-role response fields"""
+        labels = self.labels
+        svm_roles = labels[scores['svm_idx']].tolist()
+        rf_roles = labels[scores['rf_idx']].tolist()
+        final_idx = scores['final_idx']
+        final_roles = np.where(final_idx >= 0, labels[final_idx], FALLBACK_ROLE).tolist()
+        final_conf = scores['final_conf'].tolist()
+        svm_ok = scores['svm_ok'].tolist()
+        rf_ok = scores['rf_ok'].tolist()
+        svm_conf = scores['svm_conf'].tolist()
+        rf_conf = scores['rf_conf'].tolist()
+        methods = scores['method'].tolist()
+
+        top_roles = [[] for _ in final_roles]
+        if scores['top_idx'] is not None:
+            top_idx = scores['top_idx']
+            top_conf = np.take_along_axis(scores['rf_proba'], top_idx, axis=1).tolist()
+            top_ok = self.label_allowed[top_idx].tolist()
+            top_labels = labels[top_idx].tolist()
+            top_roles = [
+                [{'role': role, 'confidence': conf} for role, conf, ok in zip(roles, confs, oks) if ok]
+                for roles, confs, oks in zip(top_labels, top_conf, top_ok)
+            ]
+
+        results = []
+        for i, final_role in enumerate(final_roles):
+            confidence = final_conf[i]
+            is_uncertain = confidence < UNCERTAINTY_THRESHOLD
+            uncertainty_message = UNCERTAINTY_MESSAGE if is_uncertain else ""
+            results.append({
+                'predicted_role': final_role,
+                'confidence': confidence,
+                'svm_role': svm_roles[i] if svm_ok[i] else None,
+                'svm_confidence': svm_conf[i] if svm_ok[i] else None,
+                'rf_role': rf_roles[i] if rf_ok[i] else None,
+                'rf_confidence': rf_conf[i] if rf_ok[i] else None,
+                'top_roles': top_roles[i] or [{'role': final_role, 'confidence': confidence}],
+                'ensemble_method': methods[i],
+                'is_uncertain': is_uncertain,
+                'uncertainty_message': uncertainty_message,
+                'message': f'Predicted role: {final_role}' + (f' ({uncertainty_message})' if is_uncertain else ''),
+            })
+        return results
+
+
+class Histogram:
+    """Cumulative bucket histogram (Prometheus style) safe to update from threads"""
+
+    def __init__(self, bounds):
+        self.bounds = list(bounds)
+        self._counts = [0] * (len(self.bounds) + 1)
+        self._sum = 0.0
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        i = 0
+        while i < len(self.bounds) and value > self.bounds[i]:
+            i += 1
+        with self._lock:
+            self._counts[i] += 1
+            self._sum += value
+            self._count += 1
+
+    def snapshot(self):
+        with self._lock:
+            counts = list(self._counts)
+            total, count = self._sum, self._count
+        buckets = {}
+        running = 0
+        for bound, c in zip(self.bounds + ['+Inf'], counts):
+            running += c
+            buckets[str(bound)] = running
+        return {'buckets': buckets, 'count': count, 'sum': round(total, 6)}
+
+
+class MicroBatcher:
+    """Coalesces concurrent single-text predictions into one batch call.
+
+    Requests are queued; a worker thread takes the first waiting request,
+    keeps collecting for up to window_ms or until max_batch_size requests
+    are waiting, then scores them all with one call to score_fn(texts),
+    which must return one result per text in order.
+    """
+
+    def __init__(self, score_fn, window_ms, max_batch_size, timeout=30.0):
+        self.score_fn = score_fn
+        self.window = window_ms / 1000.0
+        self.max_batch_size = max_batch_size
+        self.timeout = timeout
+        self.batch_sizes = Histogram([1, 2, 4, 8, 16, 32, 64, 128])
+        self.queue_wait_ms = Histogram([0.5, 1, 2, 5, 10, 25, 50, 100, 250])
+        self._queue = queue.Queue()
+        self._worker = threading.Thread(target=self._run, name='predict-microbatch', daemon=True)
+        self._worker.start()
+
+    def submit(self, text):
+        """Queue one text and block until its batch has been scored"""
+        future = Future()
+        self._queue.put((text, future, time.perf_counter()))
+        return future.result(timeout=self.timeout)
+
+    def _collect(self):
+        batch = [self._queue.get()]
+        deadline = time.perf_counter() + self.window
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            started = time.perf_counter()
+            self.batch_sizes.observe(len(batch))
+            for _, _, enqueued in batch:
+                self.queue_wait_ms.observe((started - enqueued) * 1000.0)
+
+            try:
+                results = self.score_fn([text for text, _, _ in batch])
+            except Exception as e:
+                for _, future, _ in batch:
+                    future.set_exception(e)
+                continue
+
+            for (_, future, _), result in zip(batch, results):
+                future.set_result(result)
+
+    def stats(self):
+        return {
+            'window_ms': self.window * 1000.0,
+            'max_batch_size': self.max_batch_size,
+            'queued': self._queue.qsize(),
+            'batch_size': self.batch_sizes.snapshot(),
+            'queue_wait_ms': self.queue_wait_ms.snapshot(),
+        }
@@ -0,0 +1,187 @@
+"""
+Smart Career Advisor - Job Posting Index
+Nearest-neighbour search over the job-posting corpus with the TF-IDF vectorizer
+
+The corpus is vectorized once with the trained vectorizer (rows are already
+L2-normalized, so a dot product is the cosine similarity) and stored as an
+inverted index: the matrix in CSC form, one posting list of (posting, weight)
+per term. Posting lists are sorted by weight, highest first, and saved as
+plain .npy files that are memory-mapped at load time, so a worker only pages
+in the lists its queries touch.
+
+Queries prune candidate generation in two places: only the query's
+QUERY_TERMS heaviest terms are looked up, and only the first MAX_POSTINGS
+entries of each list are scored. With weight-ordered lists the dropped tail
+holds the smallest contributions, so the top results barely change while the
+work per query stays bounded as the corpus grows.
+
+Layout (a directory next to the other model artifacts):
+    job_index/indptr.npy    term -> start of its posting list (int64, n_terms + 1)
+    job_index/indices.npy   posting numbers (int32)
+    job_index/data.npy      TF-IDF weights (float32)
+    job_index/offsets.npy   byte offset of every posting in postings.jsonl (int64, n_postings + 1)
+    job_index/postings.jsonl  role, title and skills of every posting, one JSON object per line
+"""
+
+import json
+import os
+import shutil
+import sys
+import time
+
+import numpy as np
+from scipy import sparse
+
+INDEX_DIR = 'job_index'
+# Bump when build_job_index writes something different; train_model's feature cache key includes it
+INDEX_FORMAT = 1
+
+# Query terms looked up and posting entries scored per term
+QUERY_TERMS = int(os.environ.get('SCA_JOB_INDEX_QUERY_TERMS', 32))
+MAX_POSTINGS = int(os.environ.get('SCA_JOB_INDEX_MAX_POSTINGS', 20000))
+DEFAULT_TOP_K = 10
+
+# Score into a dense array while the corpus is at most this many times the candidate count
+DENSE_ACCUMULATOR_RATIO = 8
+
+# Corpus rows vectorized per step while building
+BUILD_CHUNK_ROWS = 10000
+
+
+def posting_text(skills, job_description):
+    """Text of a posting as the vectorizer was trained on it (see train_model.prepare_data)"""
+    return f"{skills or ''} {job_description or ''}"
+
+
+def build_job_index(vectorizer, df, path, role_mapping=None):
+    """Vectorize the postings in df (role, skills, job_description) and write the index to path.
+
+    role_mapping maps raw titles to the served roles; the title is kept as well.
+    The index is written to a temporary directory and renamed into place.
+    """
+    start = time.perf_counter()
+    staging = path + '.tmp'
+    shutil.rmtree(staging, ignore_errors=True)
+    os.makedirs(staging)
+
+    skills = df['skills'].fillna('').astype(str).tolist()
+    descriptions = df['job_description'].fillna('').astype(str).tolist()
+    titles = df['role'].fillna('').astype(str).tolist()
+
+    # Vectorize in chunks; the CSC conversion below is the only full-corpus copy
+    chunks = [
+        vectorizer.transform([posting_text(s, d) for s, d in zip(skills[i:i + BUILD_CHUNK_ROWS],
+                                                                  descriptions[i:i + BUILD_CHUNK_ROWS])])
+        for i in range(0, len(skills), BUILD_CHUNK_ROWS)
+    ]
+    matrix = sparse.vstack(chunks).tocsc().astype(np.float32)
+    matrix.sort_indices()
+
+    # Order every posting list by weight, highest first, so queries can read a prefix
+    indptr = matrix.indptr.astype(np.int64)
+    indices = matrix.indices.astype(np.int32)
+    data = matrix.data.astype(np.float32)
+    lengths = np.diff(indptr)
+    column = np.repeat(np.arange(len(lengths)), lengths)
+    order = np.lexsort((-data, column))
+    np.save(os.path.join(staging, 'indptr.npy'), indptr)
+    np.save(os.path.join(staging, 'indices.npy'), indices[order])
+    np.save(os.path.join(staging, 'data.npy'), data[order])
+
+    offsets = np.empty(len(titles) + 1, dtype=np.int64)
+    offsets[0] = 0
+    with open(os.path.join(staging, 'postings.jsonl'), 'wb') as f:
+        for i, (title, skill_text) in enumerate(zip(titles, skills)):
+            record = {
+                'title': title,
+                'role': role_mapping.get(title, title) if role_mapping else title,
+                'skills': skill_text,
+            }
+            f.write(json.dumps(record).encode() + b'\n')
+            offsets[i + 1] = f.tell()
+    np.save(os.path.join(staging, 'offsets.npy'), offsets)
+
+    shutil.rmtree(path, ignore_errors=True)
+    os.rename(staging, path)
+    print(f"[JobIndex] Indexed {len(titles)} postings, {matrix.nnz} entries "
+          f"in {time.perf_counter() - start:.1f} s")
+
+
+class JobIndex:
+    """Memory-mapped inverted index over the job postings"""
+
+    def __init__(self, path, indptr, indices, data, offsets):
+        self.path = path
+        self.indptr = indptr
+        self.indices = indices
+        self.data = data
+        self.offsets = offsets
+        self.n_terms = len(indptr) - 1
+        self.n_postings = len(offsets) - 1
+
+    @classmethod
+    def load(cls, path):
+        load = lambda name: np.load(os.path.join(path, name), mmap_mode='r')
+        return cls(path, load('indptr.npy'), load('indices.npy'), load('data.npy'), load('offsets.npy'))
+
+    @property
+    def nbytes(self):
+        return sum(a.nbytes for a in (self.indptr, self.indices, self.data, self.offsets))
+
+    def search(self, query, k=DEFAULT_TOP_K, query_terms=QUERY_TERMS, max_postings=MAX_POSTINGS):
+        """Return [(posting number, cosine score)] of the k best postings for one query row.
+
+        query is a 1 x n_terms sparse TF-IDF row from the same vectorizer.
+        """
+        query = query.tocsr()
+        terms, weights = query.indices, query.data
+        if not len(terms):
+            return []
+        if len(terms) > query_terms:
+            keep = np.argpartition(weights, -query_terms)[-query_terms:]
+            terms, weights = terms[keep], weights[keep]
+
+        # Gather the (pruned) posting lists of the query terms and accumulate scores
+        starts = self.indptr[terms]
+        ends = np.minimum(self.indptr[terms + 1], starts + max_postings)
+        candidates = np.concatenate([self.indices[s:e] for s, e in zip(starts, ends)])
+        contributions = np.concatenate([
+            self.data[s:e] * w for s, e, w in zip(starts, ends, weights.astype(np.float32))
+        ])
+        if not len(candidates):
+            return []
+        if self.n_postings <= DENSE_ACCUMULATOR_RATIO * len(candidates):
+            # One score slot per posting: O(candidates + postings), no sort
+            scores = np.bincount(candidates, weights=contributions, minlength=self.n_postings)
+            postings = np.flatnonzero(scores)
+            scores = scores[postings]
+        else:
+            # Corpus much larger than the candidate set: only allocate slots for candidates
+            postings, slot = np.unique(candidates, return_inverse=True)
+            scores = np.bincount(slot, weights=contributions)
+
+        k = min(k, len(postings))
+        top = np.argpartition(scores, -k)[-k:]
+        top = top[np.argsort(-scores[top], kind='stable')]
+        return [(int(postings[i]), float(scores[i])) for i in top]
+
+    def postings(self, numbers):
+        """Read the stored fields of the given postings from postings.jsonl"""
+        records = []
+        with open(os.path.join(self.path, 'postings.jsonl'), 'rb') as f:
+            for number in numbers:
+                f.seek(int(self.offsets[number]))
+                records.append(json.loads(f.readline()))
+        return records
+
+
+if __name__ == '__main__':
+    # Usage: python job_index.py models/versions/<version> data/jobs_dataset.csv
+    # Builds the index for an already trained model directory.
+    import joblib
+    import pandas as pd
+    from train_model import ROLE_MAPPING
+
+    model_dir, csv_path = sys.argv[1:3]
+    build_job_index(joblib.load(os.path.join(model_dir, 'vectorizer.joblib')), pd.read_csv(csv_path),
+                    os.path.join(model_dir, INDEX_DIR), ROLE_MAPPING)
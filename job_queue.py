@@ -0,0 +1,283 @@
+"""
+Smart Career Advisor - Job Queue
+SQLite-backed background job queue with worker threads
+
+Jobs are rows in a local SQLite file (WAL), so every gunicorn worker on the
+host shares one queue. A worker claims a job by taking a lease on it; the
+lease is extended whenever the job reports progress. If the process dies
+mid-job the lease simply expires and another worker picks the job up again,
+until it runs out of attempts.
+
+Job states: queued -> running -> succeeded | failed
+"""
+
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+import traceback
+import uuid
+
+JOB_DATABASE = os.environ.get('SCA_JOB_DATABASE', 'jobs.db')
+JOB_WORKERS = int(os.environ.get('SCA_JOB_WORKERS', 2))              # threads per process
+JOB_MAX_RUNNING = int(os.environ.get('SCA_JOB_MAX_RUNNING', 4))      # across all processes
+JOB_MAX_ATTEMPTS = int(os.environ.get('SCA_JOB_MAX_ATTEMPTS', 3))
+JOB_LEASE_SECONDS = float(os.environ.get('SCA_JOB_LEASE_SECONDS', 60))
+JOB_RETENTION_SECONDS = float(os.environ.get('SCA_JOB_RETENTION_SECONDS', 24 * 3600))
+
+# Retry delay is RETRY_BACKOFF_SECONDS * 2 ** (attempt - 1)
+RETRY_BACKOFF_SECONDS = 2.0
+POLL_INTERVAL_SECONDS = 0.5
+PURGE_INTERVAL_SECONDS = 300
+
+STATUS_QUEUED = 'queued'
+STATUS_RUNNING = 'running'
+STATUS_SUCCEEDED = 'succeeded'
+STATUS_FAILED = 'failed'
+
+
+class JobQueue:
+    """Durable job queue with leases, retries and a global concurrency cap.
+
+    Handlers are registered per job kind and called as handler(job, progress).
+    job holds 'payload', 'data' (optional binary attachment), 'attempts' and
+    'state'; progress(fraction, stage, state=None) records progress, renews
+    the lease and, if given, checkpoints state so a retry can skip steps
+    that already ran. A handler's return value (JSON-serializable) becomes
+    the job result; an exception schedules a retry with exponential backoff.
+    """
+
+    def __init__(self, path=JOB_DATABASE, workers=JOB_WORKERS, max_running=JOB_MAX_RUNNING,
+                 max_attempts=JOB_MAX_ATTEMPTS, lease_seconds=JOB_LEASE_SECONDS):
+        self.path = path
+        self.workers = workers
+        self.max_running = max_running
+        self.max_attempts = max_attempts
+        self.lease_seconds = lease_seconds
+        self.handlers = {}
+        self._local = threading.local()
+        self._initialized = False
+        self._wakeup = threading.Event()
+        self._threads = []
+        self._last_purge = 0.0
+
+    def _conn(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            if not self._initialized:
+                conn.execute('''CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    kind TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    user_id INTEGER,
+                    payload TEXT NOT NULL,
+                    data BLOB,
+                    state TEXT,
+                    result TEXT,
+                    error TEXT,
+                    progress REAL NOT NULL DEFAULT 0,
+                    stage TEXT,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    max_attempts INTEGER NOT NULL,
+                    lease_owner TEXT,
+                    lease_expires REAL,
+                    available_at REAL NOT NULL,
+                    created_at REAL NOT NULL,
+                    updated_at REAL NOT NULL
+                )''')
+                conn.execute('CREATE INDEX IF NOT EXISTS idx_jobs_status_available ON jobs(status, available_at)')
+                self._initialized = True
+            self._local.conn = conn
+        return conn
+
+    def register(self, kind, handler):
+        self.handlers[kind] = handler
+
+    def enqueue(self, kind, payload, data=None, user_id=None):
+        """Store a new job and return its id"""
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        self._conn().execute(
+            'INSERT INTO jobs (id, kind, status, user_id, payload, data, max_attempts, '
+            'available_at, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+            (job_id, kind, STATUS_QUEUED, user_id, json.dumps(payload), data,
+             self.max_attempts, now, now, now)
+        )
+        self._wakeup.set()
+        return job_id
+
+    def get(self, job_id):
+        """Return a job as a dict (without its binary attachment), or None"""
+        row = self._conn().execute(
+            'SELECT id, kind, status, user_id, result, error, progress, stage, attempts, '
+            'max_attempts, created_at, updated_at FROM jobs WHERE id = ?', (job_id,)
+        ).fetchone()
+        if row is None:
+            return None
+        job = dict(row)
+        job['result'] = json.loads(job['result']) if job['result'] else None
+        return job
+
+    def claim(self, owner):
+        """Lease the next runnable job, or return None.
+
+        Runnable means queued and due, or running with an expired lease
+        (its worker died). Jobs whose lease expired on their last attempt
+        are marked failed instead.
+        """
+        conn = self._conn()
+        now = time.time()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            conn.execute(
+                'UPDATE jobs SET status = ?, error = ?, lease_owner = NULL, data = NULL, updated_at = ? '
+                'WHERE status = ? AND lease_expires < ? AND attempts >= max_attempts',
+                (STATUS_FAILED, 'Worker stopped while running the job', now, STATUS_RUNNING, now)
+            )
+            running = conn.execute(
+                'SELECT COUNT(*) FROM jobs WHERE status = ? AND lease_expires >= ?', (STATUS_RUNNING, now)
+            ).fetchone()[0]
+            if running >= self.max_running:
+                conn.execute('COMMIT')
+                return None
+
+            row = conn.execute(
+                'SELECT id, kind, payload, data, state, attempts FROM jobs '
+                'WHERE (status = ? AND available_at <= ?) OR (status = ? AND lease_expires < ?) '
+                'ORDER BY available_at LIMIT 1',
+                (STATUS_QUEUED, now, STATUS_RUNNING, now)
+            ).fetchone()
+            if row is not None:
+                conn.execute(
+                    'UPDATE jobs SET status = ?, attempts = attempts + 1, lease_owner = ?, '
+                    'lease_expires = ?, updated_at = ? WHERE id = ?',
+                    (STATUS_RUNNING, owner, now + self.lease_seconds, now, row['id'])
+                )
+            conn.execute('COMMIT')
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+        if row is None:
+            return None
+        return {
+            'id': row['id'],
+            'kind': row['kind'],
+            'payload': json.loads(row['payload']),
+            'data': row['data'],
+            'state': json.loads(row['state']) if row['state'] else {},
+            'attempts': row['attempts'] + 1,
+        }
+
+    def _update_owned(self, job_id, owner, assignments, params):
+        """Update a job only while this worker still holds its lease"""
+        cursor = self._conn().execute(
+            f'UPDATE jobs SET {assignments}, updated_at = ? WHERE id = ? AND lease_owner = ?',
+            (*params, time.time(), job_id, owner)
+        )
+        return cursor.rowcount == 1
+
+    def progress(self, job_id, owner, fraction, stage, state=None):
+        if state is not None:
+            return self._update_owned(
+                job_id, owner, 'progress = ?, stage = ?, state = ?, lease_expires = ?',
+                (fraction, stage, json.dumps(state), time.time() + self.lease_seconds)
+            )
+        return self._update_owned(
+            job_id, owner, 'progress = ?, stage = ?, lease_expires = ?',
+            (fraction, stage, time.time() + self.lease_seconds)
+        )
+
+    def complete(self, job_id, owner, result):
+        return self._update_owned(
+            job_id, owner, 'status = ?, result = ?, error = NULL, progress = 1, stage = ?, '
+            'data = NULL, lease_owner = NULL, lease_expires = NULL',
+            (STATUS_SUCCEEDED, json.dumps(result), 'done')
+        )
+
+    def fail(self, job_id, owner, attempts, error):
+        """Schedule a retry, or mark the job failed once it is out of attempts"""
+        if attempts < self.max_attempts:
+            delay = RETRY_BACKOFF_SECONDS * 2 ** (attempts - 1)
+            return self._update_owned(
+                job_id, owner, 'status = ?, error = ?, available_at = ?, lease_owner = NULL, lease_expires = NULL',
+                (STATUS_QUEUED, error, time.time() + delay)
+            )
+        return self._update_owned(
+            job_id, owner, 'status = ?, error = ?, data = NULL, lease_owner = NULL, lease_expires = NULL',
+            (STATUS_FAILED, error)
+        )
+
+    def purge(self, older_than=JOB_RETENTION_SECONDS):
+        """Delete finished jobs older than the retention period"""
+        return self._conn().execute(
+            'DELETE FROM jobs WHERE status IN (?, ?) AND updated_at < ?',
+            (STATUS_SUCCEEDED, STATUS_FAILED, time.time() - older_than)
+        ).rowcount
+
+    def run_one(self, owner):
+        """Claim and run a single job. Returns False if nothing was runnable."""
+        job = self.claim(owner)
+        if job is None:
+            return False
+
+        handler = self.handlers.get(job['kind'])
+        try:
+            if handler is None:
+                raise LookupError(f"No handler for job kind {job['kind']!r}")
+            result = handler(
+                job, lambda fraction, stage, state=None: self.progress(job['id'], owner, fraction, stage, state)
+            )
+        except Exception as e:
+            print(f"[JobQueue] Job {job['id']} attempt {job['attempts']} failed: {e}")
+            traceback.print_exc()
+            self.fail(job['id'], owner, job['attempts'], f'{type(e).__name__}: {e}')
+        else:
+            if not self.complete(job['id'], owner, result):
+                print(f"[JobQueue] Lost the lease on job {job['id']}; result discarded")
+        return True
+
+    def _work(self, owner):
+        while True:
+            try:
+                if time.time() - self._last_purge > PURGE_INTERVAL_SECONDS:
+                    self._last_purge = time.time()
+                    self.purge()
+                if self.run_one(owner):
+                    continue
+            except sqlite3.Error as e:
+                print(f"[JobQueue] Worker {owner} database error: {e}")
+            self._wakeup.wait(POLL_INTERVAL_SECONDS)
+            self._wakeup.clear()
+
+    def start(self):
+        """Start the worker threads for this process (no-op if workers is 0 or already started)"""
+        if self.workers <= 0 or self._threads:
+            return
+        prefix = f'{socket.gethostname()}:{os.getpid()}'
+        for index in range(self.workers):
+            thread = threading.Thread(
+                target=self._work, args=(f'{prefix}:{index}',), name=f'job-worker-{index}', daemon=True
+            )
+            thread.start()
+            self._threads.append(thread)
+
+    def stats(self):
+        """Return job counts per status"""
+        rows = self._conn().execute('SELECT status, COUNT(*) FROM jobs GROUP BY status').fetchall()
+        return {
+            'workers': len(self._threads),
+            'max_running': self.max_running,
+            'max_attempts': self.max_attempts,
+            'lease_seconds': self.lease_seconds,
+            'jobs': {status: count for status, count in rows},
+        }
+
+
+# Shared instance used by every endpoint
+job_queue = JobQueue()
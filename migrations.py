@@ -0,0 +1,189 @@
+"""
+Smart Career Advisor - Schema Migrations
+Versioned schema changes for sca.db, tracked with PRAGMA user_version
+
+Each migration has a version number, a description and either a list of SQL
+statements or a function taking the connection. migrate() applies the ones
+newer than the database's user_version, each in its own transaction together
+with the version bump, so a crash never leaves a half-applied step behind.
+BEGIN IMMEDIATE serializes concurrent workers: the first one migrates, the
+others find the version already raised and skip.
+
+To change the schema, append a migration; never edit one that has shipped.
+"""
+
+import sqlite3
+
+
+def _add_resume_content_hash(conn):
+    # Databases that ran the pre-migration init_db may already have the column
+    columns = [row[1] for row in conn.execute('PRAGMA table_info(resumes)')]
+    if 'content_hash' not in columns:
+        conn.execute('ALTER TABLE resumes ADD COLUMN content_hash TEXT')
+
+    conn.execute('''CREATE TABLE IF NOT EXISTS resume_contents (
+        content_hash TEXT PRIMARY KEY,
+        file_path TEXT NOT NULL,
+        file_type TEXT NOT NULL,
+        size_bytes INTEGER NOT NULL,
+        extracted_text TEXT,
+        extracted_skills_json TEXT,
+        skills_version TEXT,
+        extraction_status TEXT,
+        extraction_error TEXT,
+        pages_read INTEGER,
+        page_count INTEGER,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )''')
+
+
+MIGRATIONS = [
+    (1, 'Base schema', [
+        '''CREATE TABLE IF NOT EXISTS users (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            username TEXT UNIQUE NOT NULL,
+            email TEXT UNIQUE NOT NULL,
+            password_hash TEXT NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )''',
+        '''CREATE TABLE IF NOT EXISTS profiles (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER UNIQUE NOT NULL,
+            full_name TEXT,
+            initials TEXT,
+            phone TEXT,
+            dob TEXT,
+            skills_json TEXT,
+            avatar_filename TEXT,
+            FOREIGN KEY (user_id) REFERENCES users(id)
+        )''',
+        '''CREATE TABLE IF NOT EXISTS resumes (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL,
+            file_name TEXT NOT NULL,
+            uploaded_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            extracted_skills_json TEXT,
+            prediction TEXT,
+            FOREIGN KEY (user_id) REFERENCES users(id)
+        )''',
+        '''CREATE TABLE IF NOT EXISTS notifications (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL,
+            message TEXT NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            is_read BOOLEAN DEFAULT 0,
+            FOREIGN KEY (user_id) REFERENCES users(id)
+        )''',
+    ]),
+    (2, 'Content-addressed uploads: resumes.content_hash and resume_contents', _add_resume_content_hash),
+    (3, 'Indexes for the notification list, latest-resume and upload GC queries', [
+        'CREATE INDEX IF NOT EXISTS idx_notifications_user_created ON notifications(user_id, created_at)',
+        'CREATE INDEX IF NOT EXISTS idx_resumes_user_uploaded ON resumes(user_id, uploaded_at)',
+        'CREATE INDEX IF NOT EXISTS idx_resumes_content_hash ON resumes(content_hash)',
+    ]),
+    (4, 'Keyset index on notifications and trigger-maintained unread counters', [
+        # (created_at, id) is the pagination key; the old index is a prefix of the new one
+        'CREATE INDEX IF NOT EXISTS idx_notifications_user_created_id ON notifications(user_id, created_at, id)',
+        'DROP INDEX IF EXISTS idx_notifications_user_created',
+        '''CREATE TABLE IF NOT EXISTS notification_counters (
+            user_id INTEGER PRIMARY KEY,
+            unread INTEGER NOT NULL DEFAULT 0
+        )''',
+        '''INSERT OR REPLACE INTO notification_counters (user_id, unread)
+           SELECT user_id, COUNT(*) FROM notifications WHERE NOT is_read GROUP BY user_id''',
+        '''CREATE TRIGGER IF NOT EXISTS trg_notifications_insert_unread
+           AFTER INSERT ON notifications WHEN NOT NEW.is_read
+           BEGIN
+               INSERT INTO notification_counters (user_id, unread) VALUES (NEW.user_id, 1)
+               ON CONFLICT(user_id) DO UPDATE SET unread = unread + 1;
+           END''',
+        '''CREATE TRIGGER IF NOT EXISTS trg_notifications_mark_read
+           AFTER UPDATE OF is_read ON notifications WHEN NOT OLD.is_read AND NEW.is_read
+           BEGIN
+               UPDATE notification_counters SET unread = unread - 1 WHERE user_id = NEW.user_id;
+           END''',
+        '''CREATE TRIGGER IF NOT EXISTS trg_notifications_mark_unread
+           AFTER UPDATE OF is_read ON notifications WHEN OLD.is_read AND NOT NEW.is_read
+           BEGIN
+               INSERT INTO notification_counters (user_id, unread) VALUES (NEW.user_id, 1)
+               ON CONFLICT(user_id) DO UPDATE SET unread = unread + 1;
+           END''',
+        '''CREATE TRIGGER IF NOT EXISTS trg_notifications_delete_unread
+           AFTER DELETE ON notifications WHEN NOT OLD.is_read
+           BEGIN
+               UPDATE notification_counters SET unread = unread - 1 WHERE user_id = OLD.user_id;
+           END''',
+    ]),
+    (5, 'Index for reading a user\'s notifications in id order (SSE replay)', [
+        # Entries are (user_id, rowid), so `user_id = ? AND id > ? ORDER BY id` is a range read
+        'CREATE INDEX IF NOT EXISTS idx_notifications_user_id ON notifications(user_id)',
+    ]),
+    (6, 'Append-only resume_vectors table for the resume similarity index', [
+        '''CREATE TABLE IF NOT EXISTS resume_vectors (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            resume_id INTEGER NOT NULL,
+            user_id INTEGER NOT NULL,
+            model_version TEXT NOT NULL,
+            vector BLOB NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            UNIQUE (resume_id, model_version),
+            FOREIGN KEY (resume_id) REFERENCES resumes(id)
+        )''',
+        # Incremental sync reads one version's rows in id order
+        'CREATE INDEX IF NOT EXISTS idx_resume_vectors_version ON resume_vectors(model_version, id)',
+    ]),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+
+def schema_version(conn):
+    return conn.execute('PRAGMA user_version').fetchone()[0]
+
+
+def migrate(path, migrations=MIGRATIONS):
+    """Bring the database at path up to the latest schema version.
+
+    Returns the list of (version, description) applied by this call.
+    """
+    conn = sqlite3.connect(path, timeout=30.0, isolation_level=None)
+    applied = []
+    try:
+        # journal_mode cannot change inside a transaction
+        conn.execute('PRAGMA journal_mode=WAL')
+        for version, description, steps in migrations:
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                if schema_version(conn) >= version:
+                    conn.execute('COMMIT')
+                    continue
+                if callable(steps):
+                    steps(conn)
+                else:
+                    for statement in steps:
+                        conn.execute(statement)
+                conn.execute(f'PRAGMA user_version = {int(version)}')
+                conn.execute('COMMIT')
+            except BaseException:
+                conn.execute('ROLLBACK')
+                raise
+            applied.append((version, description))
+            print(f"[Migrations] Applied {version}: {description}")
+    finally:
+        conn.close()
+    return applied
+
+
+def explain_query_plan(conn, sql, params=()):
+    """Return the EXPLAIN QUERY PLAN detail lines for a query"""
+    return [row[-1] for row in conn.execute(f'EXPLAIN QUERY PLAN {sql}', params)]
+
+
+def query_plan_problems(conn, sql, params=()):
+    """Return the plan steps that read a whole table or sort in a temp B-tree"""
+    problems = []
+    for detail in explain_query_plan(conn, sql, params):
+        full_scan = detail.startswith('SCAN ') and ' USING ' not in detail
+        if full_scan or 'USE TEMP B-TREE' in detail:
+            problems.append(detail)
+    return problems
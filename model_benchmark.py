@@ -0,0 +1,162 @@
+"""
+Smart Career Advisor - Model Benchmarks
+What each trained model costs to serve, measured the way the app loads and runs it
+
+train_model.py benchmarks every candidate before choosing the best model.
+Each model is serialized in the form the app serves it (svm_model.joblib,
+rf_flat.npz), then loaded with the model registry's loader. The benchmark
+records:
+    - the serialized size and the load time
+    - the memory allocated by loading, measured with tracemalloc (the
+      benchmark runs offline, so tracing every allocation is affordable)
+    - accuracy, and p50/p99 latency of single-row and batch predictions,
+      over the test split
+Latencies start from feature rows; vectorizing, the same for every
+candidate, is not included.
+
+Selection policy: the most accurate model within every budget set in
+SCA_SELECTION_BUDGETS, e.g. "single_p99_ms=5,size_mb=50". Accuracy ties go to
+the model listed first (the SVM), as before budgets existed; timings are
+too noisy to break them. If no model fits the budgets, the one with the
+lowest single-row p99 is chosen.
+"""
+
+import gc
+import os
+import tempfile
+import time
+import tracemalloc
+
+import joblib
+import numpy as np
+
+from flat_forest import export_flat_forest
+from model_registry import ARTIFACTS, LOADERS, artifact_size
+
+# Test rows timed one at a time, and rows per timed batch
+BENCHMARK_ROWS = int(os.environ.get('SCA_BENCHMARK_ROWS', 1000))
+BATCH_SIZE = int(os.environ.get('SCA_BENCHMARK_BATCH_SIZE', 64))
+
+# Budget name -> (benchmark field, unit in that field)
+BUDGETS = {
+    'single_p99_ms': ('single_p99_ms', 1.0),
+    'batch_p99_ms': ('batch_p99_ms', 1.0),
+    'size_mb': ('size_bytes', 1e6),
+    'memory_mb': ('memory_bytes', 1e6),
+    'load_ms': ('load_time_ms', 1.0),
+}
+
+
+def parse_budgets(spec):
+    """Parse "name=limit,..." into {name: limit}; raises ValueError on unknown names"""
+    budgets = {}
+    for item in filter(None, (part.strip() for part in (spec or '').split(','))):
+        name, _, limit = item.partition('=')
+        name = name.strip()
+        if name not in BUDGETS:
+            raise ValueError(f"Unknown selection budget {name!r} (expected one of {', '.join(BUDGETS)})")
+        budgets[name] = float(limit)
+    return budgets
+
+
+SELECTION_BUDGETS = parse_budgets(os.environ.get('SCA_SELECTION_BUDGETS', ''))
+
+
+def percentiles_ms(seconds):
+    seconds = np.asarray(seconds) * 1000.0
+    return round(float(np.percentile(seconds, 50)), 4), round(float(np.percentile(seconds, 99)), 4)
+
+
+def benchmark_artifact(name, path, X, y):
+    """Load one serialized artifact as the registry does and time its predictions on X"""
+    gc.collect()
+    # Leave a trace the caller started running
+    was_tracing = tracemalloc.is_tracing()
+    if not was_tracing:
+        tracemalloc.start()
+    mem_before = tracemalloc.get_traced_memory()[0]
+    start = time.perf_counter()
+    model = LOADERS.get(name, joblib.load)(path)
+    load_seconds = time.perf_counter() - start
+    memory = max(0, tracemalloc.get_traced_memory()[0] - mem_before)
+    if not was_tracing:
+        tracemalloc.stop()
+
+    # Rows are sliced up front so only predict() is timed
+    singles = [X[i] for i in range(min(BENCHMARK_ROWS, X.shape[0]))]
+    single_times = []
+    for row in singles:
+        start = time.perf_counter()
+        model.predict(row)
+        single_times.append(time.perf_counter() - start)
+
+    batches = [X[i:i + BATCH_SIZE] for i in range(0, X.shape[0], BATCH_SIZE)]
+    batch_times, predictions = [], []
+    for batch in batches:
+        start = time.perf_counter()
+        predictions.append(model.predict(batch))
+        batch_times.append(time.perf_counter() - start)
+
+    single_p50, single_p99 = percentiles_ms(single_times)
+    batch_p50, batch_p99 = percentiles_ms(batch_times)
+    return {
+        'artifact': ARTIFACTS[name],
+        'size_bytes': artifact_size(path),
+        'load_time_ms': round(load_seconds * 1000.0, 3),
+        'memory_bytes': memory,
+        'accuracy': round(float(np.mean(np.concatenate(predictions) == y)), 6),
+        'single_rows': len(singles),
+        'single_p50_ms': single_p50,
+        'single_p99_ms': single_p99,
+        'batch_size': BATCH_SIZE,
+        'batch_p50_ms': batch_p50,
+        'batch_p99_ms': batch_p99,
+        'rows_per_second': round(X.shape[0] / max(sum(batch_times), 1e-12), 1),
+    }
+
+
+def benchmark_models(svm_model, rf_model, X_test, y_test):
+    """Return {model name: benchmark} for the SVM and (if given) the Random Forest"""
+    print("\n" + "="*60)
+    print("BENCHMARKING: SIZE, LOAD TIME, MEMORY, LATENCY")
+    print("="*60)
+
+    benchmarks = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        svm_path = os.path.join(tmp, ARTIFACTS['svm_model'])
+        joblib.dump(svm_model, svm_path)
+        benchmarks['SVM'] = benchmark_artifact('svm_model', svm_path, X_test, y_test)
+        if rf_model is not None:
+            rf_path = os.path.join(tmp, ARTIFACTS['rf_flat'])
+            export_flat_forest(rf_model, rf_path)
+            benchmarks['Random Forest'] = benchmark_artifact('rf_flat', rf_path, X_test, y_test)
+
+    for name, b in benchmarks.items():
+        print(f"[+] {name} ({b['artifact']}): {b['size_bytes'] / 1e6:.2f} MB, load {b['load_time_ms']:.1f} ms, "
+              f"memory {b['memory_bytes'] / 1e6:.2f} MB")
+        print(f"    single row p50/p99: {b['single_p50_ms']:.3f}/{b['single_p99_ms']:.3f} ms, "
+              f"batch of {b['batch_size']} p50/p99: {b['batch_p50_ms']:.3f}/{b['batch_p99_ms']:.3f} ms")
+    return benchmarks
+
+
+def select_model(accuracy, benchmarks, budgets=SELECTION_BUDGETS):
+    """Apply the selection policy to {model name: accuracy}, in order of preference on ties.
+
+    Returns (name, selection report).
+    """
+    def within(name):
+        return all(benchmarks[name][BUDGETS[budget][0]] <= limit * BUDGETS[budget][1]
+                   for budget, limit in budgets.items())
+
+    eligible = [name for name in accuracy if within(name)]
+    if eligible:
+        selected = max(eligible, key=lambda name: accuracy[name])
+    else:
+        selected = min(accuracy, key=lambda name: benchmarks[name]['single_p99_ms'])
+    return selected, {
+        'policy': 'highest accuracy within budgets' if budgets else 'highest accuracy',
+        'budgets': budgets,
+        'eligible': eligible,
+        'selected': selected,
+        'fallback': not eligible,
+    }
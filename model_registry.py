@@ -0,0 +1,335 @@
+"""
+Smart Career Advisor - Model Registry
+Loads trained model artifacts once per process and shares them across requests
+
+Layout written by train_model.save_models:
+    models/versions/<version>/*.joblib   one immutable directory per training run
+    models/CURRENT                       name of the version directory to serve
+
+A flat models/*.joblib layout (no CURRENT pointer) is still served as a
+single static version for older deployments.
+"""
+
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+import types
+
+import joblib
+import numpy as np
+
+from calibration import CalibratedSVM
+from flat_forest import FlatForest
+from job_index import JobIndex
+from role_skills import RoleSkillMatrix
+
+MODEL_DIR = 'models'
+VERSIONS_DIR = 'versions'
+CURRENT_POINTER = 'CURRENT'
+REPORT_FILE = 'training_report.json'
+
+# Artifact name -> file inside a model directory (as written by train_model.save_models)
+ARTIFACTS = {
+    'vectorizer': 'vectorizer.joblib',
+    'label_encoder': 'label_encoder.joblib',
+    'svm_model': 'svm_model.joblib',
+    'rf_model': 'rf_model.joblib',
+    'rf_flat': 'rf_flat.npz',
+    'svm_calibration': 'svm_calibration.npz',
+    'role_skills': 'role_skills.npz',
+    'best_model': 'best_model.joblib',
+    'job_index': 'job_index',           # directory of memory-mapped .npy files
+}
+
+# Artifacts not stored with joblib, and how to load them
+LOADERS = {
+    'rf_flat': FlatForest.load,
+    'svm_calibration': CalibratedSVM.load,
+    'role_skills': RoleSkillMatrix.load,
+    'job_index': JobIndex.load,
+}
+
+# Artifacts that make another one unnecessary to load when present
+SUPERSEDES = {
+    'rf_flat': 'rf_model',
+}
+
+# Seconds between checks for a newly trained version (0 disables the watcher)
+RELOAD_INTERVAL = float(os.environ.get('SCA_MODEL_RELOAD_INTERVAL', 30))
+
+
+def resolve_version(path):
+    """Identify a model directory by its training timestamp, or a content hash"""
+    try:
+        with open(os.path.join(path, REPORT_FILE)) as f:
+            timestamp = json.load(f).get('timestamp')
+        if timestamp:
+            return timestamp
+    except (OSError, ValueError):
+        pass
+
+    digest = hashlib.sha256()
+    for filename in sorted(ARTIFACTS.values()):
+        file_path = os.path.join(path, filename)
+        if not os.path.isfile(file_path):
+            continue
+        with open(file_path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                digest.update(block)
+    return f'sha256:{digest.hexdigest()[:16]}'
+
+
+def artifact_size(path):
+    """Size of an artifact file, or of all files in an artifact directory"""
+    if not os.path.isdir(path):
+        return os.path.getsize(path)
+    return sum(entry.stat().st_size for entry in os.scandir(path) if entry.is_file())
+
+
+def artifact_memory(artifact):
+    """Bytes held by a loaded artifact: its arrays' buffers plus the Python objects around them.
+
+    Walks the object graph once instead of tracing allocations, so it is
+    safe while other threads load or serve. Memory-mapped arrays count as
+    0; their pages belong to the page cache and are shared by all workers.
+    """
+    total, seen, stack, states = 0, set(), [artifact], []
+    while stack:
+        obj = stack.pop()
+        if id(obj) in seen or isinstance(obj, (type, types.ModuleType, types.FunctionType)):
+            continue
+        seen.add(id(obj))
+        # An array counts its buffer only if it owns it; views lead to their base
+        total += sys.getsizeof(obj)
+        if isinstance(obj, np.ndarray):
+            if isinstance(obj.base, np.ndarray):
+                stack.append(obj.base)
+            elif obj.base is not None and not isinstance(obj, np.memmap):
+                total += obj.nbytes     # buffer owned by a non-array object, e.g. sklearn's Tree
+            if obj.dtype == object:
+                stack.extend(obj.ravel())
+        elif isinstance(obj, dict):
+            stack.extend(obj.keys())
+            stack.extend(obj.values())
+        elif isinstance(obj, (list, tuple, set, frozenset)):
+            stack.extend(obj)
+        elif hasattr(obj, '__dict__'):
+            stack.append(obj.__dict__)
+        elif getattr(type(obj), '__getstate__', object.__getstate__) is not object.__getstate__:
+            # Extension types (e.g. sklearn's Tree) expose their arrays as pickle state;
+            # kept alive so its id is not reused by a later object while walking
+            states.append(obj.__getstate__())
+            stack.append(states[-1])
+    return total
+
+
+def read_current_pointer(model_dir=MODEL_DIR):
+    """Return the version directory named by models/CURRENT, or None for the flat layout"""
+    try:
+        with open(os.path.join(model_dir, CURRENT_POINTER)) as f:
+            name = f.read().strip()
+    except OSError:
+        return None
+    return os.path.join(model_dir, VERSIONS_DIR, name) if name else None
+
+
+class ModelSet:
+    """All artifacts of one model version.
+
+    Each artifact is loaded at most once; later lookups are a plain dict read.
+    Loading is serialized with a lock so concurrent first requests do not
+    unpickle the same file twice. The loaded estimators are only ever read
+    (transform / predict), which is safe to share between threads.
+    """
+
+    def __init__(self, path, version=None):
+        self.path = path
+        self.version = version or resolve_version(path)
+        self._lock = threading.Lock()
+        self._artifacts = {}
+        self._stats = {}
+        self._derived = {}
+
+    def artifact_path(self, name):
+        """Return the on-disk path of an artifact"""
+        return os.path.join(self.path, ARTIFACTS[name])
+
+    def has(self, name):
+        """Check whether an artifact is loaded or available on disk"""
+        return name in self._artifacts or os.path.exists(self.artifact_path(name))
+
+    def get(self, name):
+        """Return a loaded artifact, loading it on first use.
+
+        Raises FileNotFoundError if the artifact file does not exist.
+        """
+        try:
+            return self._artifacts[name]
+        except KeyError:
+            pass
+
+        with self._lock:
+            if name not in self._artifacts:
+                self._load(name)
+            return self._artifacts[name]
+
+    def derive(self, key, build):
+        """Return an object computed once from this version's artifacts.
+
+        build(model_set) runs on first use only; the result lives and dies
+        with this ModelSet, so it is replaced together with a hot-swapped version.
+        """
+        try:
+            return self._derived[key]
+        except KeyError:
+            pass
+
+        derived = build(self)
+        with self._lock:
+            return self._derived.setdefault(key, derived)
+
+    def _load(self, name):
+        """Unpickle one artifact and record its load time and memory footprint"""
+        path = self.artifact_path(name)
+        start = time.perf_counter()
+        artifact = LOADERS.get(name, joblib.load)(path)
+        load_seconds = time.perf_counter() - start
+
+        self._artifacts[name] = artifact
+        self._stats[name] = {
+            'file': ARTIFACTS[name],
+            'type': type(artifact).__name__,
+            'file_size_bytes': artifact_size(path),
+            'memory_bytes': artifact_memory(artifact),
+            'load_time_ms': round(load_seconds * 1000.0, 3),
+            'loaded_at': time.time(),
+        }
+        print(f"[ModelRegistry] Loaded {name} ({self.version}) in {load_seconds * 1000.0:.1f} ms")
+
+    def preload(self, names=None):
+        """Load artifacts eagerly. Missing and superseded files are skipped."""
+        if names is None:
+            superseded = {old for new, old in SUPERSEDES.items() if self.has(new)}
+            names = [name for name in ARTIFACTS if name not in superseded]
+        for name in names:
+            if not self.has(name):
+                print(f"[ModelRegistry] Warning: {self.artifact_path(name)} not found, skipping")
+                continue
+            try:
+                self.get(name)
+            except Exception as e:
+                print(f"[ModelRegistry] Failed to load {name} ({self.version}): {e}")
+
+    def warm_up(self):
+        """Load every artifact and run one prediction so the first request pays nothing"""
+        self.preload()
+        vectorizer = self.get('vectorizer')
+        X = vectorizer.transform(['warm up'])
+        for name in ('svm_model', 'rf_model', 'rf_flat', 'svm_calibration', 'best_model'):
+            if name in self._artifacts:
+                self._artifacts[name].predict(X)
+
+    def stats(self):
+        """Return load time and memory footprint for every loaded artifact"""
+        with self._lock:
+            artifacts = {name: dict(stat) for name, stat in self._stats.items()}
+        return {
+            'version': self.version,
+            'model_dir': self.path,
+            'artifacts': artifacts,
+            'total_memory_bytes': sum(s['memory_bytes'] for s in artifacts.values()),
+            'total_load_time_ms': round(sum(s['load_time_ms'] for s in artifacts.values()), 3),
+        }
+
+
+class ModelRegistry:
+    """Process-wide holder of the model version currently being served.
+
+    Requests take a snapshot with current() and use it until they finish, so
+    swapping in a new version never changes models under a running request.
+    A background watcher polls models/CURRENT, warms the new version up off
+    the request path and then swaps the reference in one assignment.
+    """
+
+    def __init__(self, model_dir=MODEL_DIR, reload_interval=RELOAD_INTERVAL):
+        self.model_dir = model_dir
+        self.reload_interval = reload_interval
+        self._swap_lock = threading.Lock()
+        self._current = None
+        self._watcher = None
+        self._last_error = None
+
+    def _locate(self):
+        """Return the directory that should currently be served"""
+        return read_current_pointer(self.model_dir) or self.model_dir
+
+    def current(self):
+        """Return the ModelSet serving requests right now"""
+        models = self._current
+        if models is None:
+            with self._swap_lock:
+                if self._current is None:
+                    self._current = ModelSet(self._locate())
+                models = self._current
+        return models
+
+    def preload(self):
+        """Load the current version eagerly (e.g. at worker start)"""
+        self.current().preload()
+
+    def reload(self):
+        """Swap in the version named by models/CURRENT if it changed.
+
+        Returns True if a new version was activated.
+        """
+        path = self._locate()
+        current = self._current
+        if current is not None and os.path.abspath(path) == os.path.abspath(current.path):
+            return False
+
+        candidate = ModelSet(path)
+        if current is not None and candidate.version == current.version:
+            return False
+
+        try:
+            candidate.warm_up()
+        except Exception as e:
+            # Keep serving the old version if the new one is broken
+            self._last_error = f'{candidate.version}: {e}'
+            print(f"[ModelRegistry] Failed to warm up {candidate.version}: {e}")
+            return False
+
+        with self._swap_lock:
+            self._current = candidate
+        self._last_error = None
+        print(f"[ModelRegistry] Now serving model version {candidate.version}")
+        return True
+
+    def _watch(self):
+        while True:
+            time.sleep(self.reload_interval)
+            try:
+                self.reload()
+            except Exception as e:
+                print(f"[ModelRegistry] Reload check failed: {e}")
+
+    def start_watcher(self):
+        """Start the background thread that picks up newly trained versions"""
+        if self.reload_interval <= 0 or self._watcher is not None:
+            return
+        self._watcher = threading.Thread(target=self._watch, name='model-reload', daemon=True)
+        self._watcher.start()
+
+    def stats(self):
+        """Return version info plus per-artifact stats of the current version"""
+        stats = self.current().stats()
+        stats['reload_interval_seconds'] = self.reload_interval
+        stats['last_reload_error'] = self._last_error
+        return stats
+
+
+# Shared instance used by every endpoint
+registry = ModelRegistry()
@@ -0,0 +1,91 @@
+"""
+Smart Career Advisor - Notification Hub
+In-process fan-out that wakes Server-Sent Events streams on new notifications
+
+Every open /api/notifications/stream subscribes here for its user. When the
+notification sink commits a batch it publishes the rows, and the hub wakes
+the streams of exactly those users. A woken stream reads its new rows with
+one indexed `id > last sent id` query, so streams that have nothing to send
+never touch the database.
+
+The database stays the source of truth for what a stream sends: ids are
+committed in order, so reading them back (rather than forwarding the
+published rows) never skips a row written by another gunicorn worker. Those
+rows are picked up by the catch-up query each stream runs per heartbeat.
+"""
+
+import os
+import threading
+
+# Threads per web worker process (gunicorn -k gthread --threads, see Procfile)
+WEB_THREADS = int(os.environ.get('SCA_WEB_THREADS', 32))
+# Concurrent streams per worker process. Each holds a worker thread while open, so
+# the cap defaults to half the threads and never reaches all of them.
+MAX_STREAMS = max(0, min(int(os.environ.get('SCA_SSE_MAX_STREAMS', WEB_THREADS // 2)), WEB_THREADS - 1))
+
+
+class Subscription:
+    """One stream's wake-up signal. close() it when the stream ends."""
+
+    def __init__(self, hub, user_id):
+        self.hub = hub
+        self.user_id = user_id
+        self._event = threading.Event()
+
+    def notify(self):
+        self._event.set()
+
+    def wait(self, timeout):
+        """Block up to timeout seconds; True if notifications arrived meanwhile"""
+        woken = self._event.wait(timeout)
+        self._event.clear()
+        return woken
+
+    def close(self):
+        self.hub.unsubscribe(self)
+
+
+class NotificationHub:
+    """Wakes the subscriptions of the users named in published notification rows"""
+
+    def __init__(self, max_streams=MAX_STREAMS):
+        self.max_streams = max_streams
+        self._subscribers = {}          # user_id -> set of Subscription
+        self._count = 0
+        self._lock = threading.Lock()
+        self._stats = {'published': 0, 'wakeups': 0, 'rejected': 0}
+
+    def subscribe(self, user_id):
+        """Return a new Subscription, or None if this process is at max_streams"""
+        with self._lock:
+            if self._count >= self.max_streams:
+                self._stats['rejected'] += 1
+                return None
+            subscription = Subscription(self, user_id)
+            self._subscribers.setdefault(user_id, set()).add(subscription)
+            self._count += 1
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            subscribers = self._subscribers.get(subscription.user_id)
+            if not subscribers or subscription not in subscribers:
+                return
+            subscribers.discard(subscription)
+            if not subscribers:
+                del self._subscribers[subscription.user_id]
+            self._count -= 1
+
+    def publish(self, rows):
+        """Called with committed (id, user_id, message, created_at) rows"""
+        with self._lock:
+            self._stats['published'] += len(rows)
+            for user_id in {row[1] for row in rows}:
+                for subscription in self._subscribers.get(user_id, ()):
+                    subscription.notify()
+                    self._stats['wakeups'] += 1
+
+    def stats(self):
+        with self._lock:
+            return dict(self._stats, streams=self._count, users=len(self._subscribers),
+                        max_streams=self.max_streams)
@@ -0,0 +1,210 @@
+"""
+Smart Career Advisor - Notification Sink
+Write-behind buffer that inserts notifications in batches
+
+Requests hand notifications to the sink and return without touching the
+database. A background thread writes everything queued so far with one
+executemany() in a single transaction, every FLUSH_INTERVAL_MS or as soon as
+BATCH_SIZE messages are waiting, so many requests share one commit.
+
+A batch is only dropped from the buffer after its transaction commits; a
+failed flush puts it back in front and retries. close() drains pending
+messages; the app registers it with atexit, which also runs on gunicorn's
+graceful SIGTERM shutdown. So delivery is at-least-once only through a
+graceful shutdown: the buffer lives in process memory, and a crash or kill
+loses what was queued, normally the last FLUSH_INTERVAL_MS of notifications
+(everything since the database became unavailable, if it is). Listeners
+are called with each committed batch, ids included (the app feeds its SSE
+hub this way).
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone
+
+FLUSH_INTERVAL_MS = float(os.environ.get('SCA_NOTIFICATION_FLUSH_MS', 200))
+BATCH_SIZE = int(os.environ.get('SCA_NOTIFICATION_BATCH_SIZE', 100))
+# Past this many pending messages, add() flushes in the caller instead of growing further
+MAX_PENDING = int(os.environ.get('SCA_NOTIFICATION_MAX_PENDING', 10000))
+
+RETRY_DELAY_SECONDS = 1.0
+DRAIN_ATTEMPTS = 3
+
+INSERT_SQL = 'INSERT INTO notifications (user_id, message, created_at) VALUES (?, ?, ?)'
+
+
+def utc_timestamp():
+    """Same format as SQLite's CURRENT_TIMESTAMP, taken when the event happened"""
+    return datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M:%S')
+
+
+class NotificationSink:
+    """Buffers notification rows and flushes them in batched transactions.
+
+    connect() must return a new sqlite3 connection to the application
+    database; the sink opens one for its flusher thread. Each listener is
+    called with the (id, user_id, message, created_at) rows of every batch
+    after it commits.
+    """
+
+    def __init__(self, connect, flush_interval_ms=FLUSH_INTERVAL_MS, batch_size=BATCH_SIZE,
+                 max_pending=MAX_PENDING, listeners=()):
+        self.connect = connect
+        self.listeners = list(listeners)
+        self.flush_interval = flush_interval_ms / 1000.0
+        self.batch_size = batch_size
+        self.max_pending = max_pending
+        self._pending = deque()
+        self._lock = threading.Lock()          # guards _pending
+        self._flush_lock = threading.Lock()    # one flush at a time
+        self._wakeup = threading.Event()
+        self._local = threading.local()
+        self._thread = None
+        self._pid = None
+        self._closed = False
+        self._stats = {'added': 0, 'flushed': 0, 'batches': 0, 'failures': 0}
+
+    def add(self, user_id, message):
+        """Queue a notification; it is written within flush_interval"""
+        if self._closed:
+            # After shutdown started nothing would flush it later
+            try:
+                self._write_now([(user_id, message, utc_timestamp())])
+            except sqlite3.Error as e:
+                print(f"[NotificationSink] Notification lost during shutdown: {e}")
+            return
+
+        self._ensure_started()
+        with self._lock:
+            self._pending.append((user_id, message, utc_timestamp()))
+            self._stats['added'] += 1
+            size = len(self._pending)
+        if size >= self.batch_size:
+            self._wakeup.set()
+        if size >= self.max_pending:
+            # The caller's own write has committed: a failure here must not fail its request.
+            # flush() put the batch back, so the flusher thread retries it.
+            try:
+                self.flush()
+            except sqlite3.Error:
+                pass
+
+    def has_pending(self, user_id=None):
+        with self._lock:
+            if user_id is None:
+                return bool(self._pending)
+            return any(row[0] == user_id for row in self._pending)
+
+    def _ensure_started(self):
+        # Threads do not survive fork, so each (gunicorn) worker starts its own
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name='notification-sink', daemon=True)
+            self._thread.start()
+
+    def _connection(self):
+        # Per thread: the flusher thread, plus callers that flush synchronously
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._local.conn = self.connect()
+            conn.isolation_level = None   # explicit BEGIN/COMMIT below
+        return conn
+
+    def _insert(self, conn, rows):
+        """Insert rows in one transaction; return them with their new ids.
+
+        AUTOINCREMENT ids of rows inserted by a single writer transaction
+        are contiguous, so they follow from last_insert_rowid().
+        """
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            conn.executemany(INSERT_SQL, rows)
+            last_id = conn.execute('SELECT last_insert_rowid()').fetchone()[0]
+            conn.execute('COMMIT')
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+        first_id = last_id - len(rows) + 1
+        return [(first_id + i, *row) for i, row in enumerate(rows)]
+
+    def flush(self):
+        """Write everything queued so far. Returns the inserted (id, user_id, message, created_at) rows."""
+        written = []
+        with self._flush_lock:
+            while True:
+                with self._lock:
+                    batch = [self._pending.popleft()
+                             for _ in range(min(self.batch_size, len(self._pending)))]
+                if not batch:
+                    return written
+                try:
+                    rows = self._insert(self._connection(), batch)
+                except sqlite3.Error as e:
+                    # Put the batch back in front, in order, and let the caller retry later
+                    with self._lock:
+                        self._pending.extendleft(reversed(batch))
+                        self._stats['failures'] += 1
+                    print(f"[NotificationSink] Flush of {len(batch)} notifications failed: {e}")
+                    self._local.conn = None
+                    raise
+                with self._lock:
+                    self._stats['flushed'] += len(batch)
+                    self._stats['batches'] += 1
+                written.extend(rows)
+                self._notify(rows)
+
+    def _notify(self, rows):
+        for listener in self.listeners:
+            try:
+                listener(rows)
+            except Exception as e:
+                # The rows are committed; a listener failing must not requeue them
+                print(f"[NotificationSink] Listener failed: {e}")
+
+    def _write_now(self, rows):
+        conn = self.connect()
+        conn.isolation_level = None
+        try:
+            rows = self._insert(conn, rows)
+        finally:
+            conn.close()
+        self._notify(rows)
+
+    def _run(self):
+        while not self._closed:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except sqlite3.Error:
+                time.sleep(RETRY_DELAY_SECONDS)
+
+    def close(self):
+        """Stop the flusher and drain the buffer (called at process exit)"""
+        if self._closed:
+            return
+        self._closed = True
+        self._wakeup.set()
+        for attempt in range(DRAIN_ATTEMPTS):
+            try:
+                self.flush()
+                break
+            except sqlite3.Error:
+                time.sleep(RETRY_DELAY_SECONDS)
+        with self._lock:
+            lost = len(self._pending)
+        if lost:
+            print(f"[NotificationSink] {lost} notifications could not be written at shutdown")
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats, pending=len(self._pending))
+        stats.update(flush_interval_ms=self.flush_interval * 1000.0, batch_size=self.batch_size)
+        return stats
@@ -0,0 +1,105 @@
+"""
+Smart Career Advisor - Sandboxed PDF Extraction
+Parses PDFs in short-lived child processes with a time, page and memory budget
+
+Each document gets its own child process (pdf_worker.py, which imports only
+PyPDF2) so a pathological PDF can be killed without touching the web worker,
+and a child never re-imports the app with its models, migrations and
+background threads. Pages are streamed back one at a time, so a timeout
+still returns the pages read so far. At most PDF_MAX_WORKERS documents are
+parsed at once per web worker.
+"""
+
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+from collections import namedtuple
+
+PDF_TIMEOUT_SECONDS = float(os.environ.get('SCA_PDF_TIMEOUT_SECONDS', 10))
+PDF_MAX_PAGES = int(os.environ.get('SCA_PDF_MAX_PAGES', 50))
+PDF_MEMORY_LIMIT_MB = int(os.environ.get('SCA_PDF_MEMORY_LIMIT_MB', 512))
+PDF_MAX_WORKERS = int(os.environ.get('SCA_PDF_MAX_WORKERS', 2))
+
+# Extraction statuses
+STATUS_OK = 'ok'
+STATUS_TRUNCATED = 'truncated'        # stopped at PDF_MAX_PAGES
+STATUS_TIMEOUT = 'timeout'            # partial text, parse exceeded the time budget
+STATUS_MEMORY_LIMIT = 'memory_limit'  # partial text, parse exceeded the memory cap
+STATUS_BUSY = 'busy'                  # no free extraction slot within the time budget
+STATUS_ERROR = 'error'                # unreadable or corrupt file
+
+ExtractionResult = namedtuple('ExtractionResult', ['text', 'status', 'pages_read', 'page_count', 'error'])
+
+# Standalone child script: imports only PyPDF2, never the web app
+PDF_WORKER_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'pdf_worker.py')
+
+_slots = threading.BoundedSemaphore(PDF_MAX_WORKERS)
+
+
+def _messages(output):
+    """Decode the worker's JSON lines; a line cut short by a kill is dropped"""
+    for line in output.decode('utf-8', 'replace').splitlines():
+        try:
+            yield json.loads(line)
+        except ValueError:
+            break
+
+
+def extract_pdf_text(source, timeout=PDF_TIMEOUT_SECONDS, max_pages=PDF_MAX_PAGES,
+                     memory_limit_mb=PDF_MEMORY_LIMIT_MB):
+    """Extract text from a PDF given as a path or bytes.
+
+    Returns an ExtractionResult; status tells whether the text is complete.
+    """
+    deadline = time.monotonic() + timeout
+    if not _slots.acquire(timeout=timeout):
+        return ExtractionResult('', STATUS_BUSY, 0, None, 'All PDF extraction workers are busy')
+
+    try:
+        is_bytes = isinstance(source, bytes)
+        process = subprocess.Popen(
+            [sys.executable, PDF_WORKER_SCRIPT, '-' if is_bytes else os.fspath(source), str(max_pages),
+             str(memory_limit_mb)],
+            stdin=subprocess.PIPE if is_bytes else subprocess.DEVNULL,
+            stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+        )
+        timed_out = False
+        try:
+            output, _ = process.communicate(source if is_bytes else None,
+                                            timeout=max(deadline - time.monotonic(), 0))
+        except subprocess.TimeoutExpired:
+            # Output read before the kill is kept, so finished pages survive
+            timed_out = True
+            process.kill()
+            output, _ = process.communicate()
+
+        pages = []
+        page_count = None
+        status, error = STATUS_ERROR, None
+        for kind, payload in _messages(output):
+            if kind == 'pages':
+                page_count = payload
+            elif kind == 'page':
+                pages.append(payload)
+            elif kind == 'done':
+                truncated = page_count is not None and page_count > len(pages)
+                status = STATUS_TRUNCATED if truncated else STATUS_OK
+                if truncated:
+                    error = f'Only the first {max_pages} of {page_count} pages were read'
+                break
+            else:
+                status = STATUS_MEMORY_LIMIT if payload == STATUS_MEMORY_LIMIT else STATUS_ERROR
+                error = payload
+                break
+        else:
+            if timed_out:
+                status, error = STATUS_TIMEOUT, f'PDF parsing exceeded {timeout:g}s'
+            else:
+                error = f'PDF parser exited unexpectedly (exit code {process.returncode})'
+
+        return ExtractionResult(''.join(pages), status, len(pages), page_count, error)
+    finally:
+        _slots.release()
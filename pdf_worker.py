@@ -0,0 +1,56 @@
+"""
+Smart Career Advisor - PDF Worker
+Standalone child process that parses one PDF for pdf_extract.py
+
+Run as `python pdf_worker.py <path or -> <max pages> <memory limit MB>`;
+"-" reads the PDF bytes from stdin. It imports nothing but PyPDF2, so a
+child never re-imports the web app. Messages go to stdout as one JSON array
+per line, flushed as they are produced so a killed child still leaves the
+pages it finished:
+
+    ["pages", n]  ["page", text] ...  ["done", null]   or   ["error", message]
+"""
+
+import io
+import json
+import sys
+
+try:
+    import resource
+except ImportError:  # Windows: no per-process memory limit
+    resource = None
+
+# Error message for a parse that ran out of memory (pdf_extract.STATUS_MEMORY_LIMIT)
+MEMORY_LIMIT = 'memory_limit'
+
+
+def send(kind, payload):
+    sys.stdout.write(json.dumps([kind, payload]) + '\n')
+    sys.stdout.flush()
+
+
+def parse_pdf(source, max_pages, memory_limit_mb):
+    try:
+        if resource is not None and memory_limit_mb > 0:
+            limit = memory_limit_mb * 1024 * 1024
+            resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+        import PyPDF2
+
+        stream = io.BytesIO(sys.stdin.buffer.read()) if source == '-' else open(source, 'rb')
+        with stream:
+            reader = PyPDF2.PdfReader(stream)
+            send('pages', len(reader.pages))
+            for index, page in enumerate(reader.pages):
+                if index >= max_pages:
+                    break
+                send('page', page.extract_text() or '')
+        send('done', None)
+    except MemoryError:
+        send('error', MEMORY_LIMIT)
+    except Exception as e:
+        send('error', f'{type(e).__name__}: {e}')
+
+
+if __name__ == '__main__':
+    parse_pdf(sys.argv[1], int(sys.argv[2]), int(sys.argv[3]))
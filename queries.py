@@ -0,0 +1,54 @@
+"""
+Smart Career Advisor - Hot SQL Queries
+The queries app.py runs on every request, with sample parameters for EXPLAIN
+
+HOT_QUERIES maps a name to (sql, params). `flask check-query-plans` and
+tests/test_migrations.py run EXPLAIN QUERY PLAN for each of them against a
+freshly migrated database and fail if one scans a whole table or sorts in a
+temp B-tree, so a dropped or mismatched index is caught before deployment.
+"""
+
+from resume_index import SYNC_QUERY as RESUME_VECTORS_SYNC_QUERY
+
+NOTIFICATIONS_QUERY = (
+    'SELECT id, message, created_at, is_read FROM notifications '
+    'WHERE user_id = ? ORDER BY created_at DESC, id DESC LIMIT ?'
+)
+NOTIFICATIONS_PAGE_QUERY = (
+    'SELECT id, message, created_at, is_read FROM notifications '
+    'WHERE user_id = ? AND (created_at, id) < (?, ?) ORDER BY created_at DESC, id DESC LIMIT ?'
+)
+UNREAD_COUNT_QUERY = 'SELECT unread FROM notification_counters WHERE user_id = ?'
+NOTIFICATIONS_SINCE_QUERY = (
+    'SELECT id, message, created_at, is_read FROM notifications '
+    'WHERE user_id = ? AND id > ? ORDER BY id LIMIT ?'
+)
+NOTIFICATIONS_LAST_ID_QUERY = 'SELECT MAX(id) FROM notifications WHERE user_id = ?'
+LATEST_RESUME_QUERY = 'SELECT id FROM resumes WHERE user_id = ? ORDER BY uploaded_at DESC LIMIT 1'
+PROFILE_QUERY = 'SELECT * FROM profiles WHERE user_id = ?'
+LOGIN_QUERY = 'SELECT id, password_hash FROM users WHERE email = ?'
+RESUME_CONTENT_QUERY = 'SELECT * FROM resume_contents WHERE content_hash = ?'
+RESUME_LAST_UPLOAD_BY_HASH_QUERY = (
+    'SELECT content_hash, MAX(uploaded_at) FROM resumes '
+    'WHERE content_hash IN ({placeholders}) GROUP BY content_hash'
+)
+
+RESUME_VECTOR_QUERY = 'SELECT vector FROM resume_vectors WHERE resume_id = ? AND model_version = ?'
+INSERT_RESUME_VECTOR = (
+    'INSERT OR IGNORE INTO resume_vectors (resume_id, user_id, model_version, vector) VALUES (?, ?, ?, ?)'
+)
+
+HOT_QUERIES = {
+    'notifications': (NOTIFICATIONS_QUERY, (1, 20)),
+    'notifications_page': (NOTIFICATIONS_PAGE_QUERY, (1, '2024-01-01 00:00:00', 100, 20)),
+    'unread_count': (UNREAD_COUNT_QUERY, (1,)),
+    'notifications_since': (NOTIFICATIONS_SINCE_QUERY, (1, 0, 100)),
+    'notifications_last_id': (NOTIFICATIONS_LAST_ID_QUERY, (1,)),
+    'latest_resume': (LATEST_RESUME_QUERY, (1,)),
+    'profile': (PROFILE_QUERY, (1,)),
+    'login': (LOGIN_QUERY, ('user@example.com',)),
+    'resume_content': (RESUME_CONTENT_QUERY, ('0' * 64,)),
+    'gc_last_upload': (RESUME_LAST_UPLOAD_BY_HASH_QUERY.format(placeholders='?, ?'), ('0' * 64, '1' * 64)),
+    'resume_vector': (RESUME_VECTOR_QUERY, (1, 'v1')),
+    'resume_vectors_sync': (RESUME_VECTORS_SYNC_QUERY, ('v1', 0, 5000)),
+}
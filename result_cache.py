@@ -0,0 +1,255 @@
+"""
+Smart Career Advisor - Result Cache
+Content-addressed cache of analysis results shared by all gunicorn workers
+
+Entries are keyed by a SHA-256 of (kind, version, normalized text), where the
+version is the model version for predictions. Storage is a local SQLite file
+in WAL mode, so every worker process on the host sees the same entries.
+
+A lookup is a single read and never takes the write lock. Hit/miss counts
+are kept in memory in each process, and an entry's last_access is only
+refreshed when it is more than TOUCH_SECONDS old. Both are written in one
+transaction every FLUSH_EVERY lookups, and before every eviction pass.
+Counts still pending when a worker exits are lost.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+CACHE_DATABASE = os.environ.get('SCA_CACHE_DATABASE', 'cache.db')
+CACHE_MAX_ENTRIES = int(os.environ.get('SCA_CACHE_MAX_ENTRIES', 10000))
+CACHE_MAX_BYTES = int(os.environ.get('SCA_CACHE_MAX_BYTES', 64 * 1024 * 1024))
+CACHE_TTL_SECONDS = float(os.environ.get('SCA_CACHE_TTL_SECONDS', 7 * 24 * 3600))
+
+# Run the TTL/size eviction pass once every N writes per process
+EVICT_EVERY = 100
+# Lookups per process between writes of the pending counters and access times
+FLUSH_EVERY = 100
+# A hit refreshes last_access only if it is older than this (LRU resolution)
+TOUCH_SECONDS = 60.0
+
+
+def normalize_text(text):
+    """Collapse whitespace so re-extracted copies of the same resume share a key"""
+    return ' '.join(text.split())
+
+
+class ResultCache:
+    """SQLite-backed LRU/TTL cache with batched hit/miss counters.
+
+    Cache failures never propagate: a locked or broken cache file behaves
+    like a miss so requests fall back to computing the result.
+    """
+
+    def __init__(self, path=CACHE_DATABASE, max_entries=CACHE_MAX_ENTRIES,
+                 max_bytes=CACHE_MAX_BYTES, ttl_seconds=CACHE_TTL_SECONDS):
+        self.path = path
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.enabled = max_entries > 0
+        self._local = threading.local()
+        self._writes = 0
+        self._writes_lock = threading.Lock()
+        # Not yet written: counter name -> increment, key -> last access time
+        self._pending_counts = {}
+        self._pending_touches = {}
+        self._lookups = 0
+        self._pending_lock = threading.Lock()
+        self._initialized = False
+
+    def _conn(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=1.0, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            if not self._initialized:
+                conn.execute('''CREATE TABLE IF NOT EXISTS cache_entries (
+                    key TEXT PRIMARY KEY,
+                    kind TEXT NOT NULL,
+                    value TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_access REAL NOT NULL
+                )''')
+                conn.execute('CREATE INDEX IF NOT EXISTS idx_cache_last_access ON cache_entries(last_access)')
+                conn.execute('''CREATE TABLE IF NOT EXISTS cache_counters (
+                    name TEXT PRIMARY KEY,
+                    value INTEGER NOT NULL DEFAULT 0
+                )''')
+                self._initialized = True
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def make_key(kind, text, version):
+        digest = hashlib.sha256()
+        for part in (kind, str(version), normalize_text(text)):
+            digest.update(part.encode('utf-8', errors='ignore'))
+            digest.update(b'\0')
+        return digest.hexdigest()
+
+    def get(self, kind, text, version):
+        """Return the cached value, or None on a miss or expired entry"""
+        if not self.enabled:
+            return None
+        key = self.make_key(kind, text, version)
+        now = time.time()
+        try:
+            row = self._conn().execute(
+                'SELECT value, created_at, last_access FROM cache_entries WHERE key = ?', (key,)
+            ).fetchone()
+        except sqlite3.Error as e:
+            print(f"[ResultCache] get failed: {e}")
+            return None
+        hit = row is not None and now - row[1] <= self.ttl_seconds
+
+        name = f'{kind}.hits' if hit else f'{kind}.misses'
+        with self._pending_lock:
+            self._pending_counts[name] = self._pending_counts.get(name, 0) + 1
+            if hit and now - row[2] > TOUCH_SECONDS:
+                self._pending_touches[key] = now
+            self._lookups += 1
+            due = self._lookups % FLUSH_EVERY == 0
+        if due:
+            self.flush()
+        return json.loads(row[0]) if hit else None
+
+    def set(self, kind, text, version, value):
+        """Store a JSON-serializable value"""
+        if not self.enabled:
+            return
+        key = self.make_key(kind, text, version)
+        payload = json.dumps(value)
+        now = time.time()
+        try:
+            self._conn().execute(
+                'INSERT OR REPLACE INTO cache_entries (key, kind, value, size, created_at, last_access) '
+                'VALUES (?, ?, ?, ?, ?, ?)',
+                (key, kind, payload, len(payload), now, now)
+            )
+        except sqlite3.Error as e:
+            print(f"[ResultCache] set failed: {e}")
+            return
+
+        with self._writes_lock:
+            self._writes += 1
+            due = self._writes % EVICT_EVERY == 0
+        if due:
+            self.evict()
+
+    def _take_pending(self):
+        with self._pending_lock:
+            counts, touches = self._pending_counts, self._pending_touches
+            self._pending_counts, self._pending_touches = {}, {}
+        return counts, touches
+
+    def _restore_pending(self, counts, touches):
+        """Put back what a failed write took, so it goes out with the next flush"""
+        with self._pending_lock:
+            for name, amount in counts.items():
+                self._pending_counts[name] = self._pending_counts.get(name, 0) + amount
+            for key, accessed in touches.items():
+                self._pending_touches[key] = max(accessed, self._pending_touches.get(key, 0.0))
+
+    @staticmethod
+    def _write_pending(conn, counts, touches):
+        conn.executemany('UPDATE cache_entries SET last_access = MAX(last_access, ?) WHERE key = ?',
+                         [(accessed, key) for key, accessed in touches.items()])
+        conn.executemany(
+            'INSERT INTO cache_counters (name, value) VALUES (?, ?) '
+            'ON CONFLICT(name) DO UPDATE SET value = value + excluded.value',
+            [(name, amount) for name, amount in counts.items() if amount]
+        )
+
+    def flush(self):
+        """Write this process's pending counters and access times"""
+        counts, touches = self._take_pending()
+        if not counts and not touches:
+            return
+        try:
+            conn = self._conn()
+            conn.execute('BEGIN IMMEDIATE')
+            self._write_pending(conn, counts, touches)
+            conn.execute('COMMIT')
+        except sqlite3.Error as e:
+            print(f"[ResultCache] flush failed: {e}")
+            self._rollback()
+            self._restore_pending(counts, touches)
+
+    def evict(self):
+        """Drop expired entries, then least-recently-used ones beyond the size limits"""
+        counts, touches = self._take_pending()
+        try:
+            conn = self._conn()
+            conn.execute('BEGIN IMMEDIATE')
+            # Access times first, so recently read entries are not the ones evicted
+            self._write_pending(conn, counts, touches)
+            expired = conn.execute(
+                'DELETE FROM cache_entries WHERE created_at < ?', (time.time() - self.ttl_seconds,)
+            ).rowcount
+            count, total = conn.execute(
+                'SELECT COUNT(*), COALESCE(SUM(size), 0) FROM cache_entries'
+            ).fetchone()
+
+            evicted = 0
+            if count > self.max_entries or total > self.max_bytes:
+                # Walk from the oldest access until both limits are satisfied
+                drop_count, drop_bytes = count - self.max_entries, total - self.max_bytes
+                keys = []
+                for key, size in conn.execute('SELECT key, size FROM cache_entries ORDER BY last_access'):
+                    if drop_count <= 0 and drop_bytes <= 0:
+                        break
+                    keys.append((key,))
+                    drop_count -= 1
+                    drop_bytes -= size
+                conn.executemany('DELETE FROM cache_entries WHERE key = ?', keys)
+                evicted = len(keys)
+
+            self._write_pending(conn, {'expired': expired, 'evicted': evicted}, {})
+            conn.execute('COMMIT')
+        except sqlite3.Error as e:
+            print(f"[ResultCache] eviction failed: {e}")
+            self._rollback()
+            self._restore_pending(counts, touches)
+
+    def _rollback(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None and conn.in_transaction:
+            conn.execute('ROLLBACK')
+
+    def stats(self):
+        """Return entry count, size and the shared hit/miss/eviction counters.
+
+        This process's pending counts are flushed first; other workers' counts
+        may lag by up to FLUSH_EVERY lookups each.
+        """
+        if not self.enabled:
+            return {'enabled': False}
+        self.flush()
+        try:
+            conn = self._conn()
+            count, total = conn.execute(
+                'SELECT COUNT(*), COALESCE(SUM(size), 0) FROM cache_entries'
+            ).fetchone()
+            counters = dict(conn.execute('SELECT name, value FROM cache_counters').fetchall())
+        except sqlite3.Error as e:
+            return {'enabled': True, 'error': str(e)}
+        return {
+            'enabled': True,
+            'entries': count,
+            'bytes': total,
+            'max_entries': self.max_entries,
+            'max_bytes': self.max_bytes,
+            'ttl_seconds': self.ttl_seconds,
+            'counters': counters,
+        }
+
+
+# Shared instance used by every endpoint
+result_cache = ResultCache()
@@ -0,0 +1,164 @@
+"""
+Smart Career Advisor - Resume Similarity Index
+Incrementally maintained cosine-similarity index over stored resume vectors
+
+Every analysed resume gets a row in resume_vectors holding its TF-IDF
+vector, tagged with the model version whose vectorizer produced it. The blob
+is the vector's nonzero entries only: int32 term indices followed by float32
+weights, 8 bytes per term instead of 4 bytes for each of the ~5000 features.
+
+The table is append-only, so its id is a change log. ResumeIndex holds the
+vectors of one model version as a CSR matrix and never re-vectorizes
+anything: sync() reads only rows with a higher id than the last one it has
+seen and appends them to a small tail, which is merged into the main matrix
+once it reaches TAIL_ROWS. Each worker process keeps its own index and
+catches up the same way, so resumes stored by other workers (or backfilled
+by `flask vectorize-resumes`) appear on their next query.
+"""
+
+import threading
+
+import numpy as np
+from scipy import sparse
+
+# Appended rows kept in the tail before they are merged into the main matrix
+TAIL_ROWS = 1024
+# Rows read from the database per sync step
+SYNC_BATCH_ROWS = 5000
+# Candidates ranked per requested result before falling back to a full sort
+SHORTLIST_FACTOR = 4
+
+SYNC_QUERY = (
+    'SELECT id, resume_id, user_id, vector FROM resume_vectors '
+    'WHERE model_version = ? AND id > ? ORDER BY id LIMIT ?'
+)
+
+
+def encode_vector(row):
+    """Pack a 1 x n sparse row into the resume_vectors blob format"""
+    row = row.tocsr()
+    return row.indices.astype('<i4').tobytes() + row.data.astype('<f4').tobytes()
+
+
+def decode_vector(blob):
+    """Return (indices, weights) arrays of a vector blob"""
+    nnz = len(blob) // 8
+    return (np.frombuffer(blob, dtype='<i4', count=nnz),
+            np.frombuffer(blob, dtype='<f4', count=nnz, offset=nnz * 4))
+
+
+def vector_row(blob, n_features):
+    """Rebuild a 1 x n_features CSR row from a vector blob"""
+    indices, weights = decode_vector(blob)
+    return sparse.csr_matrix((weights, indices, [0, len(indices)]), shape=(1, n_features))
+
+
+class ResumeIndex:
+    """Resume vectors of one model version, searchable by cosine similarity.
+
+    TF-IDF rows are L2-normalized, so the dot product is the cosine.
+    """
+
+    def __init__(self, version, n_features):
+        self.version = version
+        self.n_features = n_features
+        self._matrix = sparse.csr_matrix((0, n_features), dtype=np.float32)
+        self._resume_ids = np.empty(0, dtype=np.int64)
+        self._user_ids = np.empty(0, dtype=np.int64)
+        self._tail = []                 # (resume_id, user_id, indices, weights) not merged yet
+        self._last_id = 0               # resume_vectors.id synced up to
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._resume_ids) + len(self._tail)
+
+    def sync(self, conn):
+        """Append resumes stored since the last sync. Returns the number added."""
+        added = 0
+        with self._lock:
+            while True:
+                rows = conn.execute(SYNC_QUERY, (self.version, self._last_id, SYNC_BATCH_ROWS)).fetchall()
+                for _, resume_id, user_id, blob in rows:
+                    self._tail.append((resume_id, user_id, *decode_vector(blob)))
+                if rows:
+                    self._last_id = rows[-1][0]
+                    added += len(rows)
+                if len(self._tail) >= TAIL_ROWS:
+                    self._merge()
+                if len(rows) < SYNC_BATCH_ROWS:
+                    return added
+
+    def _tail_matrix(self, tail):
+        """Return (CSR matrix, resume ids, user ids) of tail rows"""
+        if not tail:
+            return (sparse.csr_matrix((0, self.n_features), dtype=np.float32),
+                    np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64))
+        resume_ids, user_ids, indices, weights = zip(*tail)
+        indptr = np.concatenate([[0], np.cumsum([len(i) for i in indices])])
+        matrix = sparse.csr_matrix(
+            (np.concatenate(weights), np.concatenate(indices), indptr),
+            shape=(len(tail), self.n_features)
+        )
+        return matrix, np.asarray(resume_ids, dtype=np.int64), np.asarray(user_ids, dtype=np.int64)
+
+    def _merge(self):
+        """Fold the tail into the main matrix (one copy per TAIL_ROWS appends)"""
+        matrix, resume_ids, user_ids = self._tail_matrix(self._tail)
+        self._matrix = sparse.vstack([self._matrix, matrix], format='csr')
+        self._resume_ids = np.concatenate([self._resume_ids, resume_ids])
+        self._user_ids = np.concatenate([self._user_ids, user_ids])
+        self._tail = []
+
+    def search(self, query, k, exclude_user=None):
+        """Return [(resume_id, user_id, score)] for the k most similar users' best resumes.
+
+        query is a 1 x n_features sparse row; each user appears at most once.
+        """
+        with self._lock:
+            matrix, resume_ids, user_ids, tail = self._matrix, self._resume_ids, self._user_ids, list(self._tail)
+
+        # The main matrix is never modified in place, so it is scored outside the lock
+        tail_matrix, tail_resume_ids, tail_user_ids = self._tail_matrix(tail)
+        resume_ids = np.concatenate([resume_ids, tail_resume_ids])
+        user_ids = np.concatenate([user_ids, tail_user_ids])
+        if not len(resume_ids):
+            return []
+        # Sparse matrix times a dense query vector: one pass over the stored entries
+        query = query.toarray().ravel().astype(np.float32)
+        scores = np.concatenate([matrix @ query, tail_matrix @ query])
+        candidates = np.flatnonzero(scores > 0.0)
+        if exclude_user is not None:
+            candidates = candidates[user_ids[candidates] != exclude_user]
+
+        # Rank a shortlist first; only sort everything if it holds fewer than k distinct users
+        shortlist = SHORTLIST_FACTOR * k
+        if len(candidates) > shortlist:
+            top = candidates[np.argpartition(-scores[candidates], shortlist)[:shortlist]]
+            results = self._best_per_user(top, scores, resume_ids, user_ids, k)
+            if len(results) == k:
+                return results
+        return self._best_per_user(candidates, scores, resume_ids, user_ids, k)
+
+    @staticmethod
+    def _best_per_user(candidates, scores, resume_ids, user_ids, k):
+        candidates = candidates[np.argsort(-scores[candidates], kind='stable')]
+        results, seen = [], set()
+        for i in candidates:
+            user_id = int(user_ids[i])
+            if user_id in seen:
+                continue
+            seen.add(user_id)
+            results.append((int(resume_ids[i]), user_id, float(scores[i])))
+            if len(results) == k:
+                break
+        return results
+
+    def stats(self):
+        with self._lock:
+            return {
+                'model_version': self.version,
+                'resumes': len(self._resume_ids) + len(self._tail),
+                'tail_rows': len(self._tail),
+                'nnz': int(self._matrix.nnz) + sum(len(row[2]) for row in self._tail),
+                'synced_to': self._last_id,
+            }
@@ -0,0 +1,147 @@
+"""
+Smart Career Advisor - Role x Skill Matrix
+How strongly each of the 8 roles asks for each skill, precomputed at training time
+
+train_model.py counts, for every normalized role, the share of its job
+postings that list each skill (the `skills` column of jobs_dataset.csv,
+comma-separated). The result is a dense n_roles x n_skills float32 matrix
+saved as role_skills.npz.
+
+At request time a user's skills become one boolean vector over the skill
+axis (np.isin on lowercased names), and every role is scored at once:
+
+    coverage = (weights @ has) / weights.sum(axis=1)     share of demand covered
+    gaps     = weights * ~has                            demand for missing skills
+
+The top missing skills per role come from one argsort over the gap matrix.
+"""
+
+import numpy as np
+from scipy import sparse
+
+# Missing skills listed per role
+TOP_MISSING = 5
+# Bump when RoleSkillCounts builds a different matrix; train_model's feature cache key includes it
+# (2: skill names case-folded into one column)
+MATRIX_FORMAT = 2
+
+
+def split_skills(skills):
+    """Skill names of a comma-separated skills cell"""
+    return [name.strip() for name in str(skills).split(',') if name.strip()]
+
+
+class RoleSkillCounts:
+    """Postings per role listing each skill, accumulated chunk by chunk.
+
+    Skills are case-folded, as RoleSkillMatrix matches them, so "Docker" and
+    "docker" share one column; it is named after the spelling listed most.
+    """
+
+    def __init__(self, role_names):
+        self.role_names = list(role_names)
+        self.role_index = {role: i for i, role in enumerate(self.role_names)}
+        self.columns = {}               # lowercased skill name -> column of counts
+        self.spellings = {}             # lowercased skill name -> {spelling: times listed}
+        self.counts = np.zeros((len(self.role_names), 0), dtype=np.float64)
+        self.totals = np.zeros(len(self.role_names), dtype=np.float64)
+
+    def update(self, skills_column, roles):
+        """Add the postings of one chunk (skills cells and their normalized roles)"""
+        postings = [split_skills(cell) for cell in skills_column.fillna('')]
+        for name in (name for posting in postings for name in posting):
+            key = name.lower()
+            if key not in self.columns:
+                self.columns[key] = len(self.columns)
+                self.spellings[key] = {}
+            self.spellings[key][name] = self.spellings[key].get(name, 0) + 1
+        if len(self.columns) > self.counts.shape[1]:
+            grown = np.zeros((len(self.role_names), len(self.columns)), dtype=np.float64)
+            grown[:, :self.counts.shape[1]] = self.counts
+            self.counts = grown
+
+        # Posting x skill incidence matrix, then one sparse product per role
+        rows = np.repeat(np.arange(len(postings)), [len(posting) for posting in postings])
+        cols = np.fromiter((self.columns[name.lower()] for posting in postings for name in posting),
+                           dtype=np.int64, count=len(rows))
+        incidence = sparse.csr_matrix((np.ones(len(rows), dtype=np.float32), (rows, cols)),
+                                      shape=(len(postings), len(self.columns)))
+        incidence.data[:] = 1.0   # a skill listed twice in one posting, in any case, still counts once
+
+        labels = np.fromiter((self.role_index[role] for role in roles), dtype=np.int64, count=len(postings))
+        membership = sparse.csr_matrix((np.ones(len(labels), dtype=np.float32), (labels, np.arange(len(labels)))),
+                                       shape=(len(self.role_names), len(postings)))
+        self.counts += (membership @ incidence).toarray()
+        self.totals += np.bincount(labels, minlength=len(self.role_names))
+
+    def matrix(self):
+        """Return (skill names, weights): the fraction of each role's postings listing each skill"""
+        keys = sorted(self.columns)
+        order = [self.columns[key] for key in keys]
+        # Most listed spelling; the first in sort order on a tie
+        names = [min(self.spellings[key].items(), key=lambda item: (-item[1], item[0]))[0] for key in keys]
+        weights = self.counts[:, order] / np.maximum(self.totals, 1.0)[:, None]
+        return names, weights.astype(np.float32)
+
+
+def build_role_skill_matrix(skills_column, roles, role_names):
+    """Return (skill names, weights) from posting skills and their normalized role labels.
+
+    weights[r, s] is the fraction of role_names[r] postings listing skill s.
+    """
+    counts = RoleSkillCounts(role_names)
+    counts.update(skills_column, roles)
+    return counts.matrix()
+
+
+def export_role_skills(role_names, skill_names, weights, path):
+    np.savez(path, roles=np.asarray(role_names, dtype=str), skills=np.asarray(skill_names, dtype=str),
+             weights=np.asarray(weights, dtype=np.float32))
+
+
+class RoleSkillMatrix:
+    """Vectorized coverage and skill-gap analysis against every role at once"""
+
+    def __init__(self, roles, skills, weights):
+        self.roles = np.asarray(roles)
+        self.skills = np.asarray(skills)
+        self.weights = np.asarray(weights, dtype=np.float32)
+        self.skills_lower = np.char.lower(self.skills.astype(str))
+        self.demand = self.weights.sum(axis=1)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            return cls(data['roles'], data['skills'], data['weights'])
+
+    @property
+    def nbytes(self):
+        return self.weights.nbytes
+
+    def skill_vector(self, user_skills):
+        """Boolean vector over the skill axis: which skills the user has"""
+        wanted = np.asarray([skill.strip().lower() for skill in user_skills if skill.strip()], dtype=str)
+        return np.isin(self.skills_lower, wanted)
+
+    def analyze(self, user_skills, top_missing=TOP_MISSING):
+        """Return {role: {'skill_coverage', 'matched_skills', 'missing_skills'}} for every role"""
+        has = self.skill_vector(user_skills)
+        coverage = (self.weights @ has.astype(np.float32)) / np.maximum(self.demand, 1e-12)
+
+        # Highest-demand skills the user lacks, per role (rows sorted in one call)
+        gaps = np.where(has, 0.0, self.weights)
+        top = np.argsort(-gaps, axis=1, kind='stable')[:, :top_missing]
+        top_gaps = np.take_along_axis(gaps, top, axis=1)
+        matched = int(has.sum())
+
+        return {
+            str(role): {
+                'skill_coverage': round(float(coverage[r]), 4),
+                'matched_skills': matched,
+                'missing_skills': [
+                    {'skill': str(self.skills[s]), 'demand': round(float(g), 4)}
+                    for s, g in zip(top[r], top_gaps[r]) if g > 0.0
+                ],
+            }
+            for r, role in enumerate(self.roles)
+        }
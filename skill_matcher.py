@@ -0,0 +1,116 @@
+"""
+Smart Career Advisor - Skill Matcher
+Finds every known tech skill (and its aliases) in a resume in one pass
+
+The vocabulary lives in data/tech_skills.json:
+    {"skills": [{"name": "Kubernetes", "aliases": ["k8s"]},
+                {"name": "Go", "aliases": ["Golang"], "case_sensitive": true}, ...]}
+
+Text is split into tokens once; each skill phrase is stored as a token tuple
+in a hash table, so matching costs a few dict lookups per token no matter
+how many skills the vocabulary holds. Matches always cover whole tokens, so
+"Go" does not match "good" and "Express" does not match "expression".
+"""
+
+import hashlib
+import json
+import re
+
+SKILLS_FILE = 'data/tech_skills.json'
+
+# Tokens keep the characters that belong to skill names (C++, C#, Node.js);
+# a dot only stays inside a token when followed by more token characters.
+TOKEN_PATTERN = re.compile(r'[A-Za-z0-9_+#]+(?:\.[A-Za-z0-9_+#]+)*')
+
+
+def tokenize(text):
+    """Return (token, start, end) for every token in text"""
+    return [(m.group(), m.start(), m.end()) for m in TOKEN_PATTERN.finditer(text)]
+
+
+class SkillMatcher:
+    """Longest-match skill phrase lookup over a token stream.
+
+    Skill names and aliases are matched case-insensitively unless the entry
+    sets "case_sensitive", which then applies to its name (aliases stay
+    case-insensitive) - used for names that double as English words.
+    """
+
+    def __init__(self, entries, version=None):
+        self.skills = []
+        self._phrases = {}        # lowercased token tuple -> canonical skill
+        self._exact_phrases = {}  # exact-case token tuple -> canonical skill
+        self._prefixes = set()    # lowercased prefixes of every phrase, for early exit
+        self.max_tokens = 1
+
+        for entry in entries:
+            name = entry['name']
+            self.skills.append(name)
+            if entry.get('case_sensitive'):
+                self._add(name, name, exact=True)
+            else:
+                self._add(name, name)
+            for alias in entry.get('aliases', []):
+                self._add(alias, name)
+
+        self.version = version or hashlib.sha256(
+            json.dumps(entries, sort_keys=True).encode()
+        ).hexdigest()[:16]
+
+    @classmethod
+    def from_file(cls, path=SKILLS_FILE):
+        with open(path, 'rb') as f:
+            raw = f.read()
+        return cls(json.loads(raw)['skills'], version=hashlib.sha256(raw).hexdigest()[:16])
+
+    def _add(self, phrase, skill, exact=False):
+        tokens = tuple(token for token, _, _ in tokenize(phrase))
+        if not tokens:
+            return
+        if exact:
+            self._exact_phrases[tokens] = skill
+        else:
+            self._phrases[tuple(t.lower() for t in tokens)] = skill
+        lowered = tuple(t.lower() for t in tokens)
+        for i in range(1, len(lowered) + 1):
+            self._prefixes.add(lowered[:i])
+        self.max_tokens = max(self.max_tokens, len(tokens))
+
+    def find(self, text):
+        """Return every skill occurrence as {'skill', 'start', 'end', 'text'}, in text order"""
+        tokens = tokenize(text)
+        lowered = [token.lower() for token, _, _ in tokens]
+        matches = []
+        i = 0
+        while i < len(tokens):
+            best_skill, best_len = None, 0
+            for n in range(1, min(self.max_tokens, len(tokens) - i) + 1):
+                key = tuple(lowered[i:i + n])
+                if key not in self._prefixes:
+                    break
+                skill = self._phrases.get(key)
+                if skill is None and self._exact_phrases:
+                    skill = self._exact_phrases.get(tuple(t for t, _, _ in tokens[i:i + n]))
+                if skill is not None:
+                    best_skill, best_len = skill, n
+
+            if best_skill is None:
+                i += 1
+                continue
+
+            start, end = tokens[i][1], tokens[i + best_len - 1][2]
+            matches.append({'skill': best_skill, 'start': start, 'end': end, 'text': text[start:end]})
+            i += best_len
+        return matches
+
+    def extract(self, text):
+        """Return the distinct skills found in text, in order of first appearance"""
+        return list(dict.fromkeys(match['skill'] for match in self.find(text)))
+
+    def canonical(self, phrase):
+        """Map a single skill name or alias (e.g. "k8s") to its canonical name, or None"""
+        phrase = phrase.strip()
+        found = self.find(phrase)
+        if len(found) == 1 and found[0]['start'] == 0 and found[0]['end'] == len(phrase):
+            return found[0]['skill']
+        return None
@@ -0,0 +1,59 @@
+import numpy as np
+import pytest
+from scipy import sparse
+from sklearn.svm import LinearSVC
+
+from calibration import (CalibratedSVM, calibration_metrics, expected_calibration_error, export_svm_calibration,
+                         fit_temperature, softmax)
+
+
+def sample_logits(temperature, n=4000, classes=5, seed=0):
+    """Decision values whose labels are drawn from softmax(decision / temperature)"""
+    rng = np.random.RandomState(seed)
+    decision = rng.normal(scale=3.0, size=(n, classes))
+    proba = softmax(decision, temperature)
+    y = np.array([rng.choice(classes, p=p) for p in proba])
+    return decision, y
+
+
+@pytest.mark.parametrize('temperature', [0.5, 2.0])
+def test_fit_temperature_recovers_generating_temperature(temperature):
+    decision, y = sample_logits(temperature)
+    assert fit_temperature(decision, y) == pytest.approx(temperature, rel=0.15)
+
+
+def test_calibration_lowers_log_loss_and_ece():
+    decision, y = sample_logits(3.0)
+    fit_decision, fit_y, test_decision, test_y = decision[:2000], y[:2000], decision[2000:], y[2000:]
+    metrics = calibration_metrics(test_decision, test_y, fit_temperature(fit_decision, fit_y))
+    assert metrics['log_loss'] < metrics['log_loss_uncalibrated']
+    assert metrics['ece'] < metrics['ece_uncalibrated']
+
+
+def test_softmax_rows_sum_to_one_for_large_scores():
+    proba = softmax(np.array([[1000.0, 999.0, -1000.0], [0.0, 0.0, 0.0]]))
+    np.testing.assert_allclose(proba.sum(axis=1), 1.0)
+    np.testing.assert_allclose(proba[1], 1.0 / 3)
+
+
+def test_expected_calibration_error_of_perfect_confidence_is_zero():
+    proba = np.eye(3)[[0, 1, 2, 0]]
+    assert expected_calibration_error(proba, np.array([0, 1, 2, 0])) == 0.0
+    assert expected_calibration_error(proba, np.array([1, 1, 2, 0])) == pytest.approx(0.25)
+
+
+def test_calibrated_svm_keeps_svm_predictions(tmp_path):
+    rng = np.random.RandomState(0)
+    X = sparse.random(300, 30, density=0.3, format='csr', random_state=rng)
+    y = np.array(['analyst', 'designer', 'engineer'])[np.asarray(X[:, :3].argmax(axis=1)).ravel()]
+    svm = LinearSVC(random_state=0).fit(X, y)
+
+    path = str(tmp_path / 'svm_calibration.npz')
+    export_svm_calibration(svm, 0.4, path)
+    calibrated = CalibratedSVM.load(path)
+    assert calibrated.temperature == 0.4
+    np.testing.assert_array_equal(calibrated.predict(X), svm.predict(X))
+    np.testing.assert_allclose(calibrated.decision_function(X), svm.decision_function(X), rtol=1e-4, atol=1e-4)
+    proba = calibrated.predict_proba(X)
+    np.testing.assert_allclose(proba.sum(axis=1), 1.0)
+    np.testing.assert_array_equal(calibrated.classes_[proba.argmax(axis=1)], svm.predict(X))
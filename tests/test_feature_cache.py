@@ -0,0 +1,29 @@
+import os
+
+import train_model
+from train_model import feature_cache_key, prune_feature_caches
+
+
+def test_key_follows_dataset_parameters_and_builder_formats(tmp_path, monkeypatch):
+    csv_path = tmp_path / 'jobs.csv'
+    csv_path.write_text('role,skills,job_description\nData Scientist,Python,text\n')
+    key = feature_cache_key(str(csv_path))
+    assert feature_cache_key(str(csv_path)) == key
+    assert feature_cache_key(str(csv_path), dict(train_model.TFIDF_PARAMS, max_features=10)) != key
+
+    for name in ('FEATURE_CACHE_FORMAT', 'INDEX_FORMAT', 'MATRIX_FORMAT'):
+        with monkeypatch.context() as patch:
+            patch.setattr(train_model, name, getattr(train_model, name) + 1)
+            assert feature_cache_key(str(csv_path)) != key, name
+
+    csv_path.write_text('role,skills,job_description\nData Scientist,SQL,text\n')
+    assert feature_cache_key(str(csv_path)) != key
+
+
+def test_prune_keeps_the_most_recently_used(tmp_path):
+    for i, name in enumerate(['a', 'b', 'c', 'd.tmp']):
+        os.makedirs(tmp_path / name)
+        os.utime(tmp_path / name, (1000 + i, 1000 + i))
+    os.utime(tmp_path / 'a', (2000, 2000))
+    prune_feature_caches(str(tmp_path), keep=2)
+    assert sorted(os.listdir(tmp_path)) == ['a', 'c', 'd.tmp']
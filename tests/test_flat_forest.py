@@ -0,0 +1,47 @@
+import numpy as np
+import pytest
+from scipy import sparse
+from sklearn.ensemble import RandomForestClassifier
+
+from flat_forest import CHUNK_ROWS, FlatForest, export_flat_forest, flatten_forest
+
+
+@pytest.fixture(scope='module')
+def forest():
+    rng = np.random.RandomState(0)
+    X = sparse.random(600, 40, density=0.2, format='csr', random_state=rng, dtype=np.float64)
+    y = rng.randint(0, 4, size=600)
+    y[np.asarray(X[:, 3].todense()).ravel() > 0.5] = 3   # give the trees some structure
+    rf = RandomForestClassifier(n_estimators=15, max_depth=8, random_state=0).fit(X, y)
+    return rf, X
+
+
+def test_predict_proba_matches_sklearn_on_sparse_rows(forest):
+    rf, X = forest
+    flat = FlatForest(flatten_forest(rf))
+    assert X.shape[0] > CHUNK_ROWS   # crosses a chunk boundary
+    np.testing.assert_allclose(flat.predict_proba(X), rf.predict_proba(X), rtol=0, atol=1e-12)
+    np.testing.assert_array_equal(flat.predict(X), rf.predict(X))
+
+
+def test_predict_proba_matches_sklearn_on_dense_rows(forest):
+    rf, X = forest
+    dense = X[:50].toarray()
+    np.testing.assert_allclose(FlatForest(flatten_forest(rf)).predict_proba(dense), rf.predict_proba(dense),
+                               rtol=0, atol=1e-12)
+
+
+def test_apply_matches_sklearn_leaves(forest):
+    rf, X = forest
+    flat = FlatForest(flatten_forest(rf))
+    np.testing.assert_array_equal(flat.apply(X[:100]) - flat.roots, rf.apply(X[:100]))
+
+
+def test_export_and_load_round_trip(forest, tmp_path):
+    rf, X = forest
+    path = str(tmp_path / 'rf_flat.npz')
+    export_flat_forest(rf, path)
+    loaded = FlatForest.load(path)
+    assert loaded.n_features_in_ == X.shape[1]
+    np.testing.assert_array_equal(loaded.classes_, rf.classes_)
+    np.testing.assert_allclose(loaded.predict_proba(X), rf.predict_proba(X), rtol=0, atol=1e-12)
@@ -0,0 +1,29 @@
+import numpy as np
+import pytest
+from scipy import sparse
+
+from hyperparam_search import successive_halving
+
+
+def feature_set(seed=0, rows=300):
+    rng = np.random.RandomState(seed)
+    X = sparse.csr_matrix(rng.rand(rows, 8))
+    y = (X[:, 0].toarray().ravel() > 0.5).astype(int)
+    return X, y, X[:60], y[:60]
+
+
+def test_successive_halving_keeps_the_best_candidate():
+    candidates = [('svm', 'tfidf', {'C': c}) for c in (0.001, 0.1, 10.0)]
+    best, leaderboard = successive_halving(candidates, {'tfidf': feature_set()}, {'svm': {'dual': False}},
+                                           eta=3, workers=1, min_rows=50)
+
+    # 3 candidates with eta=3: one rung on a third of the rows, then the winner on all of them
+    assert [e['rung'] for e in leaderboard] == [0, 0, 0, 1]
+    assert [e['rows'] for e in leaderboard] == [100, 100, 100, 300]
+    first_rung = sorted(leaderboard[:3], key=lambda e: (-e['accuracy'], e['train_time_s'], e['latency_ms_single']))
+    assert best['params'] == first_rung[0]['params'] == leaderboard[3]['params']
+
+
+def test_successive_halving_rejects_no_candidates():
+    with pytest.raises(ValueError):
+        successive_halving([], {'tfidf': feature_set()}, workers=1)
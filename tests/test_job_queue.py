@@ -0,0 +1,102 @@
+import pytest
+
+import job_queue as jq
+from job_queue import JobQueue, STATUS_FAILED, STATUS_QUEUED, STATUS_RUNNING, STATUS_SUCCEEDED
+
+
+@pytest.fixture
+def queue(tmp_path, monkeypatch):
+    monkeypatch.setattr(jq, 'RETRY_BACKOFF_SECONDS', 0.0)
+    return JobQueue(str(tmp_path / 'jobs.db'), workers=0, max_running=2, max_attempts=2)
+
+
+def test_job_runs_to_success_with_progress(queue):
+    stages = []
+
+    def handler(job, progress):
+        progress(0.5, 'half')
+        stages.append(queue.get(job_id)['stage'])
+        return {'echo': job['payload']['text'], 'bytes': len(job['data'])}
+
+    queue.register('echo', handler)
+    job_id = queue.enqueue('echo', {'text': 'hi'}, data=b'abc', user_id=7)
+    assert queue.get(job_id)['status'] == STATUS_QUEUED
+
+    assert queue.run_one('worker-a')
+    job = queue.get(job_id)
+    assert stages == ['half']
+    assert (job['status'], job['result'], job['progress'], job['attempts'], job['user_id']) == \
+        (STATUS_SUCCEEDED, {'echo': 'hi', 'bytes': 3}, 1.0, 1, 7)
+    assert not queue.run_one('worker-a')
+
+
+def test_failure_is_retried_then_marked_failed(queue):
+    seen_states = []
+
+    def handler(job, progress):
+        seen_states.append(job['state'])
+        progress(0.3, 'parsed', state={'parsed': True})
+        raise RuntimeError('boom')
+
+    queue.register('flaky', handler)
+    job_id = queue.enqueue('flaky', {})
+
+    assert queue.run_one('w')
+    job = queue.get(job_id)
+    assert (job['status'], job['attempts'], job['error']) == (STATUS_QUEUED, 1, 'RuntimeError: boom')
+
+    assert queue.run_one('w')
+    job = queue.get(job_id)
+    assert (job['status'], job['attempts']) == (STATUS_FAILED, 2)
+    # The retry started from the state checkpointed by the first attempt
+    assert seen_states == [{}, {'parsed': True}]
+    assert not queue.run_one('w')
+
+
+def test_unknown_kind_fails_like_a_handler_error(queue):
+    job_id = queue.enqueue('nobody-handles-this', {})
+    assert queue.run_one('w')
+    assert queue.get(job_id)['error'].startswith('LookupError')
+
+
+def test_expired_lease_is_taken_over_and_the_old_owner_loses_it(queue):
+    queue.lease_seconds = -1.0          # every lease is expired as soon as it is taken
+    job_id = queue.enqueue('slow', {})
+
+    first = queue.claim('worker-a')
+    second = queue.claim('worker-b')
+    assert (first['id'], second['id']) == (job_id, job_id)
+    assert second['attempts'] == 2
+    assert not queue.complete(job_id, 'worker-a', {'late': True})
+    assert queue.complete(job_id, 'worker-b', {'done': True})
+    assert queue.get(job_id)['result'] == {'done': True}
+
+
+def test_expired_lease_on_the_last_attempt_fails_the_job(queue):
+    queue.lease_seconds = -1.0
+    job_id = queue.enqueue('slow', {})
+    queue.claim('worker-a')
+    queue.claim('worker-b')             # second and last attempt, lease expires too
+
+    assert queue.claim('worker-c') is None
+    job = queue.get(job_id)
+    assert (job['status'], job['error']) == (STATUS_FAILED, 'Worker stopped while running the job')
+
+
+def test_claim_respects_the_running_cap(queue):
+    ids = [queue.enqueue('slow', {'n': n}) for n in range(3)]
+    claimed = [queue.claim('w'), queue.claim('w'), queue.claim('w')]
+    assert [job['id'] for job in claimed[:2]] == ids[:2]
+    assert claimed[2] is None
+    assert queue.stats()['jobs'] == {STATUS_RUNNING: 2, STATUS_QUEUED: 1}
+
+
+def test_purge_drops_only_finished_jobs(queue):
+    queue.register('ok', lambda job, progress: None)
+    done = queue.enqueue('ok', {})
+    waiting = queue.enqueue('never-claimed', {})
+    queue.run_one('w')                  # runs the older job only
+
+    assert queue.purge(older_than=-1.0) == 1
+    assert queue.get(done) is None
+    assert queue.get(waiting)['status'] == STATUS_QUEUED
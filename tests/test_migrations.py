@@ -0,0 +1,62 @@
+import sqlite3
+
+import pytest
+
+from migrations import LATEST_VERSION, migrate, query_plan_problems, schema_version
+from queries import HOT_QUERIES, NOTIFICATIONS_QUERY
+
+
+@pytest.fixture
+def db(tmp_path):
+    path = str(tmp_path / 'sca.db')
+    migrate(path)
+    conn = sqlite3.connect(path)
+    yield conn
+    conn.close()
+
+
+def test_migrate_reaches_latest_version_once(tmp_path):
+    path = str(tmp_path / 'sca.db')
+    assert [version for version, _ in migrate(path)] == list(range(1, LATEST_VERSION + 1))
+    assert migrate(path) == []
+    with sqlite3.connect(path) as conn:
+        assert schema_version(conn) == LATEST_VERSION
+
+
+def test_migrate_upgrades_pre_migration_database(tmp_path):
+    # Schema created by the init_db that predates migrations, content_hash column included
+    path = str(tmp_path / 'sca.db')
+    with sqlite3.connect(path) as conn:
+        conn.execute('CREATE TABLE resumes (id INTEGER PRIMARY KEY AUTOINCREMENT, user_id INTEGER NOT NULL, '
+                     'file_name TEXT NOT NULL, uploaded_at TIMESTAMP, extracted_skills_json TEXT, '
+                     'prediction TEXT, content_hash TEXT)')
+    migrate(path)
+    with sqlite3.connect(path) as conn:
+        columns = [row[1] for row in conn.execute('PRAGMA table_info(resumes)')]
+        assert columns.count('content_hash') == 1
+        assert schema_version(conn) == LATEST_VERSION
+
+
+@pytest.mark.parametrize('name', sorted(HOT_QUERIES))
+def test_hot_query_uses_an_index(db, name):
+    sql, params = HOT_QUERIES[name]
+    assert query_plan_problems(db, sql, params) == []
+
+
+def test_dropped_index_is_reported(db):
+    db.execute('DROP INDEX idx_notifications_user_created_id')
+    assert query_plan_problems(db, NOTIFICATIONS_QUERY, (1, 20))
+
+
+def test_unread_counters_follow_notification_changes(db):
+    db.executemany('INSERT INTO notifications (user_id, message, is_read) VALUES (?, ?, ?)',
+                   [(1, 'a', 0), (1, 'b', 0), (1, 'c', 1), (2, 'd', 0)])
+
+    def unread(user_id):
+        return db.execute('SELECT unread FROM notification_counters WHERE user_id = ?', (user_id,)).fetchone()[0]
+
+    assert (unread(1), unread(2)) == (2, 1)
+    db.execute("UPDATE notifications SET is_read = 1 WHERE message = 'a'")
+    db.execute("UPDATE notifications SET is_read = 0 WHERE message = 'c'")
+    db.execute("DELETE FROM notifications WHERE message = 'd'")
+    assert (unread(1), unread(2)) == (2, 0)
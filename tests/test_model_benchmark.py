@@ -0,0 +1,58 @@
+import tracemalloc
+
+import joblib
+import numpy as np
+import pytest
+from scipy import sparse
+from sklearn.svm import LinearSVC
+
+from model_benchmark import benchmark_artifact, parse_budgets, select_model
+
+
+def benchmarks(single_p99_ms, size_bytes):
+    return {'single_p99_ms': single_p99_ms, 'batch_p99_ms': 1.0, 'size_bytes': size_bytes,
+            'memory_bytes': 0, 'load_time_ms': 1.0}
+
+
+def test_parse_budgets():
+    assert parse_budgets(' single_p99_ms=5, size_mb=50 ,') == {'single_p99_ms': 5.0, 'size_mb': 50.0}
+    assert parse_budgets('') == {}
+    with pytest.raises(ValueError):
+        parse_budgets('p42_ms=1')
+
+
+def test_select_model_prefers_accuracy_within_budgets():
+    bench = {'SVM': benchmarks(0.2, 300e3), 'Random Forest': benchmarks(8.0, 20e6)}
+    accuracy = {'SVM': 0.95, 'Random Forest': 0.97}
+
+    assert select_model(accuracy, bench, {})[0] == 'Random Forest'
+    name, report = select_model(accuracy, bench, {'single_p99_ms': 5})
+    assert (name, report['eligible'], report['fallback']) == ('SVM', ['SVM'], False)
+
+
+def test_select_model_ties_go_to_the_first_model():
+    bench = {'SVM': benchmarks(0.3, 300e3), 'Random Forest': benchmarks(0.1, 20e6)}
+    assert select_model({'SVM': 1.0, 'Random Forest': 1.0}, bench, {})[0] == 'SVM'
+
+
+def test_select_model_falls_back_to_lowest_latency():
+    bench = {'SVM': benchmarks(0.3, 300e3), 'Random Forest': benchmarks(0.1, 20e6)}
+    name, report = select_model({'SVM': 0.9, 'Random Forest': 0.8}, bench, {'size_mb': 0.1})
+    assert (name, report['eligible'], report['fallback']) == ('Random Forest', [], True)
+
+
+def test_benchmark_artifact_keeps_the_callers_trace(tmp_path):
+    rng = np.random.RandomState(0)
+    X = sparse.csr_matrix(rng.rand(40, 6))
+    y = (X[:, 0].toarray().ravel() > 0.5).astype(int)
+    path = str(tmp_path / 'svm_model.joblib')
+    joblib.dump(LinearSVC().fit(X, y), path)
+
+    tracemalloc.start()
+    try:
+        result = benchmark_artifact('svm_model', path, X, y)
+        assert tracemalloc.is_tracing()
+    finally:
+        tracemalloc.stop()
+    assert result['single_rows'] == 40
+    assert 0.0 <= result['accuracy'] <= 1.0
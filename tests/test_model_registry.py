@@ -0,0 +1,42 @@
+import threading
+
+import joblib
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier
+
+from model_registry import ARTIFACTS, ModelSet, artifact_memory
+
+
+def test_artifact_memory_counts_shared_buffers_once():
+    array = np.zeros(100000)
+    assert array.nbytes <= artifact_memory({'a': array, 'view': array[:10], 'again': array}) < array.nbytes + 2000
+
+
+def test_artifact_memory_skips_memory_mapped_arrays(tmp_path):
+    path = str(tmp_path / 'index.npy')
+    np.save(path, np.zeros(100000))
+    mapped = np.load(path, mmap_mode='r')
+    assert artifact_memory([mapped, mapped[:10]]) < 2000
+
+
+def test_artifact_memory_reaches_tree_arrays():
+    rng = np.random.RandomState(0)
+    rf = RandomForestClassifier(n_estimators=5, random_state=0).fit(rng.rand(300, 5), rng.randint(0, 3, 300))
+    nodes = sum(tree.tree_.__getstate__()['nodes'].nbytes for tree in rf.estimators_)
+    assert artifact_memory(rf) > nodes
+
+
+def test_concurrent_loads_each_record_their_own_memory(tmp_path):
+    sizes = {'svm_model': 400000, 'rf_model': 800000, 'label_encoder': 200000}
+    for name, size in sizes.items():
+        joblib.dump(np.zeros(size // 8), str(tmp_path / ARTIFACTS[name]))
+    models = ModelSet(str(tmp_path))
+
+    threads = [threading.Thread(target=models.get, args=(name,)) for name in sizes]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    artifacts = models.stats()['artifacts']
+    for name, size in sizes.items():
+        assert size <= artifacts[name]['memory_bytes'] < size + 2000
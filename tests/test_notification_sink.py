@@ -0,0 +1,42 @@
+import sqlite3
+
+from migrations import migrate
+from notification_sink import NotificationSink
+
+
+def make_sink(path, **kwargs):
+    published = []
+    sink = NotificationSink(lambda: sqlite3.connect(path), flush_interval_ms=60000, listeners=[published.append],
+                            **kwargs)
+    return sink, published
+
+
+def test_flush_writes_batches_and_notifies_listeners(tmp_path):
+    path = str(tmp_path / 'sca.db')
+    migrate(path)
+    sink, published = make_sink(path, batch_size=2)
+    for i in range(3):
+        sink.add(7, f'message {i}')
+
+    sink.flush()
+    written = [row for batch in published for row in batch]
+    assert [row[2] for row in written] == ['message 0', 'message 1', 'message 2']
+    assert sink.stats()['batches'] == 2
+    with sqlite3.connect(path) as conn:
+        stored = conn.execute('SELECT id, user_id, message, created_at FROM notifications ORDER BY id').fetchall()
+    assert stored == written
+    assert not sink.has_pending(7)
+
+
+def test_add_at_max_pending_survives_a_failed_flush(tmp_path):
+    path = str(tmp_path / 'sca.db')   # not migrated yet: inserts fail
+    sink, published = make_sink(path, batch_size=100, max_pending=2)
+    sink.add(1, 'first')
+    sink.add(1, 'second')             # reaches max_pending; the inline flush fails
+    assert sink.has_pending(1)
+    assert sink.stats()['failures'] >= 1
+
+    migrate(path)
+    sink.flush()
+    assert [row[2] for batch in published for row in batch] == ['first', 'second']
+    assert not sink.has_pending()
@@ -0,0 +1,50 @@
+import sqlite3
+
+import pytest
+
+from migrations import migrate
+from queries import NOTIFICATIONS_PAGE_QUERY, NOTIFICATIONS_QUERY
+
+
+@pytest.fixture
+def db(tmp_path):
+    path = str(tmp_path / 'sca.db')
+    migrate(path)
+    conn = sqlite3.connect(path)
+    yield conn
+    conn.close()
+
+
+def add_notifications(conn, user_id, timestamps):
+    conn.executemany('INSERT INTO notifications (user_id, message, created_at) VALUES (?, ?, ?)',
+                     [(user_id, f'message {i}', ts) for i, ts in enumerate(timestamps)])
+
+
+def walk_pages(conn, user_id, limit):
+    """Follow (created_at, id) cursors the way /api/notifications does"""
+    pages = [conn.execute(NOTIFICATIONS_QUERY, (user_id, limit)).fetchall()]
+    while len(pages[-1]) == limit:
+        last_id, _, created_at, _ = pages[-1][-1]
+        pages.append(conn.execute(NOTIFICATIONS_PAGE_QUERY, (user_id, created_at, last_id, limit)).fetchall())
+    return pages
+
+
+def test_pages_cover_every_row_once_with_equal_timestamps(db):
+    # Many rows share a second, so created_at alone cannot be the cursor
+    timestamps = [f'2024-01-0{1 + i // 7} 12:00:00' for i in range(23)]
+    add_notifications(db, 1, timestamps)
+    add_notifications(db, 2, timestamps[:5])
+
+    pages = walk_pages(db, 1, 4)
+    ids = [row[0] for page in pages for row in page]
+    expected = [row[0] for row in db.execute(
+        'SELECT id FROM notifications WHERE user_id = 1 ORDER BY created_at DESC, id DESC')]
+    assert ids == expected
+    assert len(set(ids)) == 23
+    assert all(len(page) <= 4 for page in pages)
+
+
+def test_page_after_last_row_is_empty(db):
+    add_notifications(db, 1, ['2024-01-01 00:00:00'] * 3)
+    first_id = db.execute('SELECT MIN(id) FROM notifications').fetchone()[0]
+    assert db.execute(NOTIFICATIONS_PAGE_QUERY, (1, '2024-01-01 00:00:00', first_id, 10)).fetchall() == []
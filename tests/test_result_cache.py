@@ -0,0 +1,102 @@
+import sqlite3
+
+import pytest
+
+import result_cache as rc
+from result_cache import ResultCache
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return ResultCache(str(tmp_path / 'cache.db'), max_entries=3, max_bytes=10 ** 6, ttl_seconds=60)
+
+
+def test_hit_after_set_with_whitespace_normalized_key(cache):
+    assert cache.get('predict_role', 'python  developer\n', 'v1') is None
+    cache.set('predict_role', 'python  developer\n', 'v1', {'role': 'Full Stack Developer'})
+
+    assert cache.get('predict_role', ' python developer ', 'v1') == {'role': 'Full Stack Developer'}
+    assert cache.get('predict_role', 'python developer', 'v2') is None
+    assert cache.get('skills', 'python developer', 'v1') is None
+    counters = cache.stats()['counters']
+    assert counters['predict_role.hits'] == 1
+    assert counters['predict_role.misses'] == 2
+
+
+def test_expired_entries_miss_and_are_evicted(cache, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(rc.time, 'time', lambda: now[0])
+    cache.set('skills', 'text', 'v1', ['Python'])
+    now[0] += 61
+    assert cache.get('skills', 'text', 'v1') is None
+
+    cache.evict()
+    stats = cache.stats()
+    assert (stats['entries'], stats['counters']['expired']) == (0, 1)
+
+
+def test_eviction_drops_least_recently_used_beyond_max_entries(tmp_path, monkeypatch):
+    cache = ResultCache(str(tmp_path / 'cache.db'), max_entries=3, max_bytes=10 ** 6, ttl_seconds=3600)
+    now = [1000.0]
+    monkeypatch.setattr(rc.time, 'time', lambda: now[0])
+    for text in ('a', 'b', 'c', 'd'):
+        cache.set('skills', text, 'v1', [text])
+        now[0] += 1
+    now[0] += rc.TOUCH_SECONDS
+    cache.get('skills', 'a', 'v1')      # 'a' is now the most recently used
+
+    cache.evict()
+    assert [cache.get('skills', t, 'v1') is not None for t in 'abcd'] == [True, False, True, True]
+    assert cache.stats()['counters']['evicted'] == 1
+
+
+def test_recent_hit_does_not_refresh_last_access(cache, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(rc.time, 'time', lambda: now[0])
+    cache.set('skills', 'a', 'v1', ['a'])
+    now[0] += 1
+    cache.set('skills', 'b', 'v1', ['b'])
+    now[0] += rc.TOUCH_SECONDS / 2
+    cache.get('skills', 'a', 'v1')
+    cache.flush()
+    assert cache._conn().execute('SELECT key FROM cache_entries ORDER BY last_access').fetchone()[0] == \
+        cache.make_key('skills', 'a', 'v1')
+
+
+def test_get_is_a_read_while_another_writer_holds_the_lock(cache):
+    cache.set('skills', 'text', 'v1', ['Python'])
+    writer = sqlite3.connect(cache.path, isolation_level=None)
+    writer.execute('BEGIN IMMEDIATE')
+    try:
+        assert cache.get('skills', 'text', 'v1') == ['Python']
+        assert cache.get('skills', 'other', 'v1') is None
+        cache.flush()    # cannot write; the counts stay pending
+    finally:
+        writer.execute('ROLLBACK')
+        writer.close()
+    counters = cache.stats()['counters']
+    assert (counters['skills.hits'], counters['skills.misses']) == (1, 1)
+
+
+def test_eviction_honours_max_bytes(tmp_path):
+    cache = ResultCache(str(tmp_path / 'cache.db'), max_entries=100, max_bytes=30, ttl_seconds=60)
+    for text in ('a', 'b', 'c'):
+        cache.set('skills', text, 'v1', 'x' * 10)   # 12 bytes of JSON each
+    cache.evict()
+    assert cache.stats()['bytes'] <= 30
+    assert cache.get('skills', 'a', 'v1') is None
+
+
+def test_disabled_cache_is_a_no_op(tmp_path):
+    cache = ResultCache(str(tmp_path / 'cache.db'), max_entries=0)
+    cache.set('skills', 'text', 'v1', ['Python'])
+    assert cache.get('skills', 'text', 'v1') is None
+    assert cache.stats() == {'enabled': False}
+
+
+def test_broken_cache_file_behaves_like_a_miss(tmp_path):
+    path = tmp_path / 'cache.db'
+    path.write_bytes(b'not a database' * 100)
+    cache = ResultCache(str(path))
+    cache.set('skills', 'text', 'v1', ['Python'])
+    assert cache.get('skills', 'text', 'v1') is None
@@ -0,0 +1,89 @@
+import sqlite3
+
+import numpy as np
+import pytest
+from scipy import sparse
+from sklearn.preprocessing import normalize
+
+import resume_index
+from migrations import migrate
+from resume_index import ResumeIndex, decode_vector, encode_vector, vector_row
+
+N_FEATURES = 50
+
+
+@pytest.fixture
+def db(tmp_path):
+    path = str(tmp_path / 'sca.db')
+    migrate(path)
+    conn = sqlite3.connect(path)
+    yield conn
+    conn.close()
+
+
+def random_rows(n, seed=0):
+    rows = sparse.random(n, N_FEATURES, density=0.15, format='csr', random_state=seed, dtype=np.float32)
+    return normalize(rows).astype(np.float32)
+
+
+def store(conn, rows, user_ids, version='v1', first_resume_id=1):
+    conn.executemany(
+        'INSERT INTO resume_vectors (resume_id, user_id, model_version, vector) VALUES (?, ?, ?, ?)',
+        [(first_resume_id + i, user_id, version, encode_vector(rows[i])) for i, user_id in enumerate(user_ids)]
+    )
+
+
+def test_blob_round_trip():
+    row = random_rows(1)
+    blob = encode_vector(row)
+    assert len(blob) == 8 * row.nnz
+    indices, weights = decode_vector(blob)
+    np.testing.assert_array_equal(indices, row.indices)
+    np.testing.assert_array_equal(weights, row.data)
+    np.testing.assert_array_equal(vector_row(blob, N_FEATURES).toarray(), row.toarray())
+
+
+def test_empty_vector_round_trip():
+    blob = encode_vector(sparse.csr_matrix((1, N_FEATURES), dtype=np.float32))
+    assert blob == b''
+    assert vector_row(blob, N_FEATURES).nnz == 0
+
+
+def test_search_matches_brute_force_and_keeps_best_resume_per_user(db, monkeypatch):
+    # A small tail forces merges between sync batches
+    monkeypatch.setattr(resume_index, 'TAIL_ROWS', 7)
+    monkeypatch.setattr(resume_index, 'SYNC_BATCH_ROWS', 5)
+    rows = random_rows(40)
+    user_ids = [i % 13 for i in range(40)]
+    store(db, rows, user_ids)
+    store(db, random_rows(5, seed=1), [1] * 5, version='v2', first_resume_id=100)
+
+    index = ResumeIndex('v1', N_FEATURES)
+    assert index.sync(db) == 40
+    assert index.sync(db) == 0
+    assert len(index) == 40
+
+    query = random_rows(1, seed=2)
+    scores = (rows @ query.T).toarray().ravel()
+    best = {}
+    for i in np.argsort(-scores, kind='stable'):
+        if scores[i] > 0 and user_ids[i] != 4:
+            best.setdefault(user_ids[i], (i + 1, user_ids[i]))
+    expected = list(best.values())[:5]
+
+    results = index.search(query, 5, exclude_user=4)
+    assert [(resume_id, user_id) for resume_id, user_id, _ in results] == expected
+    assert len({user_id for _, user_id, _ in results}) == len(results)
+    np.testing.assert_allclose([score for _, _, score in results], [scores[r - 1] for r, _ in expected],
+                               rtol=1e-6)
+
+
+def test_sync_picks_up_rows_stored_later(db):
+    index = ResumeIndex('v1', N_FEATURES)
+    store(db, random_rows(3), [1, 2, 3])
+    index.sync(db)
+    store(db, random_rows(2, seed=3), [4, 5], first_resume_id=10)
+    assert index.sync(db) == 2
+    stats = index.stats()
+    assert stats['resumes'] == 5
+    assert stats['synced_to'] == 5
@@ -0,0 +1,65 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from role_skills import RoleSkillCounts, RoleSkillMatrix, build_role_skill_matrix, export_role_skills
+
+ROLES = ['Data Scientist', 'Web Developer', 'DevOps Engineer']
+
+POSTINGS = pd.DataFrame({
+    'skills': ['Python, SQL', 'Python, Machine Learning, Python', 'JavaScript, React', None,
+               'Docker, Kubernetes', 'docker, Python', 'React, CSS, JavaScript', 'SQL'],
+    'role': ['Data Scientist', 'Data Scientist', 'Web Developer', 'Web Developer',
+             'DevOps Engineer', 'DevOps Engineer', 'Web Developer', 'Data Scientist'],
+})
+
+
+def test_counts_are_share_of_role_postings():
+    names, weights = build_role_skill_matrix(POSTINGS['skills'], POSTINGS['role'], ROLES)
+    assert names == sorted(names, key=str.lower)
+    weight = {(role, name): weights[r, s] for r, role in enumerate(ROLES) for s, name in enumerate(names)}
+    # Listed twice in one posting still counts once
+    assert weight['Data Scientist', 'Python'] == pytest.approx(2 / 3)
+    assert weight['Data Scientist', 'SQL'] == pytest.approx(2 / 3)
+    # The empty cell is still a Web Developer posting
+    assert weight['Web Developer', 'React'] == pytest.approx(2 / 3)
+    # "Docker" and "docker" are one skill, named after the first spelling on a tie
+    assert weight['DevOps Engineer', 'Docker'] == 1.0
+    assert 'docker' not in names
+    assert weight['Web Developer', 'Python'] == 0.0
+
+
+def test_chunked_counts_match_one_pass():
+    expected_names, expected = build_role_skill_matrix(POSTINGS['skills'], POSTINGS['role'], ROLES)
+    counts = RoleSkillCounts(ROLES)
+    for start in range(0, len(POSTINGS), 3):
+        chunk = POSTINGS.iloc[start:start + 3]
+        counts.update(chunk['skills'], chunk['role'])
+    names, weights = counts.matrix()
+    assert names == expected_names
+    assert len({name.lower() for name in names}) == len(names)
+    np.testing.assert_array_equal(weights, expected)
+
+
+def test_analyze_scores_coverage_and_missing_skills(tmp_path):
+    names, weights = build_role_skill_matrix(POSTINGS['skills'], POSTINGS['role'], ROLES)
+    path = str(tmp_path / 'role_skills.npz')
+    export_role_skills(ROLES, names, weights, path)
+    analysis = RoleSkillMatrix.load(path).analyze([' python', 'SQL ', ''], top_missing=2)
+
+    data_scientist = analysis['Data Scientist']
+    assert data_scientist['skill_coverage'] == pytest.approx((2 / 3 + 2 / 3) / (2 / 3 + 2 / 3 + 1 / 3), abs=1e-4)
+    assert data_scientist['missing_skills'] == [{'skill': 'Machine Learning', 'demand': pytest.approx(1 / 3, abs=1e-4)}]
+    assert analysis['Web Developer']['skill_coverage'] == 0.0
+    assert [m['skill'] for m in analysis['Web Developer']['missing_skills']] == ['JavaScript', 'React']
+    assert analysis['DevOps Engineer']['matched_skills'] == 2
+    assert analysis['DevOps Engineer']['skill_coverage'] == pytest.approx(0.5 / 2.0, abs=1e-4)
+
+
+def test_column_is_named_after_the_most_listed_spelling():
+    counts = RoleSkillCounts(ROLES)
+    counts.update(pd.Series(['Docker', 'docker, SQL']), ['DevOps Engineer'] * 2)
+    counts.update(pd.Series(['docker']), ['DevOps Engineer'])
+    names, weights = counts.matrix()
+    assert names == ['docker', 'SQL']
+    np.testing.assert_allclose(weights[ROLES.index('DevOps Engineer')], [1.0, 1 / 3], rtol=1e-6)
@@ -0,0 +1,63 @@
+import os
+
+from skill_matcher import SKILLS_FILE, SkillMatcher, tokenize
+
+ENTRIES = [
+    {'name': 'Go', 'aliases': ['Golang'], 'case_sensitive': True},
+    {'name': 'C++', 'aliases': ['cpp']},
+    {'name': 'C#', 'aliases': ['C Sharp']},
+    {'name': 'Node.js', 'aliases': ['Node']},
+    {'name': 'Machine Learning', 'aliases': ['ML']},
+    {'name': 'Machine Learning Engineering'},
+    {'name': 'Express'},
+    {'name': 'Kubernetes', 'aliases': ['k8s']},
+]
+
+
+def test_tokenize_keeps_skill_characters():
+    assert [t for t, _, _ in tokenize('C++, C# and Node.js. Done.')] == ['C++', 'C#', 'and', 'Node.js', 'Done']
+
+
+def test_matches_whole_tokens_only():
+    matcher = SkillMatcher(ENTRIES)
+    assert matcher.extract('good expression, going nowhere') == []
+    assert matcher.extract('Express and Go services') == ['Express', 'Go']
+
+
+def test_case_sensitive_name_but_case_insensitive_alias():
+    matcher = SkillMatcher(ENTRIES)
+    assert matcher.extract('we go home') == []
+    assert matcher.extract('GOLANG and k8s') == ['Go', 'Kubernetes']
+
+
+def test_longest_phrase_wins_and_offsets_cover_it():
+    matcher = SkillMatcher(ENTRIES)
+    text = 'Led machine learning engineering, then Machine Learning again (ML).'
+    found = matcher.find(text)
+    assert [m['skill'] for m in found] == ['Machine Learning Engineering', 'Machine Learning', 'Machine Learning']
+    assert [text[m['start']:m['end']] for m in found] == [m['text'] for m in found]
+    assert found[0]['text'] == 'machine learning engineering'
+
+
+def test_extract_is_distinct_in_order_of_first_appearance():
+    matcher = SkillMatcher(ENTRIES)
+    assert matcher.extract('cpp, C Sharp, C++, node') == ['C++', 'C#', 'Node.js']
+
+
+def test_canonical_accepts_only_a_single_whole_phrase():
+    matcher = SkillMatcher(ENTRIES)
+    assert matcher.canonical(' k8s ') == 'Kubernetes'
+    assert matcher.canonical('Machine Learning') == 'Machine Learning'
+    assert matcher.canonical('k8s and Go') is None
+    assert matcher.canonical('Haskell') is None
+
+
+def test_version_follows_the_vocabulary():
+    assert SkillMatcher(ENTRIES).version == SkillMatcher(list(ENTRIES)).version
+    assert SkillMatcher(ENTRIES).version != SkillMatcher(ENTRIES[:-1]).version
+
+
+def test_shipped_vocabulary_loads():
+    matcher = SkillMatcher.from_file(os.path.join(os.path.dirname(__file__), '..', SKILLS_FILE))
+    assert 'Python' in matcher.skills
+    assert matcher.extract('Python, Golang and Postgres') == ['Python', 'Go', 'PostgreSQL']
@@ -0,0 +1,46 @@
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.metrics import accuracy_score, confusion_matrix, f1_score, precision_score, recall_score
+
+import train_stream
+from train_stream import ROLES, TEST_SIZE, chunk_split, row_draws, split_rows, stream_metrics
+
+
+def test_row_draws_do_not_depend_on_chunking():
+    draws = row_draws(0, 200000)
+    np.testing.assert_array_equal(np.concatenate([row_draws(0, 777), row_draws(777, 200000)]), draws)
+    assert 0.0 <= draws.min() and draws.max() < 1.0
+    assert np.mean(draws < TEST_SIZE) == pytest.approx(TEST_SIZE, abs=0.005)
+
+
+def test_split_masks_are_disjoint_and_skip_dropped_rows(tmp_path, monkeypatch):
+    monkeypatch.setattr(train_stream, 'CHUNK_ROWS', 1000)
+    monkeypatch.setattr(train_stream, 'CALIBRATION_ROWS', 300)
+    roles = pd.Series(['Data Scientist', 'Software Engineer', 'Unknown Role'] * 2000)
+    path = str(tmp_path / 'jobs.csv')
+    pd.DataFrame({'role': roles, 'skills': 'Python', 'job_description': 'text'}).to_csv(path, index=False)
+
+    split = split_rows(path)
+    assert split['kept'] == 4000
+    test_rows = calibration_rows = 0
+    for start, chunk in train_stream.read_chunks(path):
+        y, test, calibration = chunk_split(split, start, chunk)
+        assert not (test & calibration).any()
+        assert (y[test | calibration] >= 0).all()
+        assert (y[chunk['role'].values == 'Unknown Role'] == -1).all()
+        test_rows += test.sum()
+        calibration_rows += calibration.sum()
+    assert test_rows == pytest.approx(4000 * TEST_SIZE, rel=0.1)
+    assert calibration_rows == pytest.approx(300, rel=0.2)
+    assert set(split['label_encoder'].classes_) <= set(ROLES)
+
+
+def test_stream_metrics_match_sklearn_weighted_scores():
+    rng = np.random.RandomState(0)
+    y_true = rng.randint(0, 4, 1000)
+    y_pred = np.where(rng.rand(1000) < 0.7, y_true, rng.randint(0, 5, 1000))   # class 4 is only predicted
+    metrics = stream_metrics(confusion_matrix(y_true, y_pred, labels=range(5)))
+    assert metrics['accuracy'] == pytest.approx(accuracy_score(y_true, y_pred))
+    for name, score in (('precision', precision_score), ('recall', recall_score), ('f1_score', f1_score)):
+        assert metrics[name] == pytest.approx(score(y_true, y_pred, average='weighted', zero_division=0))
@@ -14,9 +14,79 @@ from sklearn.ensemble import RandomForestClassifier
 from sklearn.metrics import accuracy_score, precision_score, recall_score, f1_score, classification_report
 import joblib
 import json
+import hashlib
+import sklearn
+from concurrent.futures import ProcessPoolExecutor
+from scipy import sparse
+from flat_forest import export_flat_forest
+from calibration import fit_temperature, calibration_metrics, export_svm_calibration
+from job_index import build_job_index, INDEX_DIR, INDEX_FORMAT
+from role_skills import build_role_skill_matrix, export_role_skills, MATRIX_FORMAT
+from hyperparam_search import successive_halving, ETA as SEARCH_ETA
+from model_benchmark import benchmark_models, select_model
+import itertools
 import os
+import sys
+import time
+import shutil
 from datetime import datetime
 
+# Versioned artifact layout served by model_registry:
+#   models/versions/<version>/   one immutable directory per training run
+#   models/CURRENT               name of the version directory to serve
+MODEL_DIR = 'models'
+VERSIONS_DIR = os.path.join(MODEL_DIR, 'versions')
+CURRENT_POINTER = os.path.join(MODEL_DIR, 'CURRENT')
+VERSIONS_TO_KEEP = 3
+
+# Fitted vectorizer and feature matrices, keyed by dataset + feature parameters
+# (see load_features); an empty SCA_FEATURE_CACHE_DIR disables the cache
+FEATURE_CACHE_DIR = os.environ.get('SCA_FEATURE_CACHE_DIR', os.path.join(MODEL_DIR, 'feature_cache'))
+# Bump when the cached files change meaning (the job index and role x skill
+# builders have their own format numbers, also part of the key)
+FEATURE_CACHE_FORMAT = 2
+
+# Processes fitting SVM and Random Forest side by side (1 trains them one after the other)
+TRAIN_WORKERS = int(os.environ.get('SCA_TRAIN_WORKERS', min(2, os.cpu_count() or 1)))
+
+TFIDF_PARAMS = {
+    'max_features': 5000,
+    'stop_words': 'english',
+    'ngram_range': (1, 2),
+    'min_df': 2,
+    'max_df': 0.8,
+    'sublinear_tf': True,
+}
+SVM_PARAMS = {
+    'C': 1.0,
+    'max_iter': 2000,
+    'random_state': 42,
+    'verbose': 0,
+    'dual': False,
+}
+RF_PARAMS = {
+    'n_estimators': 100,
+    'max_depth': 20,
+    'min_samples_split': 5,
+    'min_samples_leaf': 2,
+    'n_jobs': -1,
+    'random_state': 42,
+    'verbose': 0,
+}
+TEST_SIZE = 0.2
+SPLIT_RANDOM_STATE = 42
+
+# Values tried by `python train_model.py --search` (see search_hyperparameters);
+# the defaults above are always among them
+SEARCH_SPACE = {
+    'tfidf': {'max_features': [2000, 5000, 10000]},
+    'svm': {'C': [0.1, 0.3, 1.0, 3.0]},
+    'rf': {'n_estimators': [50, 100, 200], 'max_depth': [10, 20, 40]},
+}
+# Feature caches kept: one per vectorizer setting the search tries, plus one
+# so a plain retrain after a dataset change does not evict them
+FEATURE_CACHES_TO_KEEP = len(list(itertools.product(*SEARCH_SPACE['tfidf'].values()))) + 1
+
 # ===== LABEL NORMALIZATION MAPPING =====
 # Map all 44 raw roles to 8 fixed required roles
 ROLE_MAPPING = {
@@ -164,27 +234,20 @@ def prepare_data(df):
 
     return X, y_encoded, le, df
 
-def vectorize_text(X_train, X_test):
+def vectorize_text(X_train, X_test, params=TFIDF_PARAMS):
     """Apply TF-IDF vectorization"""
     print("\n" + "="*60)
     print("TEXT VECTORIZATION (TF-IDF)")
     print("="*60)
 
-    vectorizer = TfidfVectorizer(
-        max_features=5000,
-        stop_words='english',
-        ngram_range=(1, 2),
-        min_df=2,
-        max_df=0.8,
-        sublinear_tf=True
-    )
+    vectorizer = TfidfVectorizer(**params)
 
     print("[+] Fitting TF-IDF vectorizer with parameters:")
-    print(f"  - max_features: 5000")
-    print(f"  - stop_words: english")
-    print(f"  - ngram_range: (1, 2)")
-    print(f"  - min_df: 2, max_df: 0.8")
-    print(f"  - sublinear_tf: True")
+    print(f"  - max_features: {params['max_features']}")
+    print(f"  - stop_words: {params['stop_words']}")
+    print(f"  - ngram_range: {params['ngram_range']}")
+    print(f"  - min_df: {params['min_df']}, max_df: {params['max_df']}")
+    print(f"  - sublinear_tf: {params['sublinear_tf']}")
 
     X_train_tfidf = vectorizer.fit_transform(X_train)
     X_test_tfidf = vectorizer.transform(X_test)
@@ -196,20 +259,14 @@ def vectorize_text(X_train, X_test):
 
     return vectorizer, X_train_tfidf, X_test_tfidf
 
-def train_svm(X_train, y_train, X_test, y_test):
+def train_svm(X_train, y_train, X_test, y_test, params=SVM_PARAMS):
     """Train LinearSVC (SVM) classifier"""
     print("\n" + "="*60)
     print("TRAINING: SUPPORT VECTOR MACHINE (SVM)")
     print("="*60)
 
-    print("Training LinearSVC classifier...")
-    svm_model = LinearSVC(
-        C=1.0,
-        max_iter=2000,
-        random_state=42,
-        verbose=0,
-        dual=False
-    )
+    print(f"Training LinearSVC classifier (C={params['C']})...")
+    svm_model = LinearSVC(**params)
 
     svm_model.fit(X_train, y_train)
     print("[+] SVM training completed!")
@@ -235,22 +292,44 @@ def train_svm(X_train, y_train, X_test, y_test):
         'f1_score': f1_svm
     }
 
-def train_random_forest(X_train, y_train, X_test, y_test):
+def calibrate_svm(calibration_decision, y_calibration, svm_model, X_test_skills, y_test):
+    """Fit the softmax temperature that turns SVM decision values into probabilities.
+
+    The temperature is fitted on calibration_decision: decision values of
+    training rows held out from the SVM that produced them. Log loss and ECE
+    are then measured for svm_model on the test split. Job-fit analysis
+    scores a list of skills, not a full posting, so both sets of rows should
+    be vectorized from their skills only.
+    """
+    print("\n" + "="*60)
+    print("CALIBRATING: SVM PROBABILITIES (TEMPERATURE SCALING)")
+    print("="*60)
+
+    # Columns of decision_function follow svm_model.classes_ (= label indices)
+    classes = svm_model.classes_
+    temperature = fit_temperature(calibration_decision, np.searchsorted(classes, y_calibration))
+    calibration = calibration_metrics(svm_model.decision_function(X_test_skills), np.searchsorted(classes, y_test),
+                                      temperature)
+    calibration['rows'] = int(len(y_calibration))
+    calibration['input'] = 'skills of held-out training rows'
+    calibration['evaluation_rows'] = int(X_test_skills.shape[0])
+    calibration['evaluation_input'] = 'skills of the test split'
+
+    print(f"[+] Temperature: {temperature:.4f} (fitted on {calibration['rows']} held-out training rows)")
+    print(f"    Test split log loss: {calibration['log_loss_uncalibrated']:.4f} -> {calibration['log_loss']:.4f}")
+    print(f"    Test split ECE:      {calibration['ece_uncalibrated']:.4f} -> {calibration['ece']:.4f}")
+
+    return temperature, calibration
+
+def train_random_forest(X_train, y_train, X_test, y_test, params=RF_PARAMS):
     """Train RandomForestClassifier"""
     print("\n" + "="*60)
     print("TRAINING: RANDOM FOREST CLASSIFIER")
     print("="*60)
 
-    print("Training RandomForestClassifier...")
-    rf_model = RandomForestClassifier(
-        n_estimators=100,
-        max_depth=20,
-        min_samples_split=5,
-        min_samples_leaf=2,
-        n_jobs=-1,
-        random_state=42,
-        verbose=0
-    )
+    print(f"Training RandomForestClassifier (n_estimators={params['n_estimators']}, "
+          f"max_depth={params['max_depth']})...")
+    rf_model = RandomForestClassifier(**params)
 
     rf_model.fit(X_train, y_train)
     print("[+] Random Forest training completed!")
@@ -276,8 +355,31 @@ def train_random_forest(X_train, y_train, X_test, y_test):
         'f1_score': f1_rf
     }
 
-def select_best_model(svm_metrics, rf_metrics):
-    """Compare and select the best model"""
+def train_models(X_train, y_train, X_test, y_test, svm_params=SVM_PARAMS, rf_params=RF_PARAMS,
+                 workers=TRAIN_WORKERS):
+    """Fit SVM and Random Forest, in parallel processes when workers > 1.
+
+    Returns (svm_model, svm_metrics, rf_model, rf_metrics).
+    """
+    if workers <= 1:
+        svm_model, svm_metrics = train_svm(X_train, y_train, X_test, y_test, svm_params)
+        rf_model, rf_metrics = train_random_forest(X_train, y_train, X_test, y_test, rf_params)
+        return svm_model, svm_metrics, rf_model, rf_metrics
+
+    print("\n[+] Training SVM and Random Forest in 2 processes...")
+    with ProcessPoolExecutor(max_workers=2) as pool:
+        svm = pool.submit(train_svm, X_train, y_train, X_test, y_test, svm_params)
+        rf = pool.submit(train_random_forest, X_train, y_train, X_test, y_test, rf_params)
+        (svm_model, svm_metrics), (rf_model, rf_metrics) = svm.result(), rf.result()
+    return svm_model, svm_metrics, rf_model, rf_metrics
+
+def select_best_model(svm_metrics, rf_metrics, benchmarks):
+    """Compare the models and select the best one by the selection policy.
+
+    The policy (see model_benchmark.select_model) takes the most accurate
+    model within the SCA_SELECTION_BUDGETS latency/size/memory budgets.
+    Returns (name, metrics, selection report).
+    """
     print("\n" + "="*60)
     print("MODEL COMPARISON & SELECTION")
     print("="*60)
@@ -290,55 +392,101 @@ def select_best_model(svm_metrics, rf_metrics):
     print(f"{'Precision':<15} {svm_metrics['precision']:<20.4f} {rf_metrics['precision']:<20.4f}")
     print(f"{'Recall':<15} {svm_metrics['recall']:<20.4f} {rf_metrics['recall']:<20.4f}")
     print(f"{'F1-Score':<15} {svm_metrics['f1_score']:<20.4f} {rf_metrics['f1_score']:<20.4f}")
+    svm_bench, rf_bench = benchmarks['SVM'], benchmarks['Random Forest']
+    print(f"{'p99 1 row ms':<15} {svm_bench['single_p99_ms']:<20.3f} {rf_bench['single_p99_ms']:<20.3f}")
+    print(f"{'p99 batch ms':<15} {svm_bench['batch_p99_ms']:<20.3f} {rf_bench['batch_p99_ms']:<20.3f}")
+    print(f"{'Size MB':<15} {svm_bench['size_bytes'] / 1e6:<20.2f} {rf_bench['size_bytes'] / 1e6:<20.2f}")
+    print(f"{'Memory MB':<15} {svm_bench['memory_bytes'] / 1e6:<20.2f} {rf_bench['memory_bytes'] / 1e6:<20.2f}")
     print("-" * 60)
 
-    # Select based on accuracy (primary metric)
-    if svm_metrics['accuracy'] >= rf_metrics['accuracy']:
-        best_model_name = 'SVM'
-        best_metrics = svm_metrics
-    else:
-        best_model_name = 'Random Forest'
-        best_metrics = rf_metrics
+    metrics = {'SVM': svm_metrics, 'Random Forest': rf_metrics}
+    best_model_name, selection = select_model({name: m['accuracy'] for name, m in metrics.items()}, benchmarks)
+    best_metrics = metrics[best_model_name]
 
+    print(f"\n[+] Selection policy: {selection['policy']} {selection['budgets'] or ''}")
+    if selection['fallback']:
+        print("[!] No model fits the budgets, selected the lowest p99 latency instead")
     print(f"\n[+] BEST MODEL SELECTED: {best_model_name}")
     print(f"    Accuracy:  {best_metrics['accuracy']:.4f}")
     print(f"    Precision: {best_metrics['precision']:.4f}")
     print(f"    Recall:    {best_metrics['recall']:.4f}")
     print(f"    F1-Score:  {best_metrics['f1_score']:.4f}")
 
-    return best_model_name, best_metrics
-
-def save_models(svm_model, rf_model, vectorizer, label_encoder, best_model_name, svm_metrics, rf_metrics):
-    """Save trained models and artifacts"""
+    return best_model_name, best_metrics, selection
+
+def save_models(svm_model, rf_model, vectorizer, label_encoder, best_model_name, svm_metrics, rf_metrics,
+                job_index=None, svm_temperature=None, svm_calibration=None, role_skills=None,
+                training_info=None, search=None, benchmarks=None, selection=None):
+    """Save trained models and artifacts into a new version directory.
+
+    job_index is the directory of a job posting index built with this
+    vectorizer (see load_features) for /api/job-postings/similar.
+    svm_temperature is saved with the SVM weights as svm_calibration.npz for
+    job-fit probabilities.
+    role_skills, the (skill names, weights) of build_role_skill_matrix, is
+    saved as role_skills.npz for the skill-gap part of job-fit analysis.
+    rf_model may be None (streaming training fits linear models only);
+    training_info entries are added to the report's training_info, and the
+    search_hyperparameters report (if any) is saved as hyperparameter_search.
+    benchmarks and selection (model_benchmark) record what each model costs
+    to serve and why best_model_name was chosen.
+
+    Files are written to a temporary directory which is renamed into place
+    and only then published through models/CURRENT, so the running app never
+    sees a half-written pickle.
+    """
     print("\n" + "="*60)
     print("SAVING MODELS & ARTIFACTS")
     print("="*60)
 
-    os.makedirs('models', exist_ok=True)
+    timestamp = datetime.now()
+    version = timestamp.strftime('%Y%m%d-%H%M%S-%f')
+    version_dir = os.path.join(VERSIONS_DIR, version)
+    staging_dir = os.path.join(VERSIONS_DIR, f'.staging-{version}')
+    os.makedirs(staging_dir, exist_ok=True)
 
     # Save vectorizer
-    joblib.dump(vectorizer, 'models/vectorizer.joblib')
-    print("[+] Saved: models/vectorizer.joblib")
+    joblib.dump(vectorizer, os.path.join(staging_dir, 'vectorizer.joblib'))
+    print(f"[+] Saved: {version_dir}/vectorizer.joblib")
 
     # Save both SVM and RandomForest models (for ensemble predictions)
-    joblib.dump(svm_model, 'models/svm_model.joblib')
-    print("[+] Saved: models/svm_model.joblib (LinearSVC)")
+    joblib.dump(svm_model, os.path.join(staging_dir, 'svm_model.joblib'))
+    print(f"[+] Saved: {version_dir}/svm_model.joblib ({type(svm_model).__name__})")
+
+    if svm_temperature is not None:
+        export_svm_calibration(svm_model, svm_temperature, os.path.join(staging_dir, 'svm_calibration.npz'))
+        print(f"[+] Saved: {version_dir}/svm_calibration.npz (SVM weights + softmax temperature)")
 
-    joblib.dump(rf_model, 'models/rf_model.joblib')
-    print("[+] Saved: models/rf_model.joblib (RandomForestClassifier)")
+    if rf_model is not None:
+        joblib.dump(rf_model, os.path.join(staging_dir, 'rf_model.joblib'))
+        print(f"[+] Saved: {version_dir}/rf_model.joblib (RandomForestClassifier)")
+
+        # Flattened array copy of the forest used by the app for inference
+        export_flat_forest(rf_model, os.path.join(staging_dir, 'rf_flat.npz'))
+        print(f"[+] Saved: {version_dir}/rf_flat.npz (flattened Random Forest)")
 
     # Save best model reference for backward compatibility
     best_model = svm_model if best_model_name == 'SVM' else rf_model
-    joblib.dump(best_model, 'models/best_model.joblib')
-    print(f"[+] Saved: models/best_model.joblib (reference to {best_model_name})")
+    joblib.dump(best_model, os.path.join(staging_dir, 'best_model.joblib'))
+    print(f"[+] Saved: {version_dir}/best_model.joblib (reference to {best_model_name})")
 
     # Save label encoder
-    joblib.dump(label_encoder, 'models/label_encoder.joblib')
-    print("[+] Saved: models/label_encoder.joblib")
+    joblib.dump(label_encoder, os.path.join(staging_dir, 'label_encoder.joblib'))
+    print(f"[+] Saved: {version_dir}/label_encoder.joblib")
+
+    if role_skills is not None:
+        export_role_skills(label_encoder.classes_, *role_skills, os.path.join(staging_dir, 'role_skills.npz'))
+        print(f"[+] Saved: {version_dir}/role_skills.npz (role x skill demand matrix)")
+
+    # Nearest-neighbour index over the postings, built with this version's vectorizer
+    if job_index is not None:
+        shutil.copytree(job_index, os.path.join(staging_dir, INDEX_DIR))
+        print(f"[+] Saved: {version_dir}/{INDEX_DIR}/ (job posting index)")
 
     # Save comprehensive metrics report as JSON
     report = {
-        'timestamp': datetime.now().isoformat(),
+        'timestamp': timestamp.isoformat(),
+        'version': version,
         'best_model': best_model_name,
         'normalized_roles': list(label_encoder.classes_),
         'svm_metrics': {
@@ -352,75 +500,320 @@ def save_models(svm_model, rf_model, vectorizer, label_encoder, best_model_name,
             'precision': float(rf_metrics['precision']),
             'recall': float(rf_metrics['recall']),
             'f1_score': float(rf_metrics['f1_score'])
-        },
+        } if rf_metrics is not None else None,
+        'svm_calibration': svm_calibration,
         'vectorizer_config': {
-            'max_features': 5000,
-            'stop_words': 'english',
-            'ngram_range': [1, 2]
+            key: list(value) if isinstance(value, tuple) else value
+            for key, value in vectorizer.get_params().items()
+            if key in ('max_features', 'n_features', 'stop_words', 'ngram_range')
         },
         'training_info': {
-            'total_records_after_normalization': 50000,
-            'test_split': 0.2,
-            'models_saved': ['svm_model.joblib', 'rf_model.joblib', 'best_model.joblib'],
-            'ensemble_enabled': True,
+            'total_records_after_normalization': None,
+            'test_split': TEST_SIZE,
+            'models_saved': ['svm_model.joblib']
+                            + (['rf_model.joblib', 'rf_flat.npz'] if rf_model is not None else [])
+                            + ['best_model.joblib']
+                            + (['svm_calibration.npz'] if svm_temperature is not None else [])
+                            + (['role_skills.npz'] if role_skills is not None else [])
+                            + ([INDEX_DIR] if job_index is not None else []),
+            'ensemble_enabled': rf_model is not None,
             'label_normalization': 'Normalized 44 raw roles to 8 required roles',
-            'vectorization_note': 'TF-IDF: max_features=5000, ngram_range=(1,2), min_df=2, max_df=0.8, sublinear_tf=True'
+            'vectorization_note': vectorization_note(vectorizer)
         }
     }
-
-    with open('models/training_report.json', 'w') as f:
+    report['training_info'].update(training_info or {})
+    if search is not None:
+        report['hyperparameter_search'] = search
+    if benchmarks is not None:
+        report['benchmarks'] = benchmarks
+        report['selection'] = selection
+
+    with open(os.path.join(staging_dir, 'training_report.json'), 'w') as f:
         json.dump(report, f, indent=2)
 
-    print("[+] Saved: models/training_report.json")
+    print(f"[+] Saved: {version_dir}/training_report.json")
+
+    publish_version(staging_dir, version)
 
     print("\n" + "="*60)
     print("TRAINING COMPLETE!")
     print("="*60)
-    print("\nAll artifacts saved to 'models/' directory:")
-    print("  - svm_model.joblib: Linear SVC classifier")
-    print("  - rf_model.joblib: Random Forest classifier")
+    print(f"\nAll artifacts saved to '{version_dir}/' (now served via {CURRENT_POINTER}):")
+    print(f"  - svm_model.joblib: Linear SVM classifier ({type(svm_model).__name__})")
+    if rf_model is not None:
+        print("  - rf_model.joblib: Random Forest classifier")
+        print("  - rf_flat.npz: Random Forest flattened into arrays for fast inference")
+    if svm_temperature is not None:
+        print("  - svm_calibration.npz: SVM weights + temperature for calibrated probabilities")
+    if role_skills is not None:
+        print("  - role_skills.npz: Share of each role's postings asking for each skill")
     print("  - best_model.joblib: Reference to best performing model")
-    print("  - vectorizer.joblib: TF-IDF vectorizer")
+    print(f"  - vectorizer.joblib: {type(vectorizer).__name__}")
     print("  - label_encoder.joblib: Role label encoding (8 fixed roles)")
-    print("\nThe prediction endpoint will use ENSEMBLE PREDICTIONS from both models!")
+    if job_index is not None:
+        print(f"  - {INDEX_DIR}/: Memory-mapped TF-IDF index of the job postings")
+    if rf_model is not None:
+        print("\nThe prediction endpoint will use ENSEMBLE PREDICTIONS from both models!")
     print("All predictions will ONLY return one of the 8 required roles!")
     print("Ready to use in Flask application!")
 
-def main():
-    """Main training pipeline"""
-    print("\n")
-    print("=" * 60)
-    print(" SMART CAREER ADVISOR - MODEL TRAINING PIPELINE ".center(60))
-    print("=" * 60)
-
-    # Step 1: Load data
-    df = load_data('data/jobs_dataset.csv')
-
-    # Step 2: Prepare data (includes role normalization)
+def vectorization_note(vectorizer):
+    """One-line summary of the vectorizer settings for the training report"""
+    params = vectorizer.get_params()
+    if not isinstance(vectorizer, TfidfVectorizer):
+        return f"{type(vectorizer).__name__}: {params}"
+    return (f"TF-IDF: max_features={params['max_features']}, "
+            f"ngram_range=({params['ngram_range'][0]},{params['ngram_range'][1]}), "
+            f"min_df={params['min_df']}, max_df={params['max_df']}, sublinear_tf={params['sublinear_tf']}")
+
+def publish_version(staging_dir, version):
+    """Atomically activate a fully written version directory"""
+    version_dir = os.path.join(VERSIONS_DIR, version)
+    os.rename(staging_dir, version_dir)
+
+    # Replace the pointer file in one step; readers see the old or new name, never a partial one
+    pointer_tmp = CURRENT_POINTER + '.tmp'
+    with open(pointer_tmp, 'w') as f:
+        f.write(version + '\n')
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(pointer_tmp, CURRENT_POINTER)
+    print(f"[+] Published model version {version} -> {CURRENT_POINTER}")
+
+    prune_versions(keep=VERSIONS_TO_KEEP)
+
+def prune_versions(keep=VERSIONS_TO_KEEP):
+    """Delete the oldest version directories, never touching the active one"""
+    with open(CURRENT_POINTER) as f:
+        active = f.read().strip()
+    versions = sorted(
+        name for name in os.listdir(VERSIONS_DIR)
+        if not name.startswith('.') and os.path.isdir(os.path.join(VERSIONS_DIR, name))
+    )
+    for name in versions[:-keep]:
+        if name != active:
+            shutil.rmtree(os.path.join(VERSIONS_DIR, name), ignore_errors=True)
+            print(f"[+] Removed old model version {name}")
+
+def dataset_key(csv_path, params):
+    """Hash of the dataset bytes, the split, the role mapping and the given parameters"""
+    digest = hashlib.sha256()
+    with open(csv_path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    digest.update(json.dumps(dict(params, split=[TEST_SIZE, SPLIT_RANDOM_STATE], roles=ROLE_MAPPING,
+                                  sklearn=sklearn.__version__), sort_keys=True, default=str).encode())
+    return digest.hexdigest()[:16]
+
+def feature_cache_key(csv_path, tfidf_params=TFIDF_PARAMS):
+    """Key of every parameter, and builder format, the cached features depend on"""
+    return dataset_key(csv_path, {'format': FEATURE_CACHE_FORMAT, 'job_index': INDEX_FORMAT,
+                                  'role_skills': MATRIX_FORMAT, 'tfidf': tfidf_params})
+
+def build_features(csv_path, path, tfidf_params=TFIDF_PARAMS):
+    """Parse and vectorize the dataset, writing everything training needs to path.
+
+    Besides the split matrices this covers both splits vectorized from skills
+    only (for calibration),
+    the role x skill matrix and the job posting index: all of them depend
+    only on the dataset and the fitted vectorizer.
+    """
+    staging = path + '.tmp'
+    shutil.rmtree(staging, ignore_errors=True)
+    os.makedirs(staging)
+
+    df = load_data(csv_path)
+    # Raw titles, before normalization overwrites them, for the job posting index
+    postings = df[['role', 'skills', 'job_description']].copy()
     X, y, label_encoder, df = prepare_data(df)
 
-    # Step 3: Train-test split
     print("\n" + "="*60)
     print("TRAIN-TEST SPLIT")
     print("="*60)
     X_train, X_test, y_train, y_test = train_test_split(
-        X, y, test_size=0.2, random_state=42, stratify=y
+        X, y, test_size=TEST_SIZE, random_state=SPLIT_RANDOM_STATE, stratify=y
+    )
+    print(f"[+] Training set: {len(X_train)} records ({1 - TEST_SIZE:.0%})")
+    print(f"[+] Test set: {len(X_test)} records ({TEST_SIZE:.0%})")
+
+    vectorizer, X_train_tfidf, X_test_tfidf = vectorize_text(X_train, X_test, tfidf_params)
+    # Calibration rows as job-fit sees them: skills only
+    X_train_skills = vectorizer.transform(df.loc[X_train.index, 'skills'].fillna(''))
+    X_test_skills = vectorizer.transform(df.loc[X_test.index, 'skills'].fillna(''))
+
+    joblib.dump(vectorizer, os.path.join(staging, 'vectorizer.joblib'))
+    joblib.dump(label_encoder, os.path.join(staging, 'label_encoder.joblib'))
+    sparse.save_npz(os.path.join(staging, 'X_train.npz'), X_train_tfidf, compressed=False)
+    sparse.save_npz(os.path.join(staging, 'X_test.npz'), X_test_tfidf, compressed=False)
+    sparse.save_npz(os.path.join(staging, 'X_train_skills.npz'), X_train_skills, compressed=False)
+    sparse.save_npz(os.path.join(staging, 'X_test_skills.npz'), X_test_skills, compressed=False)
+    np.savez(os.path.join(staging, 'labels.npz'), y_train=y_train, y_test=y_test)
+
+    # Skill demand of every role, for missing-skill suggestions
+    skill_names, weights = build_role_skill_matrix(df['skills'], df['role'], label_encoder.classes_)
+    export_role_skills(label_encoder.classes_, skill_names, weights, os.path.join(staging, 'role_skills.npz'))
+    print(f"[+] Role x skill matrix: {len(label_encoder.classes_)} roles x {len(skill_names)} skills")
+
+    build_job_index(vectorizer, postings, os.path.join(staging, INDEX_DIR), ROLE_MAPPING)
+
+    shutil.rmtree(path, ignore_errors=True)
+    os.rename(staging, path)
+
+def load_features(csv_path, cache_dir=FEATURE_CACHE_DIR, tfidf_params=TFIDF_PARAMS):
+    """Return the training features of csv_path, building them only on a cache miss.
+
+    A rerun with the same dataset and feature parameters (e.g. after changing
+    only model hyperparameters) skips parsing and vectorization entirely.
+    """
+    key = feature_cache_key(csv_path, tfidf_params)
+    if not cache_dir:
+        path = os.path.join(MODEL_DIR, '.features-uncached', key)
+        build_features(csv_path, path, tfidf_params)
+    else:
+        path = os.path.join(cache_dir, key)
+        if os.path.isdir(path):
+            print(f"[+] Feature cache hit: {path} (skipping parsing and vectorization)")
+        else:
+            print(f"[+] Feature cache miss: building {path}")
+            os.makedirs(cache_dir, exist_ok=True)
+            build_features(csv_path, path, tfidf_params)
+        # Mark as recently used so pruning keeps it
+        os.utime(path)
+        prune_feature_caches(cache_dir)
+
+    labels = np.load(os.path.join(path, 'labels.npz'))
+    role_skills = np.load(os.path.join(path, 'role_skills.npz'))
+    features = {
+        'vectorizer': joblib.load(os.path.join(path, 'vectorizer.joblib')),
+        'label_encoder': joblib.load(os.path.join(path, 'label_encoder.joblib')),
+        'X_train': sparse.load_npz(os.path.join(path, 'X_train.npz')),
+        'X_test': sparse.load_npz(os.path.join(path, 'X_test.npz')),
+        'X_train_skills': sparse.load_npz(os.path.join(path, 'X_train_skills.npz')),
+        'X_test_skills': sparse.load_npz(os.path.join(path, 'X_test_skills.npz')),
+        'y_train': labels['y_train'],
+        'y_test': labels['y_test'],
+        'role_skills': (role_skills['skills'], role_skills['weights']),
+        'job_index': os.path.join(path, INDEX_DIR),
+    }
+    print(f"[+] Features: train {features['X_train'].shape}, test {features['X_test'].shape}")
+    return features
+
+def prune_feature_caches(cache_dir, keep=FEATURE_CACHES_TO_KEEP):
+    """Delete all but the most recently used feature caches"""
+    entries = sorted(
+        (os.path.join(cache_dir, name) for name in os.listdir(cache_dir) if not name.endswith('.tmp')),
+        key=os.path.getmtime
     )
-    print(f"[+] Training set: {len(X_train)} records (80%)")
-    print(f"[+] Test set: {len(X_test)} records (20%)")
+    for path in entries[:-keep]:
+        shutil.rmtree(path, ignore_errors=True)
+        print(f"[+] Removed old feature cache {os.path.basename(path)}")
+
+def grid(space):
+    """Every combination of a {param: [values]} dict"""
+    return [dict(zip(space, values)) for values in itertools.product(*space.values())]
+
+def validation_rows(y_train):
+    """(fit rows, validation rows): a stratified split of the training rows"""
+    return train_test_split(np.arange(len(y_train)), test_size=TEST_SIZE, random_state=SPLIT_RANDOM_STATE,
+                            stratify=y_train)
+
+def validation_split(features):
+    """(X_fit, y_fit, X_val, y_val) carved out of the training rows of a feature set"""
+    fit, val = validation_rows(features['y_train'])
+    X_train, y_train = features['X_train'], features['y_train']
+    return X_train[fit], y_train[fit], X_train[val], y_train[val]
+
+def search_hyperparameters(csv_path, space=SEARCH_SPACE):
+    """Successive halving over SEARCH_SPACE, scored on a validation split of the training rows.
+
+    Both models share one vectorizer, so the SVM search picks it: stage 1
+    halves over TF-IDF max_features x SVM parameters, stage 2 over Random
+    Forest parameters on the winning features. Every vectorizer setting is a
+    feature cache entry of its own, so reruns skip vectorization.
+
+    Returns (tfidf_params, svm_params, rf_params, report).
+    """
+    print("\n" + "="*60)
+    print("HYPERPARAMETER SEARCH (SUCCESSIVE HALVING)")
+    print("="*60)
+    start = time.perf_counter()
+
+    tfidf_grid = {f"max_features={p['max_features']}": dict(TFIDF_PARAMS, **p) for p in grid(space['tfidf'])}
+    sets = {}
+    for name, tfidf_params in tfidf_grid.items():
+        sets[name] = validation_split(load_features(csv_path, tfidf_params=tfidf_params))
+
+    # Candidates are fitted side by side on all cores, one thread each
+    base_params = {'svm': SVM_PARAMS, 'rf': dict(RF_PARAMS, n_jobs=1)}
+    svm_candidates = [('svm', name, p) for name in sets for p in grid(space['svm'])]
+    svm_best, svm_board = successive_halving(svm_candidates, sets, base_params)
+    features_name = svm_best['features']
+
+    rf_candidates = [('rf', features_name, p) for p in grid(space['rf'])]
+    rf_best, rf_board = successive_halving(rf_candidates, {features_name: sets[features_name]}, base_params)
+
+    tfidf_params = tfidf_grid[features_name]
+    svm_params = dict(SVM_PARAMS, **svm_best['params'])
+    rf_params = dict(RF_PARAMS, **rf_best['params'])
+    leaderboard = sorted(svm_board + rf_board,
+                         key=lambda e: (e['model'], -e['rung'], -e['accuracy'], e['train_time_s']))
+    report = {
+        'method': 'successive_halving',
+        'eta': SEARCH_ETA,
+        'space': space,
+        'validation_rows': int(len(sets[features_name][3])),
+        'elapsed_s': round(time.perf_counter() - start, 2),
+        'best': {
+            'tfidf': {k: tfidf_params[k] for k in space['tfidf']},
+            'svm': {k: svm_params[k] for k in space['svm']},
+            'rf': {k: rf_params[k] for k in space['rf']},
+        },
+        'leaderboard': leaderboard,
+    }
 
-    # Step 4: Vectorize text
-    vectorizer, X_train_tfidf, X_test_tfidf = vectorize_text(X_train, X_test)
+    print(f"\n[+] Search finished in {report['elapsed_s']} s: {len(leaderboard)} fits")
+    print(f"    Features: {features_name}")
+    print(f"    SVM: {report['best']['svm']} (validation accuracy {svm_best['accuracy']:.4f})")
+    print(f"    RF:  {report['best']['rf']} (validation accuracy {rf_best['accuracy']:.4f})")
+    return tfidf_params, svm_params, rf_params, report
 
-    # Step 5: Train models
-    svm_model, svm_metrics = train_svm(X_train_tfidf, y_train, X_test_tfidf, y_test)
-    rf_model, rf_metrics = train_random_forest(X_train_tfidf, y_train, X_test_tfidf, y_test)
+def main(search=False):
+    """Main training pipeline"""
+    print("\n")
+    print("=" * 60)
+    print(" SMART CAREER ADVISOR - MODEL TRAINING PIPELINE ".center(60))
+    print("=" * 60)
 
-    # Step 6: Select best model
-    best_model_name, best_metrics = select_best_model(svm_metrics, rf_metrics)
+    # Optional: pick vectorizer and model parameters by successive halving
+    tfidf_params, svm_params, rf_params, search_report = TFIDF_PARAMS, SVM_PARAMS, RF_PARAMS, None
+    if search:
+        tfidf_params, svm_params, rf_params, search_report = search_hyperparameters('data/jobs_dataset.csv')
+
+    # Steps 1-4: Load, normalize, split and vectorize the data (cached across runs)
+    features = load_features('data/jobs_dataset.csv', tfidf_params=tfidf_params)
+    label_encoder = features['label_encoder']
+    X_train_tfidf, X_test_tfidf = features['X_train'], features['X_test']
+    y_train, y_test = features['y_train'], features['y_test']
+
+    # Step 5: Train models (SVM and Random Forest side by side)
+    svm_model, svm_metrics, rf_model, rf_metrics = train_models(X_train_tfidf, y_train, X_test_tfidf, y_test,
+                                                                svm_params, rf_params)
+    # Temperature from an SVM fitted without a validation slice of the training rows, scored on that slice
+    fit, val = validation_rows(y_train)
+    probe = LinearSVC(**svm_params).fit(X_train_tfidf[fit], y_train[fit])
+    svm_temperature, svm_calibration = calibrate_svm(probe.decision_function(features['X_train_skills'][val]),
+                                                     y_train[val], svm_model, features['X_test_skills'], y_test)
+
+    # Step 6: Benchmark serving cost and select the best model by policy
+    benchmarks = benchmark_models(svm_model, rf_model, X_test_tfidf, y_test)
+    best_model_name, best_metrics, selection = select_best_model(svm_metrics, rf_metrics, benchmarks)
 
     # Step 7: Save artifacts (both SVM and RF models for ensemble predictions)
-    save_models(svm_model, rf_model, vectorizer, label_encoder, best_model_name, svm_metrics, rf_metrics)
+    save_models(svm_model, rf_model, features['vectorizer'], label_encoder, best_model_name, svm_metrics,
+                rf_metrics, features['job_index'], svm_temperature, svm_calibration, features['role_skills'],
+                training_info={'total_records_after_normalization': len(y_train) + len(y_test)},
+                search=search_report, benchmarks=benchmarks, selection=selection)
 
 if __name__ == '__main__':
-    main()
+    # python train_model.py [--search]
+    main(search='--search' in sys.argv[1:])
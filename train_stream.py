@@ -0,0 +1,322 @@
+"""
+Smart Career Advisor - Streaming Model Training
+Out-of-core training for job datasets larger than memory
+
+train_model.py holds the whole CSV, its TF-IDF matrices and a Random Forest
+in memory. This script never does: it reads jobs_dataset.csv in chunks of
+SCA_STREAM_CHUNK_ROWS rows, applies ROLE_MAPPING per chunk, featurizes with
+a stateless HashingVectorizer (no vocabulary to fit, so no extra pass) and
+trains a linear SVM (SGDClassifier, hinge loss) with partial_fit.
+
+Passes over the file:
+    1. the `role` column only, for the classes present and the number of
+       normalized rows
+    2. SCA_STREAM_EPOCHS training passes over the training rows, minus a
+       calibration slice of them
+    3. one evaluation pass over the held-out rows: the temperature is fitted
+       on the calibration slice, metrics are measured on the test split
+
+Which rows are held out is decided per row from a hash of its row number
+(see row_draws), so no pass keeps anything per row: memory is bounded by
+the chunk size, the model and the CALIBRATION_ROWS samples. The split is
+the same on every run and for every chunk size, and TEST_SIZE of each role
+is held out in expectation; it is not the exact stratified split of
+train_model.py, which needs an index array over all rows.
+
+A checkpoint (models, role x skill counts, position) is written every
+SCA_STREAM_CHECKPOINT_CHUNKS chunks; rerunning on the same dataset resumes
+from it. The Random Forest has no partial_fit, so models trained here are
+served SVM-only.
+
+Usage: python train_stream.py [data/jobs_dataset.csv]
+"""
+
+import os
+import sys
+import time
+
+import joblib
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from sklearn.feature_extraction.text import HashingVectorizer
+from sklearn.linear_model import SGDClassifier
+from sklearn.preprocessing import LabelEncoder
+
+from model_benchmark import benchmark_models, select_model
+from role_skills import RoleSkillCounts
+from train_model import (MODEL_DIR, ROLE_MAPPING, TEST_SIZE, SPLIT_RANDOM_STATE, dataset_key, calibrate_svm,
+                         save_models)
+
+CHUNK_ROWS = int(os.environ.get('SCA_STREAM_CHUNK_ROWS', 50000))
+EPOCHS = int(os.environ.get('SCA_STREAM_EPOCHS', 3))
+CHECKPOINT_CHUNKS = int(os.environ.get('SCA_STREAM_CHECKPOINT_CHUNKS', 10))
+CHECKPOINT_FILE = os.path.join(MODEL_DIR, 'stream_checkpoint.joblib')
+# Training rows held out of partial_fit to fit the softmax temperature on (at most
+# TEST_SIZE of them), and test rows kept to measure calibration and benchmark on
+CALIBRATION_ROWS = 100000
+
+HASHING_PARAMS = {
+    'n_features': 2 ** 18,
+    'stop_words': 'english',
+    'ngram_range': (1, 2),
+    'alternate_sign': False,
+    'norm': 'l2',
+}
+SGD_PARAMS = {
+    'loss': 'hinge',
+    'alpha': 1e-5,
+    'average': True,
+    'random_state': 42,
+}
+
+ROLES = np.array(sorted(set(ROLE_MAPPING.values())))
+COLUMNS = ['role', 'skills', 'job_description']
+
+
+def read_chunks(csv_path, columns=COLUMNS):
+    """Yield (first row number, DataFrame) for consecutive chunks of the dataset"""
+    start = 0
+    for chunk in pd.read_csv(csv_path, usecols=columns, chunksize=CHUNK_ROWS):
+        yield start, chunk
+        start += len(chunk)
+
+
+def role_codes(raw_roles):
+    """Index into ROLES of every row's normalized role, -1 where ROLE_MAPPING has none"""
+    return pd.Categorical(raw_roles.map(ROLE_MAPPING), categories=ROLES).codes.astype(np.int8)
+
+
+def chunk_text(chunk):
+    """Combined text as train_model.prepare_data builds it"""
+    return (chunk['skills'].fillna('') + ' ' + chunk['job_description'].fillna('')).tolist()
+
+
+def row_draws(start, end, seed=SPLIT_RANDOM_STATE):
+    """A fixed uniform draw in [0, 1) for each row number in [start, end) (splitmix64)"""
+    z = np.arange(start, end, dtype=np.uint64) + np.uint64((seed * 0x9E3779B97F4A7C15) & (2 ** 64 - 1))
+    z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    z ^= z >> np.uint64(31)
+    return (z >> np.uint64(11)).astype(np.float64) / 2.0 ** 53
+
+
+def split_rows(csv_path):
+    """Pass 1: the label encoder and the share of rows kept for calibration.
+
+    Returns a split dict for chunk_split: label_encoder, to_label (ROLES
+    index -> encoded label, -1 if absent), the number of normalized rows
+    and calibration_share, the fraction of all rows drawn as calibration
+    rows (CALIBRATION_ROWS, or TEST_SIZE of the training rows if fewer).
+    """
+    present = np.zeros(len(ROLES), dtype=bool)
+    rows = kept = 0
+    for _, chunk in read_chunks(csv_path, ['role']):
+        codes = role_codes(chunk['role'])
+        present[codes[codes >= 0]] = True
+        rows += len(codes)
+        kept += int((codes >= 0).sum())
+
+    # Same classes as LabelEncoder over the normalized rows
+    label_encoder = LabelEncoder().fit(ROLES[present])
+    to_label = np.full(len(ROLES), -1, dtype=np.int8)
+    to_label[np.searchsorted(ROLES, label_encoder.classes_)] = np.arange(len(label_encoder.classes_))
+
+    train_share = 1.0 - TEST_SIZE
+    calibration_share = min(CALIBRATION_ROWS / max(kept, 1), train_share * TEST_SIZE)
+    print(f"[+] {rows} rows, {kept} after normalization, ~{int(kept * TEST_SIZE)} held out, "
+          f"~{int(kept * calibration_share)} training rows kept for calibration")
+    return {'label_encoder': label_encoder, 'to_label': to_label, 'kept': kept,
+            'calibration_share': calibration_share}
+
+
+def chunk_split(split, start, chunk):
+    """Encoded labels (-1 for rows dropped by normalization) and the test and
+    calibration masks of one chunk"""
+    codes = role_codes(chunk['role'])
+    y = np.where(codes >= 0, split['to_label'][codes], -1).astype(np.int8)
+    draws = row_draws(start, start + len(chunk))
+    kept = y >= 0
+    test = kept & (draws < TEST_SIZE)
+    calibration = kept & (draws >= TEST_SIZE) & (draws < TEST_SIZE + split['calibration_share'])
+    return y, test, calibration
+
+
+def save_checkpoint(state):
+    tmp = CHECKPOINT_FILE + '.tmp'
+    joblib.dump(state, tmp)
+    os.replace(tmp, CHECKPOINT_FILE)
+    print(f"[Checkpoint] {state['epoch']} epochs + {state['rows_done']} rows -> {CHECKPOINT_FILE}")
+
+
+def load_checkpoint(key):
+    if not os.path.exists(CHECKPOINT_FILE):
+        return None
+    state = joblib.load(CHECKPOINT_FILE)
+    if state.get('key') != key:
+        print("[Checkpoint] Ignoring checkpoint of a different dataset or parameters")
+        return None
+    print(f"[Checkpoint] Resuming at epoch {state['epoch'] + 1}, row {state['rows_done']}")
+    return state
+
+
+def train_pass(csv_path, vectorizer, split, state):
+    """Pass 2: partial_fit over the rows not held out, resuming at state['epoch'] / state['rows_done']"""
+    classes = np.arange(len(state['label_encoder'].classes_))
+    rng = np.random.RandomState(SPLIT_RANDOM_STATE)
+
+    for epoch in range(state['epoch'], EPOCHS):
+        start_time = time.perf_counter()
+        chunks = 0
+        for start, chunk in read_chunks(csv_path):
+            end = start + len(chunk)
+            if end <= state['rows_done']:
+                continue
+            y, test, calibration = chunk_split(split, start, chunk)
+            train = np.flatnonzero((y >= 0) & ~test & ~calibration)
+            rng.shuffle(train)
+
+            if len(train):
+                texts = chunk_text(chunk)
+                state['svm_model'].partial_fit(vectorizer.transform([texts[i] for i in train]),
+                                               y[train], classes=classes)
+            if epoch == 0:
+                # Role x skill demand counts every normalized posting once, as train_model does
+                kept = np.flatnonzero(y >= 0)
+                state['role_skills'].update(chunk['skills'].iloc[kept],
+                                            state['label_encoder'].classes_[y[kept]])
+
+            state['rows_done'] = end
+            chunks += 1
+            if chunks % CHECKPOINT_CHUNKS == 0:
+                save_checkpoint(state)
+
+        print(f"[+] Epoch {epoch + 1}/{EPOCHS}: {state['rows_done']} rows in {time.perf_counter() - start_time:.1f} s")
+        state['epoch'], state['rows_done'] = epoch + 1, 0
+        save_checkpoint(state)
+
+
+def evaluate_pass(csv_path, vectorizer, svm_model, split):
+    """Pass 3: predictions for every held-out row, and skills-only decision values.
+
+    Returns a dict of the confusion matrix over the test split (true label x
+    predicted label), the decision values
+    and labels of the calibration slice (skills only), and the first
+    CALIBRATION_ROWS test rows vectorized from skills only (X_test_skills, for
+    calibration metrics) and in full (X_sample, for benchmarks) with y_sample.
+    """
+    n_classes = len(split['label_encoder'].classes_)
+    confusion = np.zeros((n_classes, n_classes), dtype=np.int64)
+    decision, y_calibration, test_skills, sample, y_sample = [], [], [], [], []
+    sampled = 0
+    for start, chunk in read_chunks(csv_path):
+        y, test_mask, calibration_mask = chunk_split(split, start, chunk)
+
+        calibration = np.flatnonzero(calibration_mask)
+        if len(calibration):
+            decision.append(svm_model.decision_function(
+                vectorizer.transform(chunk['skills'].iloc[calibration].fillna(''))))
+            y_calibration.append(y[calibration])
+
+        test = np.flatnonzero(test_mask)
+        if not len(test):
+            continue
+        texts = chunk_text(chunk)
+        X = vectorizer.transform([texts[i] for i in test])
+        confusion += np.bincount(y[test].astype(np.int64) * n_classes + svm_model.predict(X),
+                                 minlength=n_classes * n_classes).reshape(n_classes, n_classes)
+
+        if sampled < CALIBRATION_ROWS:
+            take = test[:CALIBRATION_ROWS - sampled]
+            test_skills.append(vectorizer.transform(chunk['skills'].iloc[take].fillna('')))
+            sample.append(X[:len(take)])
+            y_sample.append(y[take])
+            sampled += len(take)
+
+    return {
+        'confusion': confusion,
+        'calibration_decision': np.vstack(decision),
+        'y_calibration': np.concatenate(y_calibration),
+        'X_test_skills': sparse.vstack(test_skills).tocsr(),
+        'X_sample': sparse.vstack(sample).tocsr(),
+        'y_sample': np.concatenate(y_sample),
+    }
+
+
+def stream_metrics(confusion):
+    """Held-out metrics in the shape train_model's train_svm reports, from a confusion matrix.
+
+    Weighted averages as sklearn computes them with zero_division=0.
+    """
+    correct = np.diag(confusion).astype(np.float64)
+    support, predicted = confusion.sum(axis=1), confusion.sum(axis=0)
+    precision = np.divide(correct, predicted, out=np.zeros_like(correct), where=predicted > 0)
+    recall = np.divide(correct, support, out=np.zeros_like(correct), where=support > 0)
+    f1 = np.divide(2 * precision * recall, precision + recall, out=np.zeros_like(correct),
+                   where=precision + recall > 0)
+    total = max(int(support.sum()), 1)
+    metrics = {
+        'model': 'SGDClassifier (linear SVM, streaming)',
+        'accuracy': float(correct.sum() / total),
+        'precision': float(precision @ support / total),
+        'recall': float(recall @ support / total),
+        'f1_score': float(f1 @ support / total),
+    }
+    print(f"\n[+] Streaming SVM Performance Metrics (held-out split):")
+    print(f"    Accuracy:  {metrics['accuracy']:.4f} (Correct predictions: "
+          f"{int(correct.sum())}/{int(support.sum())})")
+    print(f"    Precision: {metrics['precision']:.4f}")
+    print(f"    Recall:    {metrics['recall']:.4f}")
+    print(f"    F1-Score:  {metrics['f1_score']:.4f}")
+    return metrics
+
+
+def main(csv_path='data/jobs_dataset.csv'):
+    print("\n")
+    print("=" * 60)
+    print(" SMART CAREER ADVISOR - STREAMING TRAINING ".center(60))
+    print("=" * 60)
+    print(f"[+] Dataset: {csv_path}, {CHUNK_ROWS} rows per chunk, {EPOCHS} epochs")
+
+    vectorizer = HashingVectorizer(**HASHING_PARAMS)
+    key = dataset_key(csv_path, {'hashing': HASHING_PARAMS, 'sgd': SGD_PARAMS, 'epochs': EPOCHS,
+                                 'chunk_rows': CHUNK_ROWS, 'calibration_rows': CALIBRATION_ROWS,
+                                 'split': 'row_draws'})
+
+    split = split_rows(csv_path)
+    label_encoder = split['label_encoder']
+    state = load_checkpoint(key) or {
+        'key': key,
+        'epoch': 0,
+        'rows_done': 0,
+        'label_encoder': label_encoder,
+        'svm_model': SGDClassifier(**SGD_PARAMS),
+        'role_skills': RoleSkillCounts(label_encoder.classes_),
+    }
+
+    train_pass(csv_path, vectorizer, split, state)
+    svm_model = state['svm_model']
+
+    held_out = evaluate_pass(csv_path, vectorizer, svm_model, split)
+    svm_metrics = stream_metrics(held_out['confusion'])
+    svm_temperature, svm_calibration = calibrate_svm(held_out['calibration_decision'], held_out['y_calibration'],
+                                                     svm_model, held_out['X_test_skills'], held_out['y_sample'])
+    benchmarks = benchmark_models(svm_model, None, held_out['X_sample'], held_out['y_sample'])
+    _, selection = select_model({'SVM': svm_metrics['accuracy']}, benchmarks)
+
+    save_models(svm_model, None, vectorizer, label_encoder, 'SVM', svm_metrics, None,
+                svm_temperature=svm_temperature, svm_calibration=svm_calibration,
+                role_skills=state['role_skills'].matrix(),
+                training_info={
+                    'mode': 'streaming',
+                    'total_records_after_normalization': split['kept'],
+                    'chunk_rows': CHUNK_ROWS,
+                    'epochs': EPOCHS,
+                    'vectorization_note': 'HashingVectorizer: n_features=2^18, ngram_range=(1,2), l2 norm',
+                },
+                benchmarks=benchmarks, selection=selection)
+    os.remove(CHECKPOINT_FILE)
+
+
+if __name__ == '__main__':
+    main(*sys.argv[1:2])
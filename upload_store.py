@@ -0,0 +1,150 @@
+"""
+Smart Career Advisor - Upload Store
+Content-addressed storage for uploaded resumes
+
+Files are stored once per unique content under their SHA-256:
+    static/uploads/resumes/objects/ab/cd/abcd1234....pdf
+
+Two levels of two-hex-digit shards keep every directory small. Re-uploading
+an identical file resolves to the same object, so nothing is written twice;
+the extracted text and skills for an object live in the resume_contents table.
+"""
+
+import hashlib
+import os
+import re
+import tempfile
+from collections import namedtuple
+
+OBJECTS_DIR = 'objects'
+
+# Read uploads in 1 MB blocks while hashing / copying
+CHUNK_SIZE = 1 << 20
+
+OBJECT_NAME = re.compile(r'^([0-9a-f]{64})(\.[A-Za-z0-9]+)?$')
+
+# A file found by iter_files(); content_hash is None for legacy (non-object) files
+StoredFile = namedtuple('StoredFile', ['path', 'name', 'content_hash', 'size', 'mtime'])
+
+
+def hash_stream(stream):
+    """Return (sha256 hex digest, size in bytes) of a file-like object and rewind it"""
+    digest = hashlib.sha256()
+    size = 0
+    stream.seek(0)
+    for block in iter(lambda: stream.read(CHUNK_SIZE), b''):
+        digest.update(block)
+        size += len(block)
+    stream.seek(0)
+    return digest.hexdigest(), size
+
+
+class UploadStore:
+    """Sharded, write-once file store keyed by content hash"""
+
+    def __init__(self, root):
+        self.root = root
+        self.objects_root = os.path.join(root, OBJECTS_DIR)
+
+    def relative_path(self, content_hash, extension):
+        """Path of an object relative to the store root, e.g. objects/ab/cd/<hash>.pdf"""
+        return os.path.join(OBJECTS_DIR, content_hash[:2], content_hash[2:4], content_hash + extension)
+
+    def path(self, content_hash, extension):
+        return os.path.join(self.root, self.relative_path(content_hash, extension))
+
+    def exists(self, content_hash, extension):
+        return os.path.exists(self.path(content_hash, extension))
+
+    def save(self, stream, content_hash, extension):
+        """Write a stream under its hash unless the object already exists.
+
+        The file is written to a temporary name in the shard directory and
+        renamed into place, so readers never see a partial object.
+        Returns True if a new object was written.
+        """
+        target = self.path(content_hash, extension)
+        if os.path.exists(target):
+            return False
+
+        shard = os.path.dirname(target)
+        os.makedirs(shard, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=shard, prefix='.upload-')
+        try:
+            stream.seek(0)
+            with os.fdopen(fd, 'wb') as f:
+                for block in iter(lambda: stream.read(CHUNK_SIZE), b''):
+                    f.write(block)
+            os.replace(tmp_path, target)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        finally:
+            stream.seek(0)
+        return True
+
+    def import_file(self, file_path):
+        """Move an existing file into the store; duplicates of stored objects are deleted.
+
+        Returns (content_hash, extension, moved) where moved is False for a duplicate.
+        """
+        extension = os.path.splitext(file_path)[1].lower()
+        with open(file_path, 'rb') as f:
+            content_hash, _ = hash_stream(f)
+
+        target = self.path(content_hash, extension)
+        if os.path.exists(target):
+            os.remove(file_path)
+            return content_hash, extension, False
+
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        os.replace(file_path, target)
+        return content_hash, extension, True
+
+    def _scan(self, directory):
+        """Yield every file below directory, depth first, without listing it all up front"""
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    yield from self._scan(entry.path)
+                elif entry.is_file(follow_symlinks=False):
+                    yield entry
+
+    def iter_files(self, batch_size):
+        """Yield lists of at most batch_size StoredFile entries covering the whole store.
+
+        Includes legacy uploads saved directly in the root directory and
+        temporary files left behind by interrupted writes.
+        """
+        batch = []
+        for entry in self._scan(self.root):
+            match = OBJECT_NAME.match(entry.name)
+            in_objects = os.path.dirname(entry.path).startswith(self.objects_root)
+            stat = entry.stat(follow_symlinks=False)
+            batch.append(StoredFile(
+                path=entry.path,
+                name=entry.name,
+                content_hash=match.group(1) if match and in_objects else None,
+                size=stat.st_size,
+                mtime=stat.st_mtime,
+            ))
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    def remove(self, path):
+        """Delete a stored file and prune its shard directories once empty"""
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            return
+        directory = os.path.dirname(path)
+        while directory.startswith(self.objects_root + os.sep):
+            try:
+                os.rmdir(directory)
+            except OSError:
+                break
+            directory = os.path.dirname(directory)